@@ -0,0 +1,23 @@
+"""
+Hooks de behave: aislar cachés de proceso entre escenarios.
+"""
+import os
+import shutil
+import tempfile
+
+
+def before_scenario(context, scenario):
+    # Los steps sustituyen `whisper.load_model` y el pipeline de pyannote en cada
+    # escenario; vaciar las cachés evita reutilizar fakes de escenarios anteriores.
+    from src.model_registry import get_registry
+    from src.pipeline_cache import get_pipeline_cache
+    get_registry().clear()
+    get_pipeline_cache().clear()
+    # Cachés en disco (transcripciones y diarizaciones): un directorio temporal por escenario
+    context.result_cache_dir = tempfile.mkdtemp(prefix='behave_cache_')
+    os.environ['WHISPER_CACHE_DIR'] = os.path.join(context.result_cache_dir, 'transcripciones')
+    os.environ['DIARIZATION_CACHE_DIR'] = os.path.join(context.result_cache_dir, 'diarizaciones')
+
+
+def after_scenario(context, scenario):
+    shutil.rmtree(getattr(context, 'result_cache_dir', ''), ignore_errors=True)
@@ -216,6 +216,10 @@ def step_mock_pyannote_whisper(context):
     # patch normalize to avoid calling real torchaudio during the scenario
     context._orig_normalize = getattr(diarize, 'normalize_audio_for_diarization', None)
     diarize.normalize_audio_for_diarization = lambda path: path
+    # the pipeline decodes once in memory; patch the decode stage as well
+    import torch
+    context._orig_decode = getattr(diarize, 'decode_audio', None)
+    diarize.decode_audio = lambda path: {'waveform': torch.zeros((1, 16000)), 'sample_rate': 16000}
 
 
 @when('ejecuto `transcribe_with_speaker_diarization`')
@@ -241,6 +245,9 @@ def step_assert_segments_with_speaker(context):
     if hasattr(context, '_orig_whisper') and context._orig_whisper is not None:
         from src import diarize as _d
         _d.whisper = context._orig_whisper
+    if getattr(context, '_orig_decode', None) is not None:
+        from src import diarize as _d
+        _d.decode_audio = context._orig_decode
 
 
 @given('un audio temporal y token pasado como argumento hf_xxx')
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark: asignación de hablantes por barrido y vectorizada (NumPy) frente a
+`get_speaker_for_segment`.
+
+Genera una diarización sintética (turnos y segmentos de una reunión larga),
+comprueba que todos los métodos dan el mismo resultado y mide sus tiempos.
+
+Uso:
+    python scripts/benchmark_speaker_assignment.py [horas] [turnos] [segmentos]
+"""
+import os
+import random
+import sys
+import time
+import types
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.diarize import get_speaker_for_segment  # noqa: E402
+from src.speaker_assignment import assign_speakers, attribute_speakers  # noqa: E402
+
+
+class SyntheticDiarization:
+    def __init__(self, tracks):
+        self._tracks = [(types.SimpleNamespace(start=s, end=e), None, spk) for s, e, spk in tracks]
+
+    def itertracks(self, yield_label=True):
+        return iter(self._tracks)
+
+
+def build_case(hours: float, n_turns: int, n_segments: int, seed: int = 0):
+    rng = random.Random(seed)
+    duration = hours * 3600
+    tracks = []
+    t = 0.0
+    step = duration / max(n_turns, 1)
+    for _ in range(n_turns):
+        length = rng.uniform(0.5, 2.0) * step
+        tracks.append((t, t + length, f"SPEAKER_{rng.randint(0, 5):02d}"))
+        t += step
+    segments = []
+    t = 0.0
+    seg_step = duration / max(n_segments, 1)
+    for _ in range(n_segments):
+        segments.append({'start': t, 'end': t + rng.uniform(0.6, 1.0) * seg_step})
+        t += seg_step
+    return SyntheticDiarization(tracks), segments
+
+
+def main():
+    hours = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    n_turns = int(sys.argv[2]) if len(sys.argv) > 2 else 4000
+    n_segments = int(sys.argv[3]) if len(sys.argv) > 3 else 4000
+
+    diarization, segments = build_case(hours, n_turns, n_segments)
+    # Calentar: la primera llamada vectorizada importa NumPy
+    attribute_speakers(diarization, segments[:1])
+
+    t0 = time.perf_counter()
+    scalar = [get_speaker_for_segment(diarization, s['start'], s['end']) for s in segments]
+    t_scalar = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    sweep = assign_speakers(diarization, segments)
+    t_sweep = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    vectorized = attribute_speakers(diarization, segments).speakers
+    t_vectorized = time.perf_counter() - t0
+
+    assert scalar == sweep == vectorized, "Los resultados no coinciden"
+
+    print(f"Audio: {hours:.1f} h, turnos: {n_turns}, segmentos: {n_segments}")
+    print(f"  get_speaker_for_segment: {t_scalar * 1000:10.1f} ms")
+    print(f"  assign_speakers (sweep): {t_sweep * 1000:10.1f} ms")
+    print(f"  attribute_speakers (NumPy): {t_vectorized * 1000:7.1f} ms")
+    print(f"  Aceleración: sweep x{t_scalar / t_sweep:.1f}, NumPy x{t_scalar / t_vectorized:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -50,4 +50,5 @@ else
 fi
 
 echo ""
+echo "Trabajos reanudables: python -m src.diarize_job <audio> --job-dir <dir> --status"
 echo "========================================"
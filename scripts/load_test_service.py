@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Prueba de carga del servicio HTTP de transcripción (`src/service.py`).
+
+Envía trabajos desde varios clientes a la vez, espera sus resultados y mide
+rendimiento, latencias y respuestas 429 (cola llena). Con `--fake N` arranca
+en este proceso un servicio con N trabajadores y el modelo simulado, así que
+no hacen falta Whisper ni un servicio ya en marcha.
+
+Uso:
+    python scripts/load_test_service.py --fake 2 --jobs 40 --clients 8
+    python scripts/load_test_service.py --url http://127.0.0.1:8765 --audio ejemplo.wav
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.service import TranscriptionService, fake_job, make_server  # noqa: E402
+
+
+def request(url, method='GET', body=None):
+    data = json.dumps(body).encode('utf-8') if body is not None else None
+    req = urllib.request.Request(url, data=data, method=method,
+                                 headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(req, timeout=30) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b'{}')
+
+
+def run_client_job(base_url, audio_path, model, poll):
+    """Envía un trabajo y espera su resultado. Devuelve (latencia, código del envío)."""
+    started = time.perf_counter()
+    status, job = request(f"{base_url}/jobs", 'POST', {'audio_path': audio_path, 'model': model})
+    if status != 202:
+        return None, status
+    while True:
+        status, body = request(f"{base_url}/jobs/{job['id']}/result")
+        if status == 200:
+            return time.perf_counter() - started, 202
+        if status != 409 or body.get('status') not in ('pendiente', 'en curso'):
+            return None, status
+        time.sleep(poll)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--url', default=None, help="Servicio ya en marcha")
+    parser.add_argument('--fake', type=int, default=None, metavar='WORKERS',
+                        help="Arrancar un servicio simulado con WORKERS trabajadores")
+    parser.add_argument('--fake-load', type=float, default=1.0)
+    parser.add_argument('--fake-seconds', type=float, default=0.2)
+    parser.add_argument('--audio', default=None, help="Audio a enviar (default: archivo temporal vacío)")
+    parser.add_argument('--model', default='base')
+    parser.add_argument('--jobs', type=int, default=20)
+    parser.add_argument('--clients', type=int, default=4)
+    parser.add_argument('--poll', type=float, default=0.05)
+    args = parser.parse_args()
+
+    audio = args.audio
+    if audio is None:
+        handle, audio = tempfile.mkstemp(suffix='.wav')
+        os.close(handle)
+
+    server = service = None
+    base_url = args.url
+    if args.fake:
+        service = TranscriptionService(workers=args.fake, task=fake_job,
+                                       job_defaults={'fake_load': args.fake_load,
+                                                     'fake_seconds': args.fake_seconds})
+        server = make_server(service, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    if not base_url:
+        parser.error("indica --url o --fake")
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.clients) as pool:
+        results = list(pool.map(lambda _: run_client_job(base_url, audio, args.model, args.poll),
+                                range(args.jobs)))
+    wall = time.perf_counter() - started
+
+    latencies = sorted(latency for latency, _ in results if latency is not None)
+    rejected = sum(1 for _, status in results if status == 429)
+    print(f"Trabajos: {args.jobs} ({len(latencies)} completados, {rejected} rechazados con 429)")
+    print(f"Tiempo total: {wall:.2f}s · {len(latencies) / wall:.2f} trabajos/s")
+    if latencies:
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(f"Latencia: media {statistics.mean(latencies):.2f}s · p50 {statistics.median(latencies):.2f}s"
+              f" · p95 {p95:.2f}s · máx {latencies[-1]:.2f}s")
+
+    if server is not None:
+        server.shutdown()
+        server.server_close()
+        service.shutdown()
+    if args.audio is None:
+        os.unlink(audio)
+
+
+if __name__ == '__main__':
+    main()
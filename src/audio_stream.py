@@ -0,0 +1,106 @@
+"""
+Lectura de audio por ventanas con memoria acotada.
+
+Un único proceso ffmpeg decodifica el archivo a PCM 16kHz mono y se lee su
+salida en bloques de tamaño fijo, de modo que la memoria usada no depende de
+la duración de la grabación.
+"""
+import os
+import subprocess
+from typing import Iterator, Optional
+
+# Frecuencia de muestreo que esperan Whisper y pyannote
+SAMPLE_RATE = 16000
+
+# Ejecutable de ffmpeg (configurable para entornos sin ffmpeg en el PATH)
+FFMPEG_BINARY = os.getenv('FFMPEG_BINARY', 'ffmpeg')
+
+# Ejecutable de ffprobe (duración del audio sin decodificarlo)
+FFPROBE_BINARY = os.getenv('FFPROBE_BINARY', 'ffprobe')
+
+
+def _read_exact(stream, size: int) -> bytes:
+    """Lee hasta `size` bytes de un pipe (menos sólo al final del flujo)."""
+    chunks = []
+    remaining = size
+    while remaining > 0:
+        chunk = stream.read(remaining)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(chunks)
+
+
+def probe_duration(audio_path: str) -> Optional[float]:
+    """
+    Duración de un archivo de audio en segundos, leída de la cabecera con ffprobe.
+
+    Returns:
+        float: Duración, o None si ffprobe no está disponible o no la conoce
+    """
+    cmd = [
+        FFPROBE_BINARY,
+        "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        audio_path
+    ]
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        duration = float(proc.stdout.strip())
+    except (OSError, subprocess.SubprocessError, ValueError):
+        return None
+    return duration if proc.returncode == 0 and duration > 0 else None
+
+
+def iter_audio_windows(audio_path: str, window_seconds: float, sample_rate: int = SAMPLE_RATE) -> Iterator:
+    """
+    Decodifica un archivo de audio y lo entrega en ventanas de duración fija.
+
+    Args:
+        audio_path (str): Ruta al archivo de audio
+        window_seconds (float): Duración de cada ventana en segundos (la última puede ser menor)
+        sample_rate (int): Frecuencia de muestreo de salida
+
+    Yields:
+        np.ndarray: Muestras float32 mono en [-1, 1] de cada ventana
+    """
+    import numpy as np
+
+    cmd = [
+        FFMPEG_BINARY,
+        "-nostdin",
+        "-threads", "0",
+        "-i", audio_path,
+        "-f", "s16le",
+        "-ac", "1",
+        "-acodec", "pcm_s16le",
+        "-ar", str(sample_rate),
+        "-"
+    ]
+    try:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    except FileNotFoundError:
+        raise RuntimeError("ffmpeg no está disponible en este entorno para decodificar audio")
+
+    window_bytes = int(window_seconds * sample_rate) * 2  # 2 bytes por muestra (s16le)
+    finished = False
+    try:
+        while True:
+            data = _read_exact(proc.stdout, window_bytes)
+            if len(data) % 2:
+                data = data[:-1]
+            if not data:
+                break
+            yield np.frombuffer(data, np.int16).astype(np.float32) / 32768.0
+        finished = True
+    finally:
+        proc.stdout.close()
+        if not finished and proc.poll() is None:
+            # El consumidor abandonó el generador: no dejar ffmpeg vivo
+            proc.kill()
+        returncode = proc.wait()
+
+    if finished and returncode != 0:
+        raise RuntimeError(f"ffmpeg no pudo decodificar '{audio_path}' (código {returncode})")
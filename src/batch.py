@@ -0,0 +1,361 @@
+"""
+Transcripción por lotes: directorios, patrones glob o manifiestos.
+
+Reparte los archivos entre N procesos trabajadores que mantienen el modelo
+Whisper cargado (y el pipeline de pyannote en modo diarización), de forma que
+sólo se paga el arranque del intérprete y la carga del modelo una vez por
+trabajador en lugar de una vez por archivo.
+
+Uso:
+    python -m src.batch <entradas...> [--model base] [--language es] [--workers 4]
+                        [--output-dir salida/] [--diarize] [--num-speakers 2]
+                        [--threads N] [--interop-threads N] [--cpu-affinity 0-7] [--pin]
+
+Cada entrada puede ser un archivo, un directorio (se recorre recursivamente),
+un patrón glob ("grabaciones/*.mp3") o un manifiesto ("@lista.txt", una ruta
+por línea; las líneas vacías o que empiezan por '#' se ignoran).
+"""
+import argparse
+import glob
+import multiprocessing
+import os
+import queue
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, List, Optional
+from .thread_policy import ThreadPolicy, add_thread_arguments, apply_thread_policy, policy_from_args
+
+# Extensiones consideradas audio al recorrer directorios
+AUDIO_EXTENSIONS = ('.mp3', '.wav', '.m4a', '.mp4', '.webm', '.ogg', '.flac')
+
+# Política de hilos de este proceso trabajador (la fija `_init_worker`)
+_worker_policy: Optional[ThreadPolicy] = None
+
+
+def collect_inputs(sources: Iterable[str], extensions: tuple = AUDIO_EXTENSIONS) -> List[str]:
+    """
+    Expande directorios, globs y manifiestos en una lista de archivos de audio.
+
+    Args:
+        sources (iterable): Entradas de la línea de comandos
+        extensions (tuple): Extensiones aceptadas al recorrer directorios y globs
+
+    Returns:
+        list: Rutas sin duplicados, en el orden en que aparecen
+    """
+    files = []
+    for source in sources:
+        if source.startswith('@'):
+            manifest = Path(source[1:])
+            base = manifest.parent
+            with open(manifest, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith('#'):
+                        path = Path(line)
+                        files.append(str(path if path.is_absolute() else base / path))
+        elif os.path.isdir(source):
+            for root, _, names in os.walk(source):
+                for name in sorted(names):
+                    if name.lower().endswith(extensions):
+                        files.append(os.path.join(root, name))
+        elif glob.has_magic(source):
+            files.extend(p for p in sorted(glob.glob(source, recursive=True))
+                         if os.path.isfile(p) and p.lower().endswith(extensions))
+        else:
+            files.append(source)
+    return list(dict.fromkeys(files))
+
+
+def output_paths(audio_path: str, output_dir: Optional[str] = None, diarize: bool = False) -> List[str]:
+    """
+    Rutas de salida de un archivo, con los mismos nombres que usan las CLIs.
+
+    Args:
+        audio_path (str): Archivo de entrada
+        output_dir (str): Directorio de salida (None = junto al archivo de entrada)
+        diarize (bool): Modo diarización (salida agrupada y con timestamps)
+
+    Returns:
+        list: Rutas de los archivos que se generarán
+    """
+    audio = Path(audio_path)
+    target = Path(output_dir) if output_dir else audio.parent
+    if diarize:
+        return [str(target / f"{audio.stem}_diarized_grouped.txt"),
+                str(target / f"{audio.stem}_diarized_timestamped.txt")]
+    return [str(target / f"{audio.stem}_transcripcion.txt")]
+
+
+def check_output_collisions(inputs: List[str], output_dir: Optional[str] = None, diarize: bool = False):
+    """
+    Comprueba que dos entradas no escriban la misma salida (p.ej. `a/x.wav` y
+    `b/x.wav` con `--output-dir`, o `x.wav` y `x.mp3` en el mismo directorio).
+
+    Raises:
+        ValueError: Si alguna salida la generarían varias entradas
+    """
+    owners = {}
+    clashes = []
+    for path in inputs:
+        for output in output_paths(path, output_dir, diarize):
+            key = os.path.normcase(os.path.abspath(output))
+            if key in owners and owners[key] != path:
+                clashes.append(f"{owners[key]} y {path} -> {output}")
+            owners.setdefault(key, path)
+    if clashes:
+        raise ValueError("Varias entradas escribirían la misma salida (renombra los archivos "
+                         "o procésalos por separado):\n  " + "\n  ".join(dict.fromkeys(clashes)))
+
+
+def _init_worker(model_size: str, diarize: bool, hf_token: Optional[str],
+                 policy: Optional[ThreadPolicy] = None, policy_slots=None):
+    """
+    Inicializa un trabajador: aplica su política de hilos y deja el modelo cargado en memoria.
+
+    Con `policy_slots` (cola con una política por trabajador) cada proceso toma
+    la suya, de forma que los bloques de núcleos fijados con `--pin` no se repiten.
+    La política se guarda para que `process_file` la vuelva a aplicar en cada
+    archivo en lugar de la de las variables de entorno.
+    """
+    global _worker_policy
+    if policy_slots is not None:
+        try:
+            policy = policy_slots.get_nowait()
+        except queue.Empty:
+            pass
+    _worker_policy = policy
+    try:
+        apply_thread_policy(policy)
+    except Exception as e:
+        print(f"Aviso: no se pudo aplicar la política de hilos: {e}")
+    try:
+        from . import transcribe
+        from .model_registry import get_model
+        get_model(model_size, loader=transcribe.whisper.load_model)
+        if diarize:
+            from .diarize import load_diarization_pipeline
+            load_diarization_pipeline(hf_token)
+    except Exception as e:
+        # El error se volverá a producir (y se contabilizará) al procesar cada archivo
+        print(f"Aviso: no se pudo precargar el modelo en el trabajador: {e}")
+
+
+def process_file(
+    audio_path: str,
+    model_size: str = "base",
+    language: Optional[str] = None,
+    output_dir: Optional[str] = None,
+    diarize: bool = False,
+    hf_token: Optional[str] = None,
+    num_speakers: Optional[int] = None,
+    thread_policy: Optional[ThreadPolicy] = None
+) -> dict:
+    """
+    Procesa un archivo del lote y escribe sus salidas.
+
+    Args:
+        thread_policy (ThreadPolicy): Política de hilos del archivo (None = la del
+            trabajador fijada por `_init_worker`, o las variables de entorno)
+
+    Returns:
+        dict: path, outputs, audio_seconds (estimado por el final del último segmento),
+        elapsed (s) y error (None si todo fue bien)
+    """
+    t0 = time.perf_counter()
+    outputs = output_paths(audio_path, output_dir, diarize)
+    thread_policy = thread_policy or _worker_policy
+    try:
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        if diarize:
+            from .diarize import transcribe_with_speaker_diarization, save_diarized_transcription
+            segments = transcribe_with_speaker_diarization(audio_path, hf_token, model_size, language, num_speakers,
+                                                           thread_policy=thread_policy)
+            save_diarized_transcription(segments, outputs[0], "grouped")
+            save_diarized_transcription(segments, outputs[1], "timestamped")
+        else:
+            from .transcribe import transcribe_audio, save_transcription
+            result = transcribe_audio(audio_path, model_size, language, thread_policy=thread_policy)
+            segments = result.get('segments') or []
+            save_transcription(result["text"], outputs[0])
+        audio_seconds = max((seg['end'] for seg in segments), default=0.0)
+        error = None
+    except Exception as e:
+        audio_seconds = 0.0
+        error = f"{type(e).__name__}: {e}"
+    return {
+        'path': audio_path,
+        'outputs': outputs if error is None else [],
+        'audio_seconds': audio_seconds,
+        'elapsed': time.perf_counter() - t0,
+        'error': error,
+    }
+
+
+def run_batch(
+    inputs: List[str],
+    model_size: str = "base",
+    language: Optional[str] = None,
+    workers: int = 1,
+    output_dir: Optional[str] = None,
+    diarize: bool = False,
+    hf_token: Optional[str] = None,
+    num_speakers: Optional[int] = None,
+    mp_context=None,
+    thread_policy: Optional[ThreadPolicy] = None,
+    pin: bool = False
+) -> dict:
+    """
+    Procesa una lista de archivos con un pool de procesos con el modelo precargado.
+
+    Args:
+        inputs (list): Archivos de audio
+        model_size (str): Tamaño del modelo Whisper
+        language (str): Idioma (None = autodetectar)
+        workers (int): Procesos trabajadores; 1 procesa en el proceso actual
+        output_dir (str): Directorio de salida (None = junto a cada entrada)
+        diarize (bool): Transcribir con identificación de hablantes
+        hf_token (str): Token de HuggingFace (modo diarización)
+        num_speakers (int): Número de hablantes, si se conoce
+        mp_context: Contexto de multiprocessing para el pool (opcional)
+        thread_policy (ThreadPolicy): Política de hilos por trabajador (None = variables
+            de entorno; por defecto los núcleos se reparten entre los trabajadores)
+        pin (bool): Fijar cada trabajador a un bloque de núcleos disjunto
+
+    Returns:
+        dict: results (uno por archivo), files, succeeded, failed, wall_time,
+        audio_seconds, files_per_second y audio_hours_per_wall_hour
+
+    Raises:
+        ValueError: Si dos entradas escribirían la misma salida (antes de procesar nada)
+    """
+    check_output_collisions(inputs, output_dir, diarize)
+    t0 = time.perf_counter()
+    task_args = (model_size, language, output_dir, diarize, hf_token, num_speakers)
+
+    if workers <= 1 or len(inputs) <= 1:
+        _init_worker(model_size, diarize, hf_token, thread_policy)
+        results = []
+        for path in inputs:
+            results.append(process_file(path, *task_args))
+            _print_progress(results[-1], len(results), len(inputs))
+    else:
+        # Repartir los núcleos entre trabajadores para no sobresuscribir la CPU
+        policies = (thread_policy or ThreadPolicy.from_env()).partition(workers, pin)
+        context = mp_context or multiprocessing.get_context()
+        policy_slots = context.Queue()
+        for policy in policies:
+            policy_slots.put(policy)
+        results = []
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(model_size, diarize, hf_token, policies[0], policy_slots)
+        ) as executor:
+            futures = [executor.submit(process_file, path, *task_args) for path in inputs]
+            for future in futures:
+                results.append(future.result())
+                _print_progress(results[-1], len(results), len(inputs))
+
+    return summarize(results, time.perf_counter() - t0)
+
+
+def _print_progress(result: dict, done: int, total: int):
+    status = "OK" if result['error'] is None else f"ERROR ({result['error']})"
+    print(f"[{done}/{total}] {result['path']}: {status} en {result['elapsed']:.1f}s")
+
+
+def summarize(results: List[dict], wall_time: float) -> dict:
+    """Calcula las métricas de rendimiento del lote."""
+    failed = [r for r in results if r['error'] is not None]
+    audio_seconds = sum(r['audio_seconds'] for r in results)
+    return {
+        'results': results,
+        'files': len(results),
+        'succeeded': len(results) - len(failed),
+        'failed': len(failed),
+        'wall_time': wall_time,
+        'audio_seconds': audio_seconds,
+        'files_per_second': len(results) / wall_time if wall_time > 0 else 0.0,
+        'audio_hours_per_wall_hour': audio_seconds / wall_time if wall_time > 0 else 0.0,
+    }
+
+
+def print_summary(summary: dict):
+    """Imprime el resumen de rendimiento del lote."""
+    print("\n" + "=" * 50)
+    print("RESUMEN DEL LOTE")
+    print("=" * 50)
+    print(f"  - Archivos: {summary['files']} ({summary['succeeded']} correctos, {summary['failed']} fallidos)")
+    print(f"  - Tiempo total: {summary['wall_time']:.1f}s")
+    print(f"  - Audio procesado: {summary['audio_seconds'] / 3600:.2f} h")
+    print(f"  - Rendimiento: {summary['files_per_second']:.2f} archivos/s, "
+          f"{summary['audio_hours_per_wall_hour']:.1f} horas de audio por hora")
+    for r in summary['results']:
+        if r['error'] is not None:
+            print(f"  ✗ {r['path']}: {r['error']}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.batch",
+        description="Transcribe lotes de archivos de audio con modelos precargados por trabajador."
+    )
+    parser.add_argument('inputs', nargs='+',
+                        help="Archivos, directorios, patrones glob o manifiestos (@lista.txt)")
+    parser.add_argument('--model', default='base', help="Tamaño del modelo Whisper (default: base)")
+    parser.add_argument('--language', default=None, help="Código de idioma (default: auto-detectar)")
+    parser.add_argument('--workers', type=int, default=1, help="Procesos trabajadores (default: 1)")
+    parser.add_argument('--output-dir', default=None,
+                        help="Directorio de salida (default: junto a cada archivo de entrada)")
+    parser.add_argument('--diarize', action='store_true', help="Identificar hablantes (requiere HF_TOKEN)")
+    parser.add_argument('--num-speakers', type=int, default=None, help="Número de hablantes si se conoce")
+    return add_thread_arguments(parser)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    hf_token = None
+    if args.diarize:
+        from dotenv import load_dotenv
+        load_dotenv()
+        hf_token = os.getenv('HF_TOKEN')
+        if not hf_token:
+            print("❌ ERROR: Token de HuggingFace no encontrado (define HF_TOKEN en .env)")
+            return 1
+
+    inputs = collect_inputs(args.inputs)
+    if not inputs:
+        print("No se encontraron archivos de audio en las entradas indicadas")
+        return 1
+
+    try:
+        check_output_collisions(inputs, args.output_dir, args.diarize)
+    except ValueError as e:
+        print(f"❌ ERROR: {e}")
+        return 1
+
+    print(f"Procesando {len(inputs)} archivos con {args.workers} trabajador(es), modelo '{args.model}'...")
+    summary = run_batch(
+        inputs,
+        model_size=args.model,
+        language=args.language,
+        workers=args.workers,
+        output_dir=args.output_dir,
+        diarize=args.diarize,
+        hf_token=hf_token,
+        num_speakers=args.num_speakers,
+        thread_policy=policy_from_args(args),
+        pin=args.pin
+    )
+    print_summary(summary)
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,376 @@
+"""
+Daemon opcional que mantiene los modelos cargados y atiende las CLIs por un socket Unix.
+
+Cada `python -m src.transcribe` vuelve a cargar los pesos de Whisper. Con el
+daemon en marcha las CLIs `src.transcribe` y `src.diarize` le reenvían sus
+argumentos, el directorio actual y las variables de configuración; el daemon
+ejecuta la misma CLI en su proceso (donde el registro de modelos y la caché de
+pipelines ya están calientes) y devuelve la salida por el socket a medida que
+se produce, junto con el código de salida. Si el daemon no está en marcha la
+CLI se ejecuta en su propio proceso como siempre.
+
+Los trabajos se ejecutan de uno en uno (la salida estándar del daemon se
+redirige al cliente durante cada trabajo). El socket sólo es accesible por el
+usuario que arrancó el daemon, y las CLIs sólo envían su trabajo (con sus
+variables, p.ej. HF_TOKEN) a un socket de su mismo usuario.
+
+Uso:
+    python -m src.daemon [--socket RUTA] [--preload base] [--preload-diarization]
+    python -m src.daemon --status | --stop
+
+Configuración por variables de entorno:
+    WHISPER_DAEMON_SOCKET   Ruta del socket (por defecto en $XDG_RUNTIME_DIR o en un
+                            directorio 0700 propio dentro de /tmp)
+    WHISPER_DAEMON=0        Las CLIs no buscan el daemon
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import runpy
+import socket
+import socketserver
+import stat
+import struct
+import sys
+import tempfile
+import threading
+import warnings
+from typing import List, Optional
+
+# CLIs que el daemon puede ejecutar
+COMMANDS = {
+    'transcribe': 'src.transcribe',
+    'diarize': 'src.diarize',
+}
+
+# Variables del cliente que se aplican durante su trabajo
+FORWARDED_ENV_PREFIXES = ('WHISPER_', 'DIARIZE_', 'DIARIZATION_')
+FORWARDED_ENV = ('HF_TOKEN',)
+
+# Espera máxima para conectar con el daemon antes de ejecutar la CLI en el proceso
+CONNECT_TIMEOUT = 0.5
+
+# Hilo que ejecuta un trabajo del daemon (sus CLIs no deben reenviarse a sí mismas)
+_local = threading.local()
+
+
+def socket_path() -> str:
+    """Ruta del socket del daemon (`WHISPER_DAEMON_SOCKET` o una por usuario)."""
+    configured = os.getenv('WHISPER_DAEMON_SOCKET')
+    if configured:
+        return configured
+    uid = os.getuid() if hasattr(os, 'getuid') else 0
+    runtime_dir = os.getenv('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return os.path.join(runtime_dir, f'whisper-daemon-{uid}.sock')
+    # En /tmp cualquier usuario podría crear antes la ruta: directorio 0700 propio
+    return os.path.join(tempfile.gettempdir(), f'whisper-daemon-{uid}', 'daemon.sock')
+
+
+def _owned_by_user(uid: int) -> bool:
+    return not hasattr(os, 'getuid') or uid == os.getuid()
+
+
+def _connect(path: str, timeout: float = CONNECT_TIMEOUT) -> Optional[socket.socket]:
+    """
+    Conecta con el daemon; None si no hay ninguno escuchando en `path`.
+
+    Sólo se conecta a un socket del mismo usuario (comprobado antes de conectar
+    y, donde existe SO_PEERCRED, con las credenciales del proceso que escucha):
+    otro usuario podría haber creado la ruta para recibir los argumentos y las
+    variables del cliente.
+    """
+    if not hasattr(socket, 'AF_UNIX'):
+        return None
+    try:
+        info = os.lstat(path)
+    except OSError:
+        return None
+    if not stat.S_ISSOCK(info.st_mode) or not _owned_by_user(info.st_uid):
+        print(f"Aviso: se ignora {path}: no es un socket de este usuario", file=sys.stderr)
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(path)
+        if hasattr(socket, 'SO_PEERCRED'):
+            credentials = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+            _, peer_uid, _ = struct.unpack('3i', credentials)
+            if not _owned_by_user(peer_uid):
+                print(f"Aviso: se ignora {path}: lo atiende otro usuario", file=sys.stderr)
+                sock.close()
+                return None
+    except OSError:
+        sock.close()
+        return None
+    sock.settimeout(None)
+    return sock
+
+
+def _send(sock_file, message: dict):
+    sock_file.write(json.dumps(message, ensure_ascii=False) + '\n')
+    sock_file.flush()
+
+
+def _client_env() -> dict:
+    return {name: value for name, value in os.environ.items() if _is_forwarded(name)}
+
+
+def forward_to_daemon(command: str, argv: List[str], stdout=None, stderr=None,
+                      path: Optional[str] = None) -> Optional[int]:
+    """
+    Ejecuta una CLI en el daemon si está en marcha, mostrando su salida según llega.
+
+    Args:
+        command (str): 'transcribe' o 'diarize'
+        argv (list): Argumentos de la CLI (sin el nombre del programa)
+        stdout, stderr: Destino de la salida (por defecto los del proceso)
+        path (str): Socket del daemon (None = `socket_path()`)
+
+    Returns:
+        int: Código de salida de la CLI, o None si no hay daemon (el llamador
+        debe ejecutarla en su propio proceso)
+    """
+    if getattr(_local, 'serving', False) or os.getenv('WHISPER_DAEMON', '1').lower() in ('0', 'false', 'no'):
+        return None
+    sock = _connect(path or socket_path())
+    if sock is None:
+        return None
+    stdout = stdout or sys.stdout
+    stderr = stderr or sys.stderr
+    with sock, sock.makefile('rw', encoding='utf-8') as sock_file:
+        _send(sock_file, {'command': command, 'argv': list(argv), 'cwd': os.getcwd(), 'env': _client_env()})
+        for line in sock_file:
+            message = json.loads(line)
+            if 'exit' in message:
+                return message['exit']
+            stream = stderr if message.get('stream') == 'err' else stdout
+            stream.write(message.get('data', ''))
+            stream.flush()
+    print("Error: el daemon de transcripción cerró la conexión antes de terminar", file=stderr)
+    return 1
+
+
+def daemon_request(command: str, path: Optional[str] = None) -> Optional[dict]:
+    """Envía 'ping' o 'shutdown' al daemon. Devuelve su respuesta (None si no está en marcha)."""
+    sock = _connect(path or socket_path())
+    if sock is None:
+        return None
+    with sock, sock.makefile('rw', encoding='utf-8') as sock_file:
+        _send(sock_file, {'command': command})
+        line = sock_file.readline()
+    return json.loads(line) if line else None
+
+
+class _StreamWriter(io.TextIOBase):
+    """Salida de texto que se envía al cliente como mensajes JSON por líneas."""
+
+    def __init__(self, sock_file, stream: str):
+        self._sock_file = sock_file
+        self._stream = stream
+        self.connected = True
+
+    def writable(self):
+        return True
+
+    def write(self, data: str) -> int:
+        if data and self.connected:
+            try:
+                _send(self._sock_file, {'stream': self._stream, 'data': data})
+            except OSError:
+                # El cliente se fue: el trabajo termina igualmente (sus archivos se guardan)
+                self.connected = False
+        return len(data)
+
+
+def _is_forwarded(name: str) -> bool:
+    return name in FORWARDED_ENV or name.startswith(FORWARDED_ENV_PREFIXES)
+
+
+@contextlib.contextmanager
+def _client_context(cwd: str, env: dict):
+    """
+    Directorio y configuración del cliente durante un trabajo (restaurados al salir).
+
+    Las variables reenviables que el cliente no tiene se quitan, para que el
+    trabajo se comporte igual que si la CLI se ejecutara en su proceso.
+    """
+    previous_cwd = os.getcwd()
+    os.chdir(cwd)
+    names = set(env) | {name for name in os.environ if _is_forwarded(name)}
+    previous_env = {name: os.environ.get(name) for name in names}
+    for name in names:
+        if name in env:
+            os.environ[name] = env[name]
+        else:
+            os.environ.pop(name, None)
+    try:
+        yield
+    finally:
+        os.chdir(previous_cwd)
+        for name, value in previous_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def run_cli(command: str, argv: List[str]) -> int:
+    """Ejecuta una CLI como `python -m` en este proceso y devuelve su código de salida."""
+    module = COMMANDS[command]
+    previous_argv = sys.argv
+    sys.argv = [module] + list(argv)
+    _local.serving = True
+    try:
+        with warnings.catch_warnings():
+            # runpy avisa de que el módulo ya está importado: es justo lo que se busca
+            warnings.simplefilter('ignore', RuntimeWarning)
+            runpy.run_module(module, run_name='__main__')
+        return 0
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        print(e.code)
+        return 1
+    finally:
+        _local.serving = False
+        sys.argv = previous_argv
+
+
+class DaemonHandler(socketserver.StreamRequestHandler):
+    """Atiende una conexión: un trabajo de CLI, 'ping' o 'shutdown'."""
+
+    def handle(self):
+        sock_file = io.TextIOWrapper(self.wfile, encoding='utf-8', write_through=True)
+        line = self.rfile.readline()
+        if not line:
+            return
+        request = json.loads(line.decode('utf-8'))
+        command = request.get('command')
+        if command == 'ping':
+            _send(sock_file, {'pid': os.getpid(), 'busy': self.server.busy})
+            return
+        if command == 'shutdown':
+            _send(sock_file, {'pid': os.getpid(), 'stopping': True})
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return
+        if command not in COMMANDS:
+            _send(sock_file, {'stream': 'err', 'data': f"Comando desconocido: {command}\n"})
+            _send(sock_file, {'exit': 2})
+            return
+
+        out, err = _StreamWriter(sock_file, 'out'), _StreamWriter(sock_file, 'err')
+        with self.server.job_lock:
+            self.server.busy = True
+            try:
+                with _client_context(request.get('cwd') or os.getcwd(), request.get('env') or {}), \
+                        contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+                    code = run_cli(command, request.get('argv') or [])
+            except Exception as e:
+                err.write(f"Error en el daemon: {e}\n")
+                code = 1
+            finally:
+                self.server.busy = False
+        if out.connected:
+            with contextlib.suppress(OSError):
+                _send(sock_file, {'exit': code})
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Servidor del daemon: un hilo por conexión, un trabajo a la vez."""
+
+    daemon_threads = True
+
+    def __init__(self, path: str):
+        self.job_lock = threading.Lock()
+        self.busy = False
+        # Sólo el usuario que arrancó el daemon puede usarlo: el socket se crea ya
+        # con 0600 (un chmod tras bind dejaría una ventana con los permisos del umask)
+        umask = os.umask(0o177)
+        try:
+            super().__init__(path, DaemonHandler)
+        finally:
+            os.umask(umask)
+
+    def server_close(self):
+        super().server_close()
+        with contextlib.suppress(OSError):
+            os.unlink(self.server_address)
+
+
+def make_daemon(path: Optional[str] = None) -> DaemonServer:
+    """
+    Crea el servidor del daemon en `path` (sin arrancarlo).
+
+    Raises:
+        RuntimeError: Si ya hay un daemon escuchando en ese socket
+    """
+    path = path or socket_path()
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory, mode=0o700)
+    if os.path.lexists(path):
+        if daemon_request('ping', path) is not None:
+            raise RuntimeError(f"Ya hay un daemon escuchando en {path}")
+        os.unlink(path)  # socket de un daemon que terminó sin limpiar
+    return DaemonServer(path)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.daemon",
+        description="Daemon que mantiene los modelos cargados para las CLIs de transcripción."
+    )
+    parser.add_argument('--socket', default=None, help="Ruta del socket (default: WHISPER_DAEMON_SOCKET)")
+    parser.add_argument('--preload', action='append', default=[], metavar='MODELO',
+                        help="Modelo Whisper a cargar al arrancar (se puede repetir)")
+    parser.add_argument('--preload-diarization', action='store_true',
+                        help="Cargar también el pipeline de pyannote (requiere HF_TOKEN)")
+    parser.add_argument('--status', action='store_true', help="Indicar si el daemon está en marcha")
+    parser.add_argument('--stop', action='store_true', help="Detener el daemon en marcha")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    path = args.socket or socket_path()
+
+    if args.status or args.stop:
+        reply = daemon_request('shutdown' if args.stop else 'ping', path)
+        if reply is None:
+            print(f"No hay ningún daemon en {path}")
+            return 1
+        state = "deteniéndose" if args.stop else ("ocupado" if reply['busy'] else "libre")
+        print(f"Daemon en {path} (pid {reply['pid']}): {state}")
+        return 0
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    try:
+        server = make_daemon(path)
+    except (RuntimeError, OSError) as e:
+        print(f"❌ ERROR: {e}")
+        return 1
+
+    hf_token = os.getenv('HF_TOKEN') if args.preload_diarization else None
+    if args.preload or hf_token:
+        from .diarize import warm_up_models
+        for i, model in enumerate(args.preload or ['base']):
+            info = warm_up_models(model, hf_token if i == 0 else None)
+            print(f"Modelo '{model}' cargado en {info['seconds']:.1f}s")
+
+    print(f"Daemon escuchando en {path} (pid {os.getpid()})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print("Daemon detenido")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
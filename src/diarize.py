@@ -2,40 +2,70 @@
 Módulo para transcribir audio con diarización de hablantes
 Combina Whisper (transcripción) con pyannote.audio (identificación de hablantes)
 """
-import whisper
 import os
 from pathlib import Path
-from typing import Optional
-import torch
+from typing import Callable, Optional
 from dotenv import load_dotenv
 import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from .lazy_import import LazyModule
+from .model_registry import get_model
+from .pipeline_cache import get_pipeline_cache
+from .prefetch import get_prefetched, prefetched_hash
+from .progress import ProgressEvent, ProgressPrinter, ProgressTracker, has_listeners, subscribe, unsubscribe
+from .result_cache import cache_enabled, diarization_cache, make_key
+from .speaker_assignment import SpeakerTurns, attribute_speakers
+from .thread_policy import ThreadPolicy, apply_thread_policy
+from .transcribe import publish_segments, transcribe_with_progress
+from .vad import transcribe_speech_only, vad_enabled
+
+# Whisper y torch se importan en el primer uso, no al cargar el módulo
+whisper = LazyModule('whisper')
+torch = LazyModule('torch')
 
 # Cargar variables de entorno desde .env
 load_dotenv()
 
-# Limitar a 1 hilo por procesador físico (proteger llamadas que pueden fallar en entornos ya inicializados)
-NUM_CORES = os.cpu_count() or 4
-try:
-    torch.set_num_threads(NUM_CORES)  # 1 thread por core
-except Exception:
-    pass
-try:
-    torch.set_num_interop_threads(1)  # Mínimo para interoperabilidad
-except Exception:
-    pass
+# Pipeline de pyannote usado para la diarización
+DIARIZATION_PIPELINE = "pyannote/speaker-diarization-3.1"
+
+# Paquetes cuya versión forma parte de la clave de la caché de diarizaciones
+DIARIZATION_PACKAGES = ('pyannote.audio', 'torch')
+
+
+# Frecuencia de muestreo común a pyannote y Whisper
+SAMPLE_RATE = 16000
+
+# Tramo del progreso de la etapa 'diarize' que ocupa cada paso de pyannote
+# (los embeddings son, con diferencia, el paso más caro)
+DIARIZATION_STEPS = {
+    'segmentation': (0.0, 0.3),
+    'speaker_counting': (0.3, 0.3),
+    'embeddings': (0.3, 0.95),
+    'discrete_diarization': (0.95, 1.0),
+}
 
 
-def normalize_audio_for_diarization(audio_path: str) -> str:
+def decode_audio(audio_path: str) -> dict:
     """
-    Normaliza el audio a formato WAV con 16kHz mono para compatibilidad con pyannote.
+    Decodifica el audio una sola vez a 16kHz mono en memoria.
+
+    El resultado se entrega tal cual a pyannote (que acepta un diccionario
+    {"waveform", "sample_rate"}) y su canal único a Whisper, de modo que el
+    archivo original no se vuelve a decodificar con ffmpeg.
     
     Args:
         audio_path (str): Ruta al archivo de audio original
     
     Returns:
-        str: Ruta al archivo temporal normalizado
+        dict: {"waveform": tensor float32 (1, muestras), "sample_rate": 16000}
     """
-    print("Normalizando audio para diarización...")
+    prefetched = get_prefetched(audio_path)
+    if prefetched is not None:
+        # Ya decodificado de forma especulativa: sólo envolverlo como tensor
+        return {"waveform": torch.from_numpy(prefetched.samples).unsqueeze(0), "sample_rate": SAMPLE_RATE}
     
     # Cargar audio con torchaudio (importar aquí para evitar coste en importación del módulo)
     try:
@@ -50,24 +80,301 @@ def normalize_audio_for_diarization(audio_path: str) -> str:
         waveform = torch.mean(waveform, dim=0, keepdim=True)
     
     # Resamplear a 16kHz si es necesario
-    if sample_rate != 16000:
-        resampler = torchaudio.transforms.Resample(sample_rate, 16000)
+    if sample_rate != SAMPLE_RATE:
+        resampler = torchaudio.transforms.Resample(sample_rate, SAMPLE_RATE)
         waveform = resampler(waveform)
     
-    # Guardar en archivo temporal
+    return {"waveform": waveform, "sample_rate": SAMPLE_RATE}
+
+
+def normalize_audio_for_diarization(audio_path: str, in_memory: bool = False):
+    """
+    Normaliza el audio a formato WAV con 16kHz mono para compatibilidad con pyannote.
+    
+    Args:
+        audio_path (str): Ruta al archivo de audio original
+        in_memory (bool): Si es True no se escribe nada en disco y se devuelve el
+            diccionario {"waveform", "sample_rate"} que pyannote acepta directamente
+    
+    Returns:
+        str | dict: Ruta al archivo temporal normalizado (el llamador debe borrarlo)
+        o el audio en memoria si `in_memory` es True
+    """
+    print("Normalizando audio para diarización...")
+    
+    audio = decode_audio(audio_path)
+    if in_memory:
+        return audio
+    
+    import torchaudio
+    
+    # Guardar en archivo temporal (se borra si la escritura falla)
     temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
-    torchaudio.save(temp_file.name, waveform, 16000)
+    temp_file.close()
+    try:
+        torchaudio.save(temp_file.name, audio["waveform"], audio["sample_rate"])
+    except Exception:
+        _remove_file(temp_file.name)
+        raise
     
     print(f"Audio normalizado guardado en: {temp_file.name}")
     return temp_file.name
 
 
+def _remove_file(path: str):
+    """Borra un archivo ignorando que ya no exista."""
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+@contextmanager
+def diarization_input(audio: dict, in_memory: bool = True):
+    """
+    Prepara la entrada de pyannote a partir del audio ya decodificado.
+
+    En modo en memoria entrega el propio diccionario {"waveform", "sample_rate"}
+    sin tocar el disco. El modo alternativo escribe un WAV temporal que se borra
+    al salir del bloque, también si la diarización lanza una excepción.
+
+    Args:
+        audio (dict): Resultado de `decode_audio`
+        in_memory (bool): False para pasar a pyannote un WAV temporal
+
+    Yields:
+        dict | str: Entrada para el pipeline de pyannote
+    """
+    if in_memory:
+        yield audio
+        return
+
+    import torchaudio
+
+    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
+    temp_file.close()
+    try:
+        torchaudio.save(temp_file.name, audio["waveform"], audio["sample_rate"])
+        yield temp_file.name
+    finally:
+        _remove_file(temp_file.name)
+
+
+def load_diarization_pipeline(hf_token: str, pipeline_params: Optional[dict] = None):
+    """
+    Obtiene el pipeline de diarización desde la caché del proceso.
+
+    La primera llamada instancia el pipeline (y lo mueve a GPU si está disponible);
+    las siguientes con el mismo dispositivo e hiperparámetros lo reutilizan.
+    También sirve como warm-up explícito antes de procesar un lote.
+
+    Args:
+        hf_token (str): Token de HuggingFace para acceder a pyannote
+        pipeline_params (dict): Hiperparámetros del pipeline (opcional)
+
+    Returns:
+        Pipeline de pyannote listo para usar
+    """
+    # Importar dentro de la función para pruebas y entornos ligeros
+    from pyannote.audio import Pipeline
+
+    # Usar GPU si está disponible
+    device = "cuda" if torch.cuda.is_available() else None
+
+    return get_pipeline_cache().get(
+        DIARIZATION_PIPELINE,
+        hf_token=hf_token,
+        device=device,
+        params=pipeline_params,
+        loader=Pipeline.from_pretrained
+    )
+
+
+def release_diarization_pipeline(pipeline_params: Optional[dict] = None) -> bool:
+    """
+    Libera el pipeline de diarización de la caché para recuperar su memoria.
+
+    Args:
+        pipeline_params (dict): Hiperparámetros con los que se cargó (opcional)
+
+    Returns:
+        bool: True si había un pipeline cargado
+    """
+    device = "cuda" if torch.cuda.is_available() else None
+    return get_pipeline_cache().release(DIARIZATION_PIPELINE, device=device, params=pipeline_params)
+
+
+def warm_up_models(
+    model_size: str,
+    hf_token: Optional[str] = None,
+    thread_policy: Optional[ThreadPolicy] = None
+) -> dict:
+    """
+    Carga por adelantado el modelo Whisper (y el pipeline de diarización si hay
+    token) en las cachés del proceso, para que el siguiente trabajo empiece ya.
+
+    Args:
+        model_size (str): Tamaño del modelo Whisper
+        hf_token (str): Token de HuggingFace; si se indica también se carga pyannote
+        thread_policy (ThreadPolicy): Política de hilos (None = variables de entorno)
+
+    Returns:
+        dict: model_size, pipeline (bool) y seconds (tiempo de carga)
+    """
+    t0 = time.perf_counter()
+    apply_thread_policy(thread_policy)
+    get_model(model_size, loader=whisper.load_model)
+    if hf_token:
+        load_diarization_pipeline(hf_token)
+    return {'model_size': model_size, 'pipeline': bool(hf_token), 'seconds': time.perf_counter() - t0}
+
+
+def _audio_seconds(audio: dict) -> Optional[float]:
+    """Duración del audio decodificado (None si no se conoce)."""
+    shape = getattr(audio.get("waveform"), "shape", None)
+    return shape[-1] / audio["sample_rate"] if shape else None
+
+
+def _diarization_hook(tracker: ProgressTracker) -> Callable:
+    """Convierte los avisos de progreso de pyannote (`hook=`) en eventos de la etapa 'diarize'."""
+    def hook(step_name, step_artifact, file=None, total=None, completed=None):
+        if step_name not in DIARIZATION_STEPS or not tracker.total_seconds:
+            return
+        first, last = DIARIZATION_STEPS[step_name]
+        fraction = first + (last - first) * completed / total if total and completed is not None else last
+        tracker.update(tracker.total_seconds * fraction)
+    return hook
+
+
+def _run_diarization(audio: dict, hf_token: str, num_speakers: Optional[int],
+                     pipeline_params: Optional[dict], in_memory: bool, num_threads: Optional[int] = None,
+                     tracker: Optional[ProgressTracker] = None):
+    """Etapa de diarización sobre el audio ya decodificado."""
+    if num_threads:
+        _set_worker_threads(num_threads)
+    
+    # Cargar pipeline de diarización (reutilizado entre llamadas)
+    pipeline = load_diarization_pipeline(hf_token, pipeline_params)
+    
+    # Realizar diarización
+    diarization_params = {}
+    if num_speakers:
+        diarization_params['num_speakers'] = num_speakers
+    if tracker is not None and has_listeners(tracker.on_progress):
+        diarization_params['hook'] = _diarization_hook(tracker)
+    
+    with diarization_input(audio, in_memory) as pipeline_input:
+        diarization = pipeline(pipeline_input, **diarization_params)
+    if tracker is not None:
+        tracker.finish()
+    return diarization
+
+
+def _run_transcription(audio: dict, model_size: str, language: Optional[str],
+                       num_threads: Optional[int] = None, vad: bool = False,
+                       tracker: Optional[ProgressTracker] = None) -> dict:
+    """Etapa de transcripción con Whisper sobre el audio ya decodificado."""
+    if num_threads:
+        _set_worker_threads(num_threads)
+    
+    # Cargar modelo Whisper (o reutilizarlo si ya está en memoria)
+    model = get_model(model_size, loader=whisper.load_model)
+    
+    # Opciones de transcripción
+    options = {"word_timestamps": True}
+    if language:
+        options['language'] = language
+    
+    # Realizar transcripción sobre el buffer ya decodificado
+    if vad:
+        # Timestamps devueltos a la línea de tiempo original: la combinación con los turnos no cambia
+        result = transcribe_speech_only(model, audio["waveform"][0].numpy(), audio["sample_rate"], **options)
+    elif tracker is not None and has_listeners(tracker.on_progress):
+        # Con oyentes, el avance y los segmentos se publican tras cada ventana de Whisper
+        return transcribe_with_progress(model, audio["waveform"][0], tracker, **options)
+    else:
+        result = model.transcribe(audio["waveform"][0], **options)
+    if tracker is not None:
+        publish_segments(result, tracker)
+    return result
+
+
+def _set_worker_threads(num_threads: int):
+    """
+    Fija los hilos intra-op de torch para el hilo actual.
+
+    Con los builds de torch basados en OpenMP el valor se aplica al hilo que lo
+    llama, así que cada etapa concurrente respeta su parte del presupuesto.
+    """
+    try:
+        torch.set_num_threads(num_threads)
+    except Exception:
+        pass
+
+
+def split_thread_budget(total: int, parts: int = 2) -> list:
+    """
+    Reparte un presupuesto de hilos de CPU entre etapas concurrentes.
+
+    Args:
+        total (int): Hilos disponibles
+        parts (int): Número de etapas
+
+    Returns:
+        list: Hilos por etapa (al menos 1 cada una; las primeras reciben el resto)
+    """
+    base, extra = divmod(max(total, parts), parts)
+    return [base + (1 if i < extra else 0) for i in range(parts)]
+
+
+def _cached_diarization(audio_path: str, num_speakers: Optional[int], pipeline_params: Optional[dict]):
+    """
+    Busca la diarización de un audio en la caché en disco.
+
+    La clave sólo depende del contenido del audio, el pipeline (nombre,
+    hiperparámetros y versión de pyannote) y el número de hablantes.
+
+    Returns:
+        tuple: (SpeakerTurns o None si no está guardada, clave o None si la caché no está disponible)
+    """
+    try:
+        key = make_key(prefetched_hash(audio_path), packages=DIARIZATION_PACKAGES, task='diarize',
+                       pipeline=DIARIZATION_PIPELINE, params=pipeline_params, num_speakers=num_speakers)
+        cached = diarization_cache().get(key)
+    except OSError as e:
+        print(f"Aviso: caché de diarizaciones no disponible: {e}")
+        return None, None
+    return (SpeakerTurns.from_dict(cached) if cached is not None else None), key
+
+
+def _store_diarization(key: str, diarization, audio_path: str, num_speakers: Optional[int]) -> SpeakerTurns:
+    """Guarda los turnos de una diarización en la caché y los devuelve materializados."""
+    turns = SpeakerTurns.from_diarization(diarization)
+    try:
+        diarization_cache().put(key, turns.to_dict(), {
+            'audio_path': os.path.abspath(audio_path),
+            'pipeline': DIARIZATION_PIPELINE,
+            'num_speakers': num_speakers,
+        })
+    except (OSError, TypeError, ValueError) as e:
+        print(f"Aviso: no se pudo guardar la diarización en la caché: {e}")
+    return turns
+
+
 def transcribe_with_speaker_diarization(
     audio_path: str,
     hf_token: str,
     model_size: str = "base",
     language: Optional[str] = None,
-    num_speakers: Optional[int] = None
+    num_speakers: Optional[int] = None,
+    pipeline_params: Optional[dict] = None,
+    in_memory: bool = True,
+    concurrent: Optional[bool] = None,
+    vad: Optional[bool] = None,
+    cache: Optional[bool] = None,
+    job_dir: Optional[str] = None,
+    thread_policy: Optional[ThreadPolicy] = None,
+    on_progress: Optional[Callable[[ProgressEvent], None]] = None
 ) -> list:
     """
     Transcribe un archivo de audio identificando quién habla en cada momento.
@@ -78,6 +385,28 @@ def transcribe_with_speaker_diarization(
         model_size (str): Tamaño del modelo Whisper ('tiny', 'base', 'small', 'medium', 'large')
         language (str): Idioma del audio (ej: 'es', 'en'). Si es None, se detecta automáticamente
         num_speakers (int): Número de hablantes (opcional, si se conoce de antemano)
+        pipeline_params (dict): Hiperparámetros del pipeline de pyannote (opcional)
+        in_memory (bool): Pasar el audio a pyannote en memoria (por defecto) o,
+            si es False, mediante un WAV temporal que siempre se borra
+        concurrent (bool): Ejecutar diarización y transcripción a la vez en dos
+            hilos, repartiendo entre ellos los hilos de CPU de torch. Si es None
+            se usa la variable de entorno `DIARIZE_CONCURRENT` (1/true para activarlo)
+        vad (bool): Transcribir sólo las regiones con voz (la diarización sigue
+            usando el audio completo). Si es None se usa `WHISPER_VAD`
+        cache (bool): Reutilizar la diarización guardada en disco para el mismo
+            audio, pipeline y número de hablantes; al cambiar el modelo Whisper o
+            el idioma sólo se repite la transcripción. Si es None se usa
+            `WHISPER_CACHE` (activa por defecto)
+        job_dir (str): Directorio de checkpoints. Si se indica, el trabajo guarda
+            cada etapa (audio normalizado, diarización, ventanas de Whisper) y al
+            relanzarlo se reanuda desde el último checkpoint (ver `src/diarize_job.py`).
+            No se combina con `vad=True` ni `concurrent=True` (ValueError); con
+            `job_dir` se ignoran `WHISPER_VAD` y `DIARIZE_CONCURRENT`
+        thread_policy (ThreadPolicy): Hilos/afinidad de CPU a aplicar al empezar
+            (None = variables de entorno, ver `src/thread_policy.py`)
+        on_progress (callable): Recibe los `ProgressEvent` de cada etapa ('decode',
+            'diarize', 'transcribe', 'merge'); también los suscriptores de
+            `src.progress.subscribe`
     
     Returns:
         list: Lista de segmentos con texto, hablante y timestamps
@@ -86,67 +415,93 @@ def transcribe_with_speaker_diarization(
     if not os.path.exists(audio_path):
         raise FileNotFoundError(f"El archivo {audio_path} no existe")
     
-    # Normalizar audio para pyannote
-    normalized_audio = normalize_audio_for_diarization(audio_path)
-    
-    print("Paso 1/3: Identificando hablantes con pyannote.audio...")
-    
-    # Cargar pipeline de diarización (importar dentro de la función para pruebas y entornos ligeros)
-    from pyannote.audio import Pipeline
-    pipeline = Pipeline.from_pretrained(
-        "pyannote/speaker-diarization-3.1",
-        token=hf_token
-    )
-    
-    # Usar GPU si está disponible
-    if torch.cuda.is_available():
-        pipeline.to(torch.device("cuda"))
-    
-    # Realizar diarización
-    diarization_params = {}
-    if num_speakers:
-        diarization_params['num_speakers'] = num_speakers
-    
-    diarization = pipeline(normalized_audio, **diarization_params)
-    
-    # Limpiar archivo temporal
-    try:
-        os.unlink(normalized_audio)
-    except Exception:
-        pass
-    
-    print(f"Paso 2/3: Transcribiendo audio con Whisper '{model_size}'...")
-    
-    # Cargar modelo Whisper
-    model = whisper.load_model(model_size)
-    
-    # Opciones de transcripción
-    options = {"word_timestamps": True}
-    if language:
-        options['language'] = language
+    apply_thread_policy(thread_policy)
+    
+    if job_dir:
+        # Los trabajos transcriben por ventanas con checkpoint, una etapa tras otra
+        if vad or concurrent:
+            raise ValueError("job_dir no admite vad ni concurrent: el trabajo transcribe por ventanas "
+                             "con checkpoint, una etapa tras otra")
+        from .diarize_job import run_diarization_job
+        return run_diarization_job(audio_path, job_dir, hf_token, model_size, language,
+                                   num_speakers, pipeline_params, thread_policy=thread_policy,
+                                   in_memory=in_memory, cache=cache, on_progress=on_progress)
+    
+    # Decodificar una sola vez: el mismo buffer de 16kHz mono sirve a pyannote y a Whisper
+    print("Decodificando audio (16kHz mono)...")
+    decode_tracker = ProgressTracker('decode', None, audio_path, on_progress)
+    decode_tracker.update(0.0)
+    audio = decode_audio(audio_path)
+    duration = _audio_seconds(audio)
+    decode_tracker.total_seconds = duration
+    decode_tracker.finish()
+    
+    def stage(name):
+        return ProgressTracker(name, duration, audio_path, on_progress)
+    
+    if concurrent is None:
+        concurrent = os.getenv('DIARIZE_CONCURRENT', '').lower() in ('1', 'true', 'yes')
+    vad = vad_enabled(vad)
+    
+    diarization, diarization_key = None, None
+    if cache_enabled(cache):
+        diarization, diarization_key = _cached_diarization(audio_path, num_speakers, pipeline_params)
+    
+    if diarization is not None:
+        print("Paso 1/3: Diarización recuperada de la caché")
+        stage('diarize').finish()
+        print(f"Paso 2/3: Transcribiendo audio con Whisper '{model_size}'...")
+        result = _run_transcription(audio, model_size, language, vad=vad, tracker=stage('transcribe'))
+    elif concurrent:
+        # Ambas etapas sólo dependen del audio decodificado: se lanzan en paralelo
+        # y se unen antes de combinar resultados
+        total_threads = torch.get_num_threads()
+        diar_threads, whisper_threads = split_thread_budget(total_threads)
+        print(f"Pasos 1-2/3: Diarización ({diar_threads} hilos) y transcripción con Whisper "
+              f"'{model_size}' ({whisper_threads} hilos) en paralelo...")
+        try:
+            with ThreadPoolExecutor(max_workers=2, thread_name_prefix='diarize') as executor:
+                diarization_future = executor.submit(
+                    _run_diarization, audio, hf_token, num_speakers, pipeline_params, in_memory, diar_threads,
+                    stage('diarize')
+                )
+                transcription_future = executor.submit(
+                    _run_transcription, audio, model_size, language, whisper_threads, vad, stage('transcribe')
+                )
+                diarization = diarization_future.result()
+                result = transcription_future.result()
+        finally:
+            # En builds sin OpenMP el ajuste es global: restaurar el presupuesto completo
+            _set_worker_threads(total_threads)
+    else:
+        print("Paso 1/3: Identificando hablantes con pyannote.audio...")
+        diarization = _run_diarization(audio, hf_token, num_speakers, pipeline_params, in_memory,
+                                       tracker=stage('diarize'))
+        
+        print(f"Paso 2/3: Transcribiendo audio con Whisper '{model_size}'...")
+        result = _run_transcription(audio, model_size, language, vad=vad, tracker=stage('transcribe'))
     
-    # Realizar transcripción
-    result = model.transcribe(audio_path, **options)
+    if diarization_key is not None and not isinstance(diarization, SpeakerTurns):
+        diarization = _store_diarization(diarization_key, diarization, audio_path, num_speakers)
     
     print("Paso 3/3: Combinando transcripción con identificación de hablantes...")
+    merge_tracker = stage('merge')
     
-    # Combinar diarización con transcripción
+    # Combinar diarización con transcripción: los turnos se materializan una vez
+    # y los solapamientos de todos los segmentos se calculan en bloque
+    attribution = attribute_speakers(diarization, result['segments'])
     segments_with_speakers = []
     
-    for segment in result['segments']:
-        start_time = segment['start']
-        end_time = segment['end']
-        text = segment['text']
-        
-        # Encontrar el hablante más probable para este segmento
-        speaker = get_speaker_for_segment(diarization, start_time, end_time)
-        
+    for segment, speaker, ratio in zip(result['segments'], attribution.speakers, attribution.ratios.tolist()):
         segments_with_speakers.append({
-            'start': start_time,
-            'end': end_time,
+            'start': segment['start'],
+            'end': segment['end'],
             'speaker': speaker,
-            'text': text
+            'text': segment['text'],
+            # Fracción del segmento cubierta por el hablante asignado (0..1)
+            'speaker_overlap': ratio
         })
+    merge_tracker.finish()
     
     return segments_with_speakers
 
@@ -240,15 +595,26 @@ def save_diarized_transcription(segments: list, output_path: str, format_type: s
 
 if __name__ == "__main__":
     import sys
+    from .daemon import forward_to_daemon
+    
+    # Con el daemon en marcha (python -m src.daemon) la CLI se ejecuta allí, con el modelo ya cargado
+    exit_code = forward_to_daemon('diarize', sys.argv[1:])
+    if exit_code is not None:
+        sys.exit(exit_code)
+    
+    # --progress: mostrar el avance de cada etapa con la ETA
+    progress = '--progress' in sys.argv
+    sys.argv = [arg for arg in sys.argv if arg != '--progress']
     
     if len(sys.argv) < 2:
-        print("Uso: python diarize.py <archivo_audio> [hf_token] [modelo] [idioma] [num_speakers]")
+        print("Uso: python diarize.py <archivo_audio> [hf_token] [modelo] [idioma] [num_speakers] [--progress]")
         print("\nArgumentos:")
         print("  archivo_audio: Ruta al archivo de audio")
         print("  hf_token: Token de HuggingFace (opcional si está en .env)")
         print("  modelo: Tamaño del modelo Whisper (default: base)")
         print("  idioma: Código de idioma (ej: es, en) (default: auto-detectar)")
         print("  num_speakers: Número de hablantes si se conoce (opcional)")
+        print("  --progress: muestra el avance de cada etapa (audio procesado, RTF, ETA)")
         print("\nEjemplo con token en .env:")
         print("  python diarize.py audio.mp3 base es 3")
         print("\nEjemplo con token explícito:")
@@ -294,13 +660,18 @@ if __name__ == "__main__":
         if _transcribe_fn is None:
             _transcribe_fn = transcribe_with_speaker_diarization
 
-        segments = _transcribe_fn(
-            audio_file,
-            token,
-            model,
-            lang,
-            num_spk
-        )
+        printer = subscribe(ProgressPrinter()) if progress else None
+        try:
+            segments = _transcribe_fn(
+                audio_file,
+                token,
+                model,
+                lang,
+                num_spk
+            )
+        finally:
+            if printer is not None:
+                unsubscribe(printer)
         
         print("\n" + "="*60)
         print("TRANSCRIPCIÓN CON IDENTIFICACIÓN DE HABLANTES")
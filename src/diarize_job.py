@@ -0,0 +1,392 @@
+"""
+Trabajos de diarización con checkpoints, reanudables tras una interrupción.
+
+Cada etapa completada se guarda en un directorio de trabajo:
+
+    <job_dir>/manifest.json       Huellas de los parámetros de cada etapa
+    <job_dir>/audio_16k.npy       Audio normalizado (16kHz mono, float32)
+    <job_dir>/diarization.json    Turnos de pyannote (`SpeakerTurns.to_dict`)
+    <job_dir>/windows/NNNNN.json  Segmentos de Whisper de cada ventana completada
+    <job_dir>/result.json         Segmentos finales con hablante
+
+Al relanzar el trabajo con el mismo directorio se reutiliza todo lo que siga
+siendo válido (misma huella) y sólo se calcula lo que falta: si el proceso
+muere al 90% de la transcripción, se retoma en la primera ventana pendiente.
+
+Uso:
+    python -m src.diarize_job <audio> --job-dir trabajo/ [--model base] [--language es]
+                              [--num-speakers 2] [--window 600] [--status]
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import Iterator, List, Optional
+from .thread_policy import add_thread_arguments, policy_from_args
+
+# Duración de cada ventana de transcripción con checkpoint (segundos)
+DEFAULT_JOB_WINDOW = 600.0
+
+# Versión del formato de las ventanas guardadas (un cambio invalida las de trabajos anteriores)
+JOB_WINDOWS_FORMAT = 2
+
+
+def _write_json(path: Path, data):
+    """Escritura atómica: un checkpoint nunca queda a medias."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _read_json(path: Path):
+    """Lee un checkpoint (None si no existe o está dañado)."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class DiarizationJob:
+    """Estado en disco de un trabajo de diarización + transcripción."""
+
+    def __init__(self, job_dir: str):
+        self.dir = Path(job_dir)
+        self.audio_file = self.dir / 'audio_16k.npy'
+        self.diarization_file = self.dir / 'diarization.json'
+        self.windows_dir = self.dir / 'windows'
+        self.result_file = self.dir / 'result.json'
+        self.manifest_file = self.dir / 'manifest.json'
+
+    def load_manifest(self) -> dict:
+        return _read_json(self.manifest_file) or {}
+
+    def validate(self, fingerprints: dict) -> List[str]:
+        """
+        Descarta los checkpoints cuya huella no coincide con los parámetros actuales.
+
+        Una etapa inválida invalida también las que dependen de ella.
+
+        Args:
+            fingerprints (dict): Huella esperada de 'normalization', 'diarization' y 'transcription'
+
+        Returns:
+            list: Etapas descartadas de un trabajo anterior ([] si el trabajo es nuevo)
+        """
+        self.dir.mkdir(parents=True, exist_ok=True)
+        manifest = self.load_manifest()
+        discarded = []
+        if manifest.get('normalization') != fingerprints['normalization']:
+            discarded += ['normalization', 'diarization', 'transcription']
+        else:
+            for stage in ('diarization', 'transcription'):
+                if manifest.get(stage) != fingerprints[stage]:
+                    discarded.append(stage)
+
+        if 'normalization' in discarded and self.audio_file.exists():
+            self.audio_file.unlink()
+        if 'diarization' in discarded and self.diarization_file.exists():
+            self.diarization_file.unlink()
+        if 'transcription' in discarded and self.windows_dir.exists():
+            shutil.rmtree(self.windows_dir)
+        if discarded and self.result_file.exists():
+            self.result_file.unlink()
+
+        self.windows_dir.mkdir(exist_ok=True)
+        _write_json(self.manifest_file, fingerprints)
+        return discarded if manifest else []
+
+    def window_path(self, index: int) -> Path:
+        return self.windows_dir / f"{index:05d}.json"
+
+    def completed_windows(self) -> List[dict]:
+        """Ventanas consecutivas ya completadas, desde la primera."""
+        windows = []
+        while True:
+            window = _read_json(self.window_path(len(windows)))
+            if window is None:
+                return windows
+            windows.append(window)
+
+    def status(self) -> dict:
+        """Resumen del progreso del trabajo."""
+        windows = self.completed_windows() if self.windows_dir.exists() else []
+        return {
+            'normalization': self.audio_file.exists(),
+            'diarization': self.diarization_file.exists(),
+            'windows': len(windows),
+            'transcribed_seconds': windows[-1]['next_offset'] if windows else 0.0,
+            'finished': self.result_file.exists(),
+        }
+
+
+def job_fingerprints(
+    audio_hash: str,
+    model_size: str,
+    language: Optional[str],
+    num_speakers: Optional[int],
+    pipeline_params: Optional[dict],
+    window_seconds: float
+) -> dict:
+    """Huella de cada etapa: sólo cambia si cambian los parámetros de los que depende."""
+    from .diarize import DIARIZATION_PACKAGES, DIARIZATION_PIPELINE, SAMPLE_RATE
+    from .result_cache import make_key
+
+    return {
+        'normalization': make_key(audio_hash, packages=('torchaudio',), task='normalize', sample_rate=SAMPLE_RATE),
+        'diarization': make_key(audio_hash, packages=DIARIZATION_PACKAGES, task='diarize',
+                                pipeline=DIARIZATION_PIPELINE, params=pipeline_params, num_speakers=num_speakers),
+        'transcription': make_key(audio_hash, task='transcribe_windows', model_size=model_size,
+                                  language=language, window_seconds=window_seconds,
+                                  windows_format=JOB_WINDOWS_FORMAT),
+    }
+
+
+def _sample_windows(samples, offset: float, decoded: float, window_samples: int) -> Iterator:
+    """
+    Ventanas del audio del trabajo a partir de `offset`.
+
+    La primera llega hasta `decoded` más una ventana: así, al reanudar, cada
+    buffer es el mismo que si el trabajo no se hubiera interrumpido (el audio
+    arrastrado de la ventana anterior más una ventana nueva).
+    """
+    import numpy as np
+    from .diarize import SAMPLE_RATE
+
+    start = int(round(offset * SAMPLE_RATE))
+    end = max(int(round(decoded * SAMPLE_RATE)), start) + window_samples
+    while start < len(samples):
+        # Copia de la ventana: el mmap es de sólo lectura
+        yield np.array(samples[start:end])
+        start, end = end, end + window_samples
+
+
+def _transcribe_job_windows(job: DiarizationJob, samples, model_size: str, language: Optional[str],
+                            window_seconds: float, tracker=None) -> List[dict]:
+    """
+    Transcribe el audio por ventanas, guardando un checkpoint tras cada una.
+
+    Usa el mismo paso por ventana que `transcribe_stream`; el estado de cada
+    ventana (desplazamiento, audio leído, idioma y contexto) se guarda para
+    reanudar en la primera ventana pendiente.
+    """
+    from . import diarize
+    from .model_registry import get_model
+    from .transcribe import _transcribe_windows
+
+    windows = job.completed_windows()
+    total_seconds = len(samples) / diarize.SAMPLE_RATE
+    last = windows[-1] if windows else {'next_offset': 0.0, 'decoded': 0.0, 'prompt': None, 'language': None}
+    if windows:
+        print(f"Reanudando transcripción en {last['next_offset']:.1f}s ({len(windows)} ventanas completadas)")
+        if tracker is not None:
+            tracker.update(last['next_offset'])
+
+    def checkpoint(window: dict):
+        _write_json(job.window_path(len(windows)), window)
+        windows.append(window)
+        print(f"  Ventana {len(windows)}: {min(window['next_offset'], total_seconds):.0f}s / {total_seconds:.0f}s")
+
+    if last['next_offset'] < total_seconds:
+        model = get_model(model_size, loader=diarize.whisper.load_model)
+        source = _sample_windows(samples, last['next_offset'], last['decoded'],
+                                 int(window_seconds * diarize.SAMPLE_RATE))
+        for segment in _transcribe_windows(model, source, language or last['language'],
+                                           offset=last['next_offset'], prompt=last['prompt'],
+                                           on_window=checkpoint, word_timestamps=True):
+            if tracker is not None:
+                tracker.update(segment['end'], segment)
+
+    if tracker is not None:
+        tracker.finish()
+    return [seg for window in windows for seg in window['segments']]
+
+
+def run_diarization_job(
+    audio_path: str,
+    job_dir: str,
+    hf_token: str,
+    model_size: str = "base",
+    language: Optional[str] = None,
+    num_speakers: Optional[int] = None,
+    pipeline_params: Optional[dict] = None,
+    window_seconds: float = DEFAULT_JOB_WINDOW,
+    thread_policy=None,
+    in_memory: bool = True,
+    cache: Optional[bool] = None,
+    on_progress=None
+) -> list:
+    """
+    Ejecuta (o reanuda) una transcripción con hablantes guardando checkpoints.
+
+    Args:
+        audio_path (str): Ruta al archivo de audio
+        job_dir (str): Directorio del trabajo (se crea si no existe)
+        hf_token (str): Token de HuggingFace para acceder a pyannote
+        model_size (str): Tamaño del modelo Whisper
+        language (str): Idioma del audio (None = autodetectar)
+        num_speakers (int): Número de hablantes (opcional)
+        pipeline_params (dict): Hiperparámetros del pipeline de pyannote (opcional)
+        window_seconds (float): Duración de cada ventana de transcripción con checkpoint
+        thread_policy (ThreadPolicy): Hilos/afinidad de CPU (None = variables de entorno)
+        in_memory (bool): Pasar el audio a pyannote en memoria o mediante un WAV temporal
+        cache (bool): Reutilizar (y guardar) la diarización en la caché en disco,
+            como `transcribe_with_speaker_diarization`. Si es None se usa `WHISPER_CACHE`
+        on_progress (callable): Recibe los `ProgressEvent` de cada etapa ('decode',
+            'diarize', 'transcribe', 'merge'); también los suscriptores de `src.progress`
+
+    Returns:
+        list: Segmentos con texto, hablante y timestamps, como `transcribe_with_speaker_diarization`
+    """
+    import numpy as np
+    import torch
+    from . import diarize
+    from .prefetch import prefetched_hash
+    from .progress import ProgressTracker
+    from .result_cache import cache_enabled
+    from .speaker_assignment import SpeakerTurns, attribute_speakers
+    from .thread_policy import apply_thread_policy
+
+    if not os.path.exists(audio_path):
+        raise FileNotFoundError(f"El archivo {audio_path} no existe")
+    apply_thread_policy(thread_policy)
+
+    job = DiarizationJob(job_dir)
+    fingerprints = job_fingerprints(prefetched_hash(audio_path), model_size, language, num_speakers,
+                                    pipeline_params, window_seconds)
+    discarded = job.validate(fingerprints)
+    if discarded:
+        print(f"Checkpoints descartados por cambio de parámetros: {', '.join(discarded)}")
+
+    finished = _read_json(job.result_file)
+    if finished is not None:
+        print(f"Trabajo ya completado en '{job_dir}'")
+        return finished
+
+    # Paso 1/4: audio normalizado (se relee con mmap para no duplicarlo en memoria)
+    decode_tracker = ProgressTracker('decode', None, audio_path, on_progress)
+    if job.audio_file.exists():
+        print("Paso 1/4: Audio normalizado recuperado del checkpoint")
+    else:
+        print("Paso 1/4: Decodificando audio (16kHz mono)...")
+        decode_tracker.update(0.0)
+        waveform = diarize.decode_audio(audio_path)["waveform"][0].numpy().astype(np.float32, copy=False)
+        tmp = job.dir / 'audio_16k.tmp.npy'
+        np.save(tmp, waveform)
+        os.replace(tmp, job.audio_file)
+        del waveform
+    samples = np.load(job.audio_file, mmap_mode='r')
+    duration = len(samples) / diarize.SAMPLE_RATE
+    decode_tracker.total_seconds = duration
+    decode_tracker.finish()
+
+    def stage(name):
+        return ProgressTracker(name, duration, audio_path, on_progress)
+
+    # Paso 2/4: diarización
+    turns_data = _read_json(job.diarization_file)
+    turns, diarization_key = None, None
+    if turns_data is not None:
+        print("Paso 2/4: Diarización recuperada del checkpoint")
+        turns = SpeakerTurns.from_dict(turns_data)
+    elif cache_enabled(cache):
+        turns, diarization_key = diarize._cached_diarization(audio_path, num_speakers, pipeline_params)
+        if turns is not None:
+            print("Paso 2/4: Diarización recuperada de la caché")
+            _write_json(job.diarization_file, turns.to_dict())
+    if turns is not None:
+        stage('diarize').finish()
+    else:
+        print("Paso 2/4: Identificando hablantes con pyannote.audio...")
+        audio = {"waveform": torch.from_numpy(np.array(samples))[None], "sample_rate": diarize.SAMPLE_RATE}
+        diarization = diarize._run_diarization(audio, hf_token, num_speakers, pipeline_params, in_memory,
+                                               tracker=stage('diarize'))
+        del audio
+        if diarization_key is not None:
+            turns = diarize._store_diarization(diarization_key, diarization, audio_path, num_speakers)
+        else:
+            turns = SpeakerTurns.from_diarization(diarization)
+        _write_json(job.diarization_file, turns.to_dict())
+
+    # Paso 3/4: transcripción por ventanas
+    print(f"Paso 3/4: Transcribiendo con Whisper '{model_size}' por ventanas de {window_seconds:.0f}s...")
+    segments = _transcribe_job_windows(job, samples, model_size, language, window_seconds, stage('transcribe'))
+
+    # Paso 4/4: combinar
+    print("Paso 4/4: Combinando transcripción con identificación de hablantes...")
+    merge_tracker = stage('merge')
+    attribution = attribute_speakers(turns, segments)
+    segments_with_speakers = [{
+        'start': segment['start'],
+        'end': segment['end'],
+        'speaker': speaker,
+        'text': segment['text'],
+        'speaker_overlap': ratio
+    } for segment, speaker, ratio in zip(segments, attribution.speakers, attribution.ratios.tolist())]
+    _write_json(job.result_file, segments_with_speakers)
+    merge_tracker.finish()
+    return segments_with_speakers
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.diarize_job",
+        description="Transcripción con hablantes reanudable: guarda cada etapa en un directorio de trabajo."
+    )
+    parser.add_argument('audio', help="Archivo de audio")
+    parser.add_argument('--job-dir', required=True, help="Directorio de checkpoints del trabajo")
+    parser.add_argument('--model', default='base', help="Tamaño del modelo Whisper (default: base)")
+    parser.add_argument('--language', default=None, help="Código de idioma (default: auto-detectar)")
+    parser.add_argument('--num-speakers', type=int, default=None, help="Número de hablantes si se conoce")
+    parser.add_argument('--window', type=float, default=DEFAULT_JOB_WINDOW,
+                        help=f"Segundos por ventana con checkpoint (default: {DEFAULT_JOB_WINDOW:.0f})")
+    parser.add_argument('--status', action='store_true', help="Mostrar el progreso del trabajo y salir")
+    return add_thread_arguments(parser, workers=False)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.status:
+        status = DiarizationJob(args.job_dir).status()
+        print(f"Trabajo: {args.job_dir}")
+        print(f"  - Audio normalizado: {'sí' if status['normalization'] else 'no'}")
+        print(f"  - Diarización: {'sí' if status['diarization'] else 'no'}")
+        print(f"  - Ventanas transcritas: {status['windows']} ({status['transcribed_seconds']:.0f}s)")
+        print(f"  - Completado: {'sí' if status['finished'] else 'no'}")
+        return 0
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    hf_token = os.getenv('HF_TOKEN')
+    if not hf_token:
+        print("❌ ERROR: Token de HuggingFace no encontrado (define HF_TOKEN en .env)")
+        return 1
+
+    from .diarize import format_transcription_by_speaker, save_diarized_transcription
+    try:
+        segments = run_diarization_job(args.audio, args.job_dir, hf_token, args.model, args.language,
+                                       args.num_speakers, window_seconds=args.window,
+                                       thread_policy=policy_from_args(args))
+    except Exception as e:
+        print(f"Error: {e} (relanza el mismo comando para reanudar)")
+        return 1
+
+    print(format_transcription_by_speaker(segments))
+    audio = Path(args.audio)
+    save_diarized_transcription(segments, str(audio.parent / f"{audio.stem}_diarized_grouped.txt"), "grouped")
+    save_diarized_transcription(segments, str(audio.parent / f"{audio.stem}_diarized_timestamped.txt"), "timestamped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
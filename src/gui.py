@@ -6,13 +6,26 @@ from tkinter import ttk, filedialog, messagebox, scrolledtext
 import os
 import threading
 from pathlib import Path
+from .prefetch import prefetch_audio
+from .progress import (DIARIZATION_WEIGHTS, SIMPLE_WEIGHTS, PipelineProgress, format_eta, format_event,
+                       subscribe, unsubscribe)
+from .render_buffer import RENDER_CHUNK_CHARS, RenderBuffer
+from .transcript_view import VirtualTranscript, parse_timestamp
 from .transcribe import transcribe_audio, save_transcription
-from .diarize import transcribe_with_speaker_diarization, format_transcription_by_speaker, save_diarized_transcription
+from .worker import JobCancelled, JobWorker, is_transferable
+from .diarize import (transcribe_with_speaker_diarization, format_transcription_by_speaker,
+                      save_diarized_transcription, warm_up_models)
 from dotenv import load_dotenv
 
 # Cargar variables de entorno
 load_dotenv()
 
+# Intervalo mínimo entre volcados de resultados parciales y progreso a Tk (ms)
+RENDER_INTERVAL_MS = 200
+
+# A partir de cuántos segmentos el resultado se muestra en el visor virtualizado
+VIRTUAL_VIEW_THRESHOLD = 1000
+
 
 class WhisperGUI:
     def __init__(self, root):
@@ -23,6 +36,25 @@ class WhisperGUI:
         
         self.audio_file = None
         self.processing = False
+        self.pipeline_progress = None
+        # Texto y progreso que llegan del hilo de trabajo, volcados a Tk por lotes
+        self.render_buffer = RenderBuffer()
+        self.virtual_view_active = False
+        # Segmentos parciales del trabajo en curso (para pasar al visor virtualizado a tiempo)
+        self.partial_segments = []
+        # Los trabajos se ejecutan en un proceso aparte para poder cancelarlos
+        # (WHISPER_GUI_WORKER=0 los ejecuta en el hilo, como antes)
+        use_worker = os.getenv('WHISPER_GUI_WORKER', '1').lower() not in ('0', 'false', 'no')
+        self.worker = JobWorker() if use_worker else None
+        # Precarga del modelo al cambiar la selección (WHISPER_GUI_WARMUP=0 la desactiva)
+        self.warmup_enabled = os.getenv('WHISPER_GUI_WARMUP', '1').lower() not in ('0', 'false', 'no')
+        self.warm_generation = 0
+        # Decodificación especulativa del archivo elegido (WHISPER_GUI_PREFETCH=0 la desactiva)
+        self.prefetch_enabled = os.getenv('WHISPER_GUI_PREFETCH', '1').lower() not in ('0', 'false', 'no')
+        self.prefetch_generation = 0
+        # Cola multiarchivo (se crea al abrir su ventana por primera vez)
+        self.job_queue = None
+        self.queue_panel = None
         
         self.setup_ui()
     
@@ -68,7 +100,7 @@ class WhisperGUI:
                        value="simple").grid(row=0, column=1, sticky=tk.W)
         ttk.Radiobutton(options_frame, text="Con identificación de hablantes (lento)", 
                        variable=self.transcription_type, 
-                       value="diarization").grid(row=0, column=2, sticky=tk.W)
+                       value="diarization", command=self.warm_up).grid(row=0, column=2, sticky=tk.W)
         
         # Modelo
         ttk.Label(options_frame, text="Modelo:").grid(row=1, column=0, sticky=tk.W, padx=5, pady=5)
@@ -77,6 +109,7 @@ class WhisperGUI:
                                    values=["tiny", "base", "small", "medium", "large"],
                                    state="readonly", width=15)
         model_combo.grid(row=1, column=1, sticky=tk.W, pady=5)
+        model_combo.bind('<<ComboboxSelected>>', lambda e: self.warm_up())
         
         # Idioma
         ttk.Label(options_frame, text="Idioma:").grid(row=1, column=2, sticky=tk.W, padx=5)
@@ -86,6 +119,10 @@ class WhisperGUI:
                                  state="readonly", width=10)
         lang_combo.grid(row=1, column=3, sticky=tk.W)
         
+        # Estado de la precarga del modelo
+        self.model_status = ttk.Label(options_frame, text="", foreground="gray")
+        self.model_status.grid(row=1, column=4, sticky=tk.W, padx=10)
+        
         # Botones de acción
         button_frame = ttk.Frame(main_frame)
         button_frame.grid(row=3, column=0, columnspan=2, pady=10)
@@ -106,6 +143,9 @@ class WhisperGUI:
         ttk.Button(button_frame, text="🗑️ Limpiar", 
                   command=self.clear_result).pack(side=tk.LEFT, padx=5)
         
+        ttk.Button(button_frame, text="📋 Cola de archivos", 
+                  command=self.open_queue).pack(side=tk.LEFT, padx=5)
+        
         # Barra de progreso
         self.progress_frame = ttk.Frame(main_frame)
         self.progress_frame.grid(row=4, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=5)
@@ -113,7 +153,7 @@ class WhisperGUI:
         self.progress_label = ttk.Label(self.progress_frame, text="")
         self.progress_label.pack(anchor=tk.W)
         
-        self.progress_bar = ttk.Progressbar(self.progress_frame, mode='indeterminate')
+        self.progress_bar = ttk.Progressbar(self.progress_frame, mode='determinate', maximum=100)
         self.progress_bar.pack(fill=tk.X, pady=5)
         
         # Área de resultados
@@ -127,6 +167,29 @@ class WhisperGUI:
                                                      height=20, font=('Arial', 10))
         self.result_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         
+        # Visor virtualizado para resultados muy largos (sólo pinta los segmentos visibles)
+        self.transcript_view = VirtualTranscript(result_frame, rows=20, font=('Arial', 10))
+        self.transcript_view.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.transcript_view.grid_remove()
+        
+        nav_frame = ttk.Frame(result_frame)
+        nav_frame.grid(row=1, column=0, sticky=(tk.W, tk.E), pady=(5, 0))
+        ttk.Label(nav_frame, text="Ir a (hh:mm:ss):").pack(side=tk.LEFT)
+        self.jump_time_var = tk.StringVar()
+        jump_entry = ttk.Entry(nav_frame, textvariable=self.jump_time_var, width=10)
+        jump_entry.pack(side=tk.LEFT, padx=5)
+        jump_entry.bind('<Return>', lambda e: self.jump_to_time())
+        ttk.Button(nav_frame, text="Ir", command=self.jump_to_time).pack(side=tk.LEFT)
+        ttk.Label(nav_frame, text="Hablante:").pack(side=tk.LEFT, padx=(15, 5))
+        self.speaker_var = tk.StringVar()
+        self.speaker_combo = ttk.Combobox(nav_frame, textvariable=self.speaker_var,
+                                          state="readonly", width=14)
+        self.speaker_combo.pack(side=tk.LEFT)
+        ttk.Button(nav_frame, text="◀", width=3,
+                   command=lambda: self.jump_to_speaker(forward=False)).pack(side=tk.LEFT, padx=2)
+        ttk.Button(nav_frame, text="▶", width=3,
+                   command=lambda: self.jump_to_speaker(forward=True)).pack(side=tk.LEFT)
+        
         # Barra de estado
         self.status_bar = ttk.Label(main_frame, text="Listo", relief=tk.SUNKEN, anchor=tk.W)
         self.status_bar.grid(row=6, column=0, columnspan=2, sticky=(tk.W, tk.E))
@@ -147,6 +210,7 @@ class WhisperGUI:
             self.audio_file = filename
             self.file_label.config(text=Path(filename).name, foreground="black")
             self.status_bar.config(text=f"Archivo seleccionado: {Path(filename).name}")
+            self.prefetch(filename)
     
     def start_transcription(self):
         """Iniciar el proceso de transcripción"""
@@ -169,48 +233,215 @@ class WhisperGUI:
         self.processing = True
         self.transcribe_btn.config(state=tk.DISABLED)
         self.cancel_btn.config(state=tk.NORMAL)
+        self._use_text_view()
+        self.render_buffer.clear_text()
+        self.partial_segments = []
         self.result_text.delete(1.0, tk.END)
-        self.progress_bar.start(10)
+        self.progress_bar.config(value=0)
         
         # Ejecutar en thread separado
         thread = threading.Thread(target=self.process_audio, daemon=True)
         thread.start()
     
+    def on_progress(self, event):
+        """Recibir eventos de progreso del pipeline (desde el thread de trabajo)"""
+        if event.source != self.audio_file or self.pipeline_progress is None:
+            return
+        overall = self.pipeline_progress.update(event)
+        message = (f"{format_event(event)} — total {overall * 100:.0f}% "
+                   f"(ETA {format_eta(self.pipeline_progress.eta)})")
+        schedule = self.render_buffer.set_progress(overall * 100, message)
+        if event.segment is not None:
+            # En el visor virtualizado basta con el segmento: no se acumula texto
+            text = '' if self.virtual_view_active else event.segment['text']
+            schedule = self.render_buffer.append(text, event.segment) or schedule
+        if schedule:
+            self.root.after(RENDER_INTERVAL_MS, self.flush_render)
+    
+    def flush_render(self):
+        """Volcar en Tk el texto y el progreso acumulados (como mucho unas veces por segundo)"""
+        segments = self.render_buffer.take_segments()
+        text, progress = self.render_buffer.drain()
+        if not self.virtual_view_active and segments:
+            self.partial_segments.extend(segments)
+            if len(self.partial_segments) > VIRTUAL_VIEW_THRESHOLD:
+                # Cambiar de visor en cuanto el resultado parcial es demasiado largo
+                self._use_virtual_view(self.partial_segments)
+                segments, text, self.partial_segments = [], '', []
+        if self.virtual_view_active:
+            if segments:
+                self.transcript_view.append_segments(segments)
+        elif text:
+            at_bottom = self.result_text.yview()[1] >= 0.999
+            self.result_text.insert(tk.END, text)
+            if at_bottom:
+                self.result_text.see(tk.END)
+        if progress is not None:
+            self.show_progress(*progress)
+        if self.render_buffer.pending:
+            # Textos muy largos se insertan en varios volcados para no bloquear el bucle
+            self.root.after(RENDER_INTERVAL_MS, self.flush_render)
+    
+    def show_progress(self, value, message):
+        """Actualizar la barra de progreso y el mensaje de estado"""
+        self.progress_bar.config(value=value)
+        self.update_status(message)
+    
+    def run_job(self, func, *args):
+        """Ejecutar un trabajo en el proceso trabajador (o en este hilo si no es posible)"""
+        if self.worker is not None and is_transferable(func):
+            return self.worker.run(func, *args)
+        return func(*args)
+    
+    def warm_up(self):
+        """Precargar en segundo plano el modelo elegido (y pyannote si hay diarización)"""
+        if not self.warmup_enabled:
+            return
+        self.warm_generation += 1
+        model = self.model_var.get()
+        hf_token = os.getenv('HF_TOKEN') if self.transcription_type.get() == "diarization" else None
+        self.model_status.config(text=f"⏳ Cargando modelo {model}...", foreground="gray")
+        thread = threading.Thread(target=self.run_warm_up, args=(self.warm_generation, model, hf_token),
+                                  daemon=True)
+        thread.start()
+    
+    def run_warm_up(self, generation, model, hf_token):
+        """Cargar el modelo en el proceso trabajador (en un thread separado)"""
+        try:
+            info = self.run_job(warm_up_models, model, hf_token)
+        except JobCancelled:
+            self.root.after(0, self.show_model_status, generation, "", "gray")
+            return
+        except Exception as e:
+            self.root.after(0, self.show_model_status, generation, f"⚠️ No se pudo cargar {model}: {e}", "red")
+            return
+        text = f"✓ Modelo {model} listo"
+        if info['pipeline']:
+            text += " (+ diarización)"
+        self.root.after(0, self.show_model_status, generation, text, "green")
+    
+    def show_model_status(self, generation, text, color):
+        """Mostrar el estado de la precarga (si no la ha sustituido otra más reciente)"""
+        if generation == self.warm_generation:
+            self.model_status.config(text=text, foreground=color)
+    
+    def prefetch(self, audio_file):
+        """Empezar a decodificar el archivo elegido mientras se eligen las opciones"""
+        if not self.prefetch_enabled:
+            return
+        self.prefetch_generation += 1
+        if self.worker is not None and not self.processing:
+            # Abandonar la decodificación del archivo anterior conservando el modelo
+            self.worker.cancel(terminate=False, func=prefetch_audio)
+        thread = threading.Thread(target=self.run_prefetch, args=(self.prefetch_generation, audio_file),
+                                  daemon=True)
+        thread.start()
+    
+    def run_prefetch(self, generation, audio_file):
+        """Decodificar el audio en el proceso trabajador (en un thread separado)"""
+        try:
+            info = self.run_job(prefetch_audio, audio_file)
+        except Exception:
+            # Especulativo: si falla, la transcripción decodifica el archivo como siempre
+            return
+        self.root.after(0, self.show_prefetch_status, generation, info)
+    
+    def show_prefetch_status(self, generation, info):
+        """Indicar que el audio elegido ya está decodificado"""
+        if generation == self.prefetch_generation and not self.processing:
+            self.status_bar.config(text=f"Archivo seleccionado: {Path(info['path']).name} · "
+                                        f"audio decodificado ({format_eta(info['duration'])})")
+    
     def process_audio(self):
         """Procesar el audio en un thread separado"""
+        weights = SIMPLE_WEIGHTS if self.transcription_type.get() == "simple" else DIARIZATION_WEIGHTS
+        self.pipeline_progress = PipelineProgress(weights)
+        subscribe(self.on_progress)
         try:
             model = self.model_var.get()
             language = self.language_var.get() if self.language_var.get() != "auto" else None
             
             if self.transcription_type.get() == "simple":
                 self.update_status("Transcribiendo audio...")
-                result = transcribe_audio(self.audio_file, model, language)
+                result = self.run_job(transcribe_audio, self.audio_file, model, language)
                 text = result["text"]
                 
-                self.root.after(0, self.show_result, text)
+                self.root.after(0, self.show_segments, result.get("segments") or [], text)
                 self.root.after(0, self.update_status, "Transcripción completada ✓")
                 
             else:  # diarization
                 self.update_status("Identificando hablantes (esto puede tardar)...")
                 hf_token = os.getenv('HF_TOKEN')
-                segments = transcribe_with_speaker_diarization(
-                    self.audio_file, hf_token, model, language
+                segments = self.run_job(
+                    transcribe_with_speaker_diarization, self.audio_file, hf_token, model, language
                 )
                 text = format_transcription_by_speaker(segments)
                 
-                self.root.after(0, self.show_result, text)
+                self.root.after(0, self.show_segments, segments, text)
                 self.root.after(0, self.update_status, "Transcripción con diarización completada ✓")
         
+        except JobCancelled:
+            self.root.after(0, self.update_status, "Transcripción cancelada")
+        
         except Exception as e:
             self.root.after(0, self.show_error, str(e))
         
         finally:
+            unsubscribe(self.on_progress)
             self.root.after(0, self.finish_processing)
     
+    def show_segments(self, segments, text):
+        """Mostrar un resultado: visor virtualizado si es muy largo, área de texto si no"""
+        if len(segments) <= VIRTUAL_VIEW_THRESHOLD:
+            self.show_result(text)
+            return
+        self._use_virtual_view(segments)
+    
+    def _use_virtual_view(self, segments):
+        """Pasar al visor virtualizado con `segments` (descarta el texto parcial)"""
+        self.render_buffer.clear_text()
+        self.result_text.delete(1.0, tk.END)
+        self.result_text.grid_remove()
+        self.transcript_view.grid()
+        self.virtual_view_active = True
+        self.transcript_view.set_segments(segments)
+        speakers = self.transcript_view.index.speakers
+        self.speaker_combo.config(values=speakers)
+        self.speaker_var.set(speakers[0] if speakers else "")
+    
+    def _use_text_view(self):
+        """Volver al área de texto normal (libera los segmentos del visor)"""
+        if self.virtual_view_active:
+            self.transcript_view.clear()
+            self.transcript_view.grid_remove()
+            self.result_text.grid()
+            self.virtual_view_active = False
+    
+    def jump_to_time(self):
+        """Saltar al segmento que suena en el instante indicado"""
+        try:
+            seconds = parse_timestamp(self.jump_time_var.get())
+        except ValueError:
+            self.update_status("Instante no válido (usa hh:mm:ss, mm:ss o segundos)")
+            return
+        if self.virtual_view_active:
+            self.transcript_view.jump_to_time(seconds)
+    
+    def jump_to_speaker(self, forward=True):
+        """Saltar al siguiente (o anterior) turno del hablante seleccionado"""
+        speaker = self.speaker_var.get()
+        if self.virtual_view_active and speaker:
+            if self.transcript_view.jump_to_speaker(speaker, forward) is None:
+                self.update_status(f"No hay más intervenciones de {speaker}")
+    
     def show_result(self, text):
-        """Mostrar resultado en el área de texto"""
+        """Mostrar resultado en el área de texto (sustituye al texto parcial)"""
+        self._use_text_view()
+        self.render_buffer.clear_text()
         self.result_text.delete(1.0, tk.END)
-        self.result_text.insert(1.0, text)
+        self.result_text.insert(1.0, text[:RENDER_CHUNK_CHARS])
+        if len(text) > RENDER_CHUNK_CHARS and self.render_buffer.append(text[RENDER_CHUNK_CHARS:]):
+            self.root.after(RENDER_INTERVAL_MS, self.flush_render)
     
     def show_error(self, error_msg):
         """Mostrar error"""
@@ -230,15 +461,29 @@ class WhisperGUI:
         self.progress_bar.stop()
     
     def cancel_transcription(self):
-        """Cancelar la transcripción (limitado en threading)"""
+        """Cancelar la transcripción (termina el proceso trabajador salvo con keep_warm)"""
         if messagebox.askyesno("Cancelar", "¿Estás seguro de que quieres cancelar?"):
             self.update_status("Cancelando...")
-            # Nota: Es difícil cancelar threads en Python, esto solo actualiza la UI
+            if self.worker is not None:
+                self.worker.cancel()
             self.finish_processing()
+            if self.worker is not None and not self.worker.keep_warm:
+                self.rewarm()
+    
+    def rewarm(self):
+        """Volver a preparar modelo y audio tras terminar el proceso trabajador (se pierden con él)"""
+        self.warm_generation += 1
+        self.model_status.config(text="", foreground="gray")
+        self.warm_up()
+        if self.audio_file:
+            self.prefetch(self.audio_file)
     
     def save_result(self):
         """Guardar el resultado en un archivo"""
-        text = self.result_text.get(1.0, tk.END).strip()
+        if self.virtual_view_active:
+            text = self.transcript_view.get_text()
+        else:
+            text = self.result_text.get(1.0, tk.END).strip()
         
         if not text:
             messagebox.showwarning("Sin resultado", "No hay texto para guardar.")
@@ -260,14 +505,37 @@ class WhisperGUI:
     
     def clear_result(self):
         """Limpiar el área de resultados"""
+        self._use_text_view()
+        self.render_buffer.clear_text()
         self.result_text.delete(1.0, tk.END)
         self.status_bar.config(text="Resultado limpiado")
+    
+    def open_queue(self):
+        """Mostrar la ventana de cola de archivos (la cola se crea la primera vez)"""
+        from .job_queue import JobQueue
+        from .queue_panel import QueuePanel
+        
+        if self.job_queue is None:
+            self.job_queue = JobQueue(max_workers=int(os.getenv('WHISPER_QUEUE_WORKERS', 2)))
+        if self.queue_panel is None:
+            self.queue_panel = QueuePanel(self, self.job_queue)
+        else:
+            self.queue_panel.deiconify()
+            self.queue_panel.lift()
+    
+    def shutdown(self):
+        """Detener los procesos trabajadores al cerrar la aplicación"""
+        if self.job_queue is not None:
+            self.job_queue.shutdown()
+        if self.worker is not None:
+            self.worker.stop()
 
 
 def main():
     root = tk.Tk()
     app = WhisperGUI(root)
     root.mainloop()
+    app.shutdown()
 
 
 if __name__ == "__main__":
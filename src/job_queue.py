@@ -0,0 +1,338 @@
+"""
+Cola de trabajos multiarchivo con un pool acotado de procesos trabajadores.
+
+Cada hueco del pool es un `JobWorker` de larga duración: los trabajos que le
+llegan reutilizan el modelo que ya tiene cargado, así que sólo el primero de
+cada trabajador paga la carga. Los archivos se procesan en el orden de la cola
+(que se puede cambiar mientras están pendientes) con `batch.process_file` (que
+escribe las mismas salidas que las CLIs) u otro trabajo indicado con `task`.
+
+La cola no depende de Tk: notifica cada cambio con `on_change(item)` desde sus
+hilos, y la interfaz decide cuándo repintar.
+"""
+import itertools
+import threading
+import time
+from typing import Callable, List, Optional
+
+from .progress import DIARIZATION_WEIGHTS, SIMPLE_WEIGHTS, PipelineProgress, subscribe, unsubscribe
+from .thread_policy import ThreadPolicy
+from .worker import JobCancelled, JobWorker
+
+# Estados de un elemento de la cola
+PENDING = 'pendiente'
+RUNNING = 'en curso'
+DONE = 'completado'
+FAILED = 'error'
+CANCELLED = 'cancelado'
+
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+
+class QueueFull(RuntimeError):
+    """La cola ya tiene el máximo de elementos pendientes."""
+
+
+class QueueItem:
+    """Un archivo de la cola con su estado, progreso y tiempos."""
+
+    def __init__(self, item_id: int, audio_path: str, options: dict):
+        self.id = item_id
+        self.audio_path = audio_path
+        self.options = options
+        self.status = PENDING
+        self.fraction = 0.0
+        self.added = time.time()
+        self.started = None
+        self.finished = None
+        self.result = None
+        self.error = None
+        self.progress = PipelineProgress(DIARIZATION_WEIGHTS if options.get('diarize') else SIMPLE_WEIGHTS)
+
+    @property
+    def elapsed(self) -> Optional[float]:
+        """Segundos de proceso (hasta ahora si sigue en curso)."""
+        if self.started is None:
+            return None
+        return (self.finished or time.time()) - self.started
+
+    def __repr__(self):
+        return f"<QueueItem {self.id} {self.audio_path!r} {self.status}>"
+
+
+def _run_item(audio_path: str, options: dict) -> dict:
+    """Trabajo que ejecuta cada proceso trabajador (importable por nombre)."""
+    from .batch import process_file
+    return process_file(audio_path, **options)
+
+
+class JobQueue:
+    """Cola ordenada de archivos procesada por un pool acotado de trabajadores con el modelo cargado."""
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        on_change: Optional[Callable[[QueueItem], None]] = None,
+        worker_factory: Optional[Callable] = None,
+        thread_policy: Optional[ThreadPolicy] = None,
+        task: Optional[Callable] = None,
+        max_pending: Optional[int] = None
+    ):
+        """
+        Args:
+            max_workers (int): Trabajos en paralelo (se puede cambiar con `set_max_workers`)
+            on_change (callable): Se llama con el elemento cada vez que cambia (desde otros hilos)
+            worker_factory (callable): Crea el trabajador de un hueco: f(thread_policy) -> JobWorker
+            thread_policy (ThreadPolicy): Política a repartir entre los trabajadores
+                (None = variables de entorno)
+            task (callable): Trabajo de cada elemento, f(audio_path, options), importable
+                por nombre para enviarlo al trabajador (None = `batch.process_file`)
+            max_pending (int): Elementos pendientes admitidos (None = sin límite);
+                por encima `add` lanza `QueueFull`
+        """
+        self.on_change = on_change
+        self._worker_factory = worker_factory or (lambda policy: JobWorker(keep_warm=False, thread_policy=policy))
+        self._thread_policy = thread_policy
+        self._task = task
+        self.max_pending = max_pending
+        self._items: List[QueueItem] = []
+        self._ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self._max_workers = max(1, max_workers)
+        self._slots = []          # (hilo, trabajador, política) por hueco del pool
+        self._running = {}        # id de elemento -> trabajador
+        self._slot_items = {}     # hilo del hueco -> elemento en curso
+        self._closed = False
+        subscribe(self._on_progress)
+
+    @property
+    def items(self) -> List[QueueItem]:
+        with self._cond:
+            return list(self._items)
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    def add(self, paths: List[str], **options) -> List[QueueItem]:
+        """
+        Añade archivos al final de la cola y arranca los trabajadores necesarios.
+
+        Args:
+            paths (list): Archivos de audio
+            **options: Argumentos de `batch.process_file` (model_size, language,
+                output_dir, diarize, hf_token, num_speakers)
+
+        Returns:
+            list: Los elementos creados
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("La cola está cerrada")
+            if self.max_pending is not None and self.pending_count() + len(paths) > self.max_pending:
+                raise QueueFull(f"La cola admite como mucho {self.max_pending} elementos pendientes")
+            items = [QueueItem(next(self._ids), path, dict(options)) for path in paths]
+            self._items.extend(items)
+            self._ensure_slots()
+            self._cond.notify_all()
+        for item in items:
+            self._notify(item)
+        return items
+
+    def move(self, item_id: int, offset: int) -> bool:
+        """
+        Mueve un elemento pendiente `offset` posiciones (negativo = hacia el principio).
+
+        Returns:
+            bool: True si se movió
+        """
+        with self._cond:
+            item = self._find(item_id)
+            if item is None or item.status != PENDING:
+                return False
+            position = self._items.index(item)
+            target = max(0, min(len(self._items) - 1, position + offset))
+            if target == position:
+                return False
+            self._items.insert(target, self._items.pop(position))
+        self._notify(item)
+        return True
+
+    def cancel(self, item_id: int) -> bool:
+        """
+        Cancela un elemento: si está pendiente no se procesará; si está en curso se
+        termina su trabajador (el hueco arranca uno nuevo para el siguiente archivo).
+
+        Returns:
+            bool: True si el elemento estaba pendiente o en curso
+        """
+        with self._cond:
+            item = self._find(item_id)
+            if item is None or item.status in FINISHED_STATES:
+                return False
+            worker = self._running.get(item_id)
+            item.status = CANCELLED
+            item.finished = time.time()
+        if worker is not None:
+            worker.cancel()
+        self._notify(item)
+        return True
+
+    def get(self, item_id: int) -> Optional[QueueItem]:
+        """Elemento con ese id (None si no existe o ya se quitó)."""
+        with self._cond:
+            return self._find(item_id)
+
+    def pending_count(self) -> int:
+        with self._cond:
+            return sum(1 for item in self._items if item.status == PENDING)
+
+    def remove_finished(self, keep: int = 0) -> int:
+        """
+        Quita de la cola los elementos terminados.
+
+        Args:
+            keep (int): Terminados más recientes que se conservan
+
+        Returns:
+            int: Cuántos se quitaron
+        """
+        with self._cond:
+            finished = sorted((item for item in self._items if item.status in FINISHED_STATES),
+                              key=lambda item: item.finished or 0)
+            drop = {item.id for item in finished[:max(0, len(finished) - keep)]}
+            self._items = [item for item in self._items if item.id not in drop]
+            return len(drop)
+
+    def set_max_workers(self, max_workers: int):
+        """
+        Cambia los trabajos en paralelo (los huecos sobrantes se liberan al quedar libres).
+
+        Los núcleos se vuelven a repartir entre los huecos: el que tenga otra parte
+        cambia de trabajador antes de su siguiente archivo (el que está en curso
+        termina con la política con la que empezó).
+        """
+        with self._cond:
+            self._max_workers = max(1, max_workers)
+            self._ensure_slots()
+            self._cond.notify_all()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Espera a que no quede nada pendiente ni en curso. Devuelve False si vence `timeout`."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while any(item.status in (PENDING, RUNNING) for item in self._items):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def shutdown(self):
+        """Cancela lo pendiente, detiene los trabajadores y espera a sus hilos."""
+        with self._cond:
+            self._closed = True
+            for item in self._items:
+                if item.status == PENDING:
+                    item.status = CANCELLED
+            running = list(self._running.values())
+            self._cond.notify_all()
+        for worker in running:
+            worker.cancel()
+        for thread, _, _ in list(self._slots):
+            thread.join()
+        for _, worker, _ in self._slots:
+            worker.stop()
+        unsubscribe(self._on_progress)
+
+    def _find(self, item_id: int) -> Optional[QueueItem]:
+        return next((item for item in self._items if item.id == item_id), None)
+
+    def _slot_policy(self, index: int) -> ThreadPolicy:
+        """Parte de los núcleos del hueco `index` con el tamaño actual del pool."""
+        # Los núcleos se reparten entre los huecos para no sobresuscribir la CPU
+        return (self._thread_policy or ThreadPolicy.from_env()).partition(self._max_workers)[index]
+
+    def _ensure_slots(self):
+        """Crea hilos/trabajadores hasta `max_workers` (llamar con el lock tomado)."""
+        while len(self._slots) < self._max_workers:
+            index = len(self._slots)
+            policy = self._slot_policy(index)
+            thread = threading.Thread(target=self._slot_loop, args=(index,),
+                                      name=f'job-queue-{index}', daemon=True)
+            self._slots.append((thread, self._worker_factory(policy), policy))
+            thread.start()
+
+    def _next_pending(self, index: int):
+        """
+        Espera el siguiente elemento para el hueco `index`.
+
+        Returns:
+            tuple: (elemento, trabajador, trabajador sustituido o None), o None si el
+            hueco debe parar
+        """
+        with self._cond:
+            while True:
+                if self._closed:
+                    return None
+                if index < self._max_workers:
+                    item = next((item for item in self._items if item.status == PENDING), None)
+                    if item is not None:
+                        thread, worker, policy = self._slots[index]
+                        replaced = None
+                        current = self._slot_policy(index)
+                        if current != policy:
+                            # El pool cambió de tamaño: trabajador nuevo con su parte de los núcleos
+                            replaced, worker = worker, self._worker_factory(current)
+                            self._slots[index] = (thread, worker, current)
+                        item.status = RUNNING
+                        item.started = time.time()
+                        self._running[item.id] = worker
+                        return item, worker, replaced
+                self._cond.wait()
+
+    def _slot_loop(self, index: int):
+        while True:
+            claimed = self._next_pending(index)
+            if claimed is None:
+                return
+            item, worker, replaced = claimed
+            if replaced is not None:
+                replaced.stop()
+            self._notify(item)
+            result, error = None, None
+            self._slot_items[threading.get_ident()] = item
+            try:
+                result = worker.run(self._task or _run_item, item.audio_path, item.options)
+                error = result.get('error') if isinstance(result, dict) else None
+            except JobCancelled:
+                pass
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            finally:
+                self._slot_items.pop(threading.get_ident(), None)
+            with self._cond:
+                self._running.pop(item.id, None)
+                if item.status != CANCELLED:
+                    item.status = FAILED if error else DONE
+                    item.fraction = 1.0 if not error else item.fraction
+                    item.finished = time.time()
+                item.result, item.error = result, error
+                self._cond.notify_all()
+            self._notify(item)
+            if index >= self._max_workers:
+                # Hueco sobrante tras reducir el pool: liberar el modelo
+                worker.stop()
+
+    def _on_progress(self, event):
+        """Asocia los eventos de progreso a su elemento (los re-emite el hilo de su hueco)."""
+        item = self._slot_items.get(threading.get_ident())
+        if item is None or item.status != RUNNING:
+            return
+        with self._cond:
+            item.fraction = item.progress.update(event)
+        self._notify(item)
+
+    def _notify(self, item: QueueItem):
+        if self.on_change is not None:
+            self.on_change(item)
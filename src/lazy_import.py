@@ -0,0 +1,36 @@
+"""
+Importación diferida de dependencias pesadas (whisper, torch).
+
+Importar torch/whisper cuesta segundos. Los módulos de `src` los declaran como
+`LazyModule` para que `--help`, los errores de argumentos y el arranque de la
+GUI no paguen ese coste: el import real ocurre en el primer acceso a un atributo.
+"""
+import importlib
+
+
+class LazyModule:
+    """Referencia a un módulo que se importa al usar cualquiera de sus atributos."""
+
+    def __init__(self, name: str):
+        """
+        Args:
+            name (str): Nombre del módulo (ej: 'torch')
+        """
+        object.__setattr__(self, '_name', name)
+
+    def _load(self):
+        # import_module consulta sys.modules primero: tras el primer import es un
+        # simple acceso a diccionario y respeta los módulos sustituidos en tests
+        return importlib.import_module(self._name)
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __delattr__(self, attr):
+        delattr(self._load(), attr)
+
+    def __repr__(self):
+        return f"<LazyModule '{self._name}'>"
@@ -0,0 +1,195 @@
+"""
+Registro de modelos Whisper compartido por todo el proceso.
+
+Mantiene los modelos cargados en memoria (clave: tamaño, dispositivo y precisión)
+para que llamadas sucesivas a `transcribe_audio` o a la diarización no paguen
+de nuevo el coste de `whisper.load_model`. Cuando se supera el presupuesto de
+memoria configurado se descartan los modelos usados hace más tiempo (LRU).
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+# Presupuesto de memoria por defecto (MB). 0 o negativo = sin límite.
+DEFAULT_MAX_MB = float(os.getenv('WHISPER_MODEL_CACHE_MB', '0') or 0)
+
+
+def estimate_model_bytes(model) -> int:
+    """
+    Estima la memoria ocupada por un modelo sumando el tamaño de sus parámetros.
+
+    Args:
+        model: Modelo cargado (cualquier objeto con `parameters()` al estilo torch)
+
+    Returns:
+        int: Bytes estimados (0 si no se puede estimar)
+    """
+    parameters = getattr(model, 'parameters', None)
+    if not callable(parameters):
+        return 0
+    total = 0
+    try:
+        for p in parameters():
+            total += p.numel() * p.element_size()
+    except Exception:
+        return 0
+    return total
+
+
+class ModelRegistry:
+    """Caché LRU y thread-safe de modelos Whisper cargados."""
+
+    def __init__(self, max_bytes: Optional[int] = None, max_models: Optional[int] = None):
+        """
+        Args:
+            max_bytes (int): Presupuesto de memoria en bytes (None = `WHISPER_MODEL_CACHE_MB`)
+            max_models (int): Número máximo de modelos residentes (None = sin límite)
+        """
+        if max_bytes is None:
+            max_bytes = int(DEFAULT_MAX_MB * 1024 * 1024)
+        self.max_bytes = max_bytes if max_bytes and max_bytes > 0 else None
+        self.max_models = max_models if max_models and max_models > 0 else None
+
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._entries = OrderedDict()  # key -> (model, bytes)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_time = 0.0
+
+    @staticmethod
+    def make_key(model_size: str, device: Optional[str] = None, precision: Optional[str] = None) -> tuple:
+        """Construye la clave de caché para un modelo."""
+        return (model_size, device or 'default', precision or 'default')
+
+    def get(
+        self,
+        model_size: str,
+        device: Optional[str] = None,
+        precision: Optional[str] = None,
+        loader: Optional[Callable] = None
+    ):
+        """
+        Devuelve el modelo solicitado, cargándolo sólo si no está ya en memoria.
+
+        Args:
+            model_size (str): Tamaño del modelo ('tiny', 'base', 'small', 'medium', 'large')
+            device (str): Dispositivo ('cpu', 'cuda'); None usa el de Whisper por defecto
+            precision (str): 'fp16' convierte el modelo a media precisión; None lo deja igual
+            loader (callable): Función de carga (por defecto `whisper.load_model`)
+
+        Returns:
+            Modelo Whisper listo para usar
+        """
+        key = self.make_key(model_size, device, precision)
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Un lock por clave: dos hilos que piden el mismo modelo sólo lo cargan una vez,
+        # pero la carga de un modelo no bloquea los aciertos de otros.
+        with key_lock:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._entries[key][0]
+
+            if loader is None:
+                import whisper
+                loader = whisper.load_model
+
+            print(f"Cargando modelo Whisper '{model_size}'...")
+            t0 = time.perf_counter()
+            model = loader(model_size) if device is None else loader(model_size, device=device)
+            if precision == 'fp16' and hasattr(model, 'half'):
+                model = model.half()
+            elapsed = time.perf_counter() - t0
+
+            with self._lock:
+                self.misses += 1
+                self.load_time += elapsed
+                self._entries[key] = (model, estimate_model_bytes(model))
+                self._evict_locked(keep=key)
+            return model
+
+    def _evict_locked(self, keep: tuple):
+        """Descarta modelos LRU hasta cumplir los límites (requiere `self._lock`)."""
+        while len(self._entries) > 1:
+            over_count = self.max_models is not None and len(self._entries) > self.max_models
+            over_bytes = self.max_bytes is not None and self.memory_bytes() > self.max_bytes
+            if not (over_count or over_bytes):
+                break
+            oldest = next(iter(self._entries))
+            if oldest == keep:
+                break
+            del self._entries[oldest]
+            self.evictions += 1
+
+    def memory_bytes(self) -> int:
+        """Bytes estimados ocupados por los modelos residentes."""
+        return sum(size for _, size in self._entries.values())
+
+    def release(self, model_size: str, device: Optional[str] = None, precision: Optional[str] = None) -> bool:
+        """
+        Libera un modelo concreto de la caché.
+
+        Returns:
+            bool: True si el modelo estaba cargado
+        """
+        key = self.make_key(model_size, device, precision)
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def clear(self):
+        """Vacía la caché y reinicia los contadores."""
+        with self._lock:
+            self._entries.clear()
+            self._key_locks.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.load_time = 0.0
+
+    def stats(self) -> dict:
+        """
+        Devuelve los contadores de uso de la caché.
+
+        Returns:
+            dict: hits, misses, evictions, load_time (s), models (claves residentes) y memory_bytes
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'load_time': self.load_time,
+                'models': list(self._entries.keys()),
+                'memory_bytes': self.memory_bytes(),
+            }
+
+
+# Registro por defecto compartido por todo el proceso
+_registry = ModelRegistry()
+
+
+def get_registry() -> ModelRegistry:
+    """Devuelve el registro de modelos del proceso."""
+    return _registry
+
+
+def get_model(
+    model_size: str,
+    device: Optional[str] = None,
+    precision: Optional[str] = None,
+    loader: Optional[Callable] = None
+):
+    """Atajo para `get_registry().get(...)`."""
+    return _registry.get(model_size, device=device, precision=precision, loader=loader)
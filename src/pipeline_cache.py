@@ -0,0 +1,155 @@
+"""
+Caché de pipelines de diarización (pyannote) reutilizables entre llamadas.
+
+Instanciar `Pipeline.from_pretrained` y moverlo al dispositivo cuesta varios
+segundos; con esta caché un mismo proceso puede diarizar miles de archivos con
+una única instanciación por (pipeline, dispositivo, hiperparámetros).
+"""
+import threading
+import time
+from typing import Callable, Optional
+
+
+def _freeze(value):
+    """Convierte dicts/listas anidados en una estructura hashable y estable."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class PipelineCache:
+    """Caché thread-safe de pipelines de pyannote ya instanciados."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._pipelines = {}
+        self.hits = 0
+        self.misses = 0
+        self.load_time = 0.0
+
+    @staticmethod
+    def make_key(name: str, device: Optional[str] = None, params: Optional[dict] = None) -> tuple:
+        """Construye la clave de caché para un pipeline."""
+        return (name, device or 'cpu', _freeze(params or {}))
+
+    def get(
+        self,
+        name: str,
+        hf_token: Optional[str] = None,
+        device: Optional[str] = None,
+        params: Optional[dict] = None,
+        loader: Optional[Callable] = None
+    ):
+        """
+        Devuelve un pipeline listo para usar, instanciándolo sólo la primera vez.
+
+        Args:
+            name (str): Nombre del pipeline en HuggingFace (ej: "pyannote/speaker-diarization-3.1")
+            hf_token (str): Token de HuggingFace (no forma parte de la clave)
+            device (str): Dispositivo destino ('cuda', 'cpu'); None = no mover
+            params (dict): Hiperparámetros a aplicar con `pipeline.instantiate`
+            loader (callable): Función `loader(name, token=...)` (por defecto `Pipeline.from_pretrained`)
+
+        Returns:
+            Pipeline de pyannote
+        """
+        key = self.make_key(name, device, params)
+
+        with self._lock:
+            if key in self._pipelines:
+                self.hits += 1
+                return self._pipelines[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                if key in self._pipelines:
+                    self.hits += 1
+                    return self._pipelines[key]
+
+            if loader is None:
+                from pyannote.audio import Pipeline
+                loader = Pipeline.from_pretrained
+
+            t0 = time.perf_counter()
+            pipeline = loader(name, token=hf_token)
+            if device is not None:
+                import torch
+                pipeline.to(torch.device(device))
+            if params:
+                pipeline.instantiate(params)
+            elapsed = time.perf_counter() - t0
+
+            with self._lock:
+                self.misses += 1
+                self.load_time += elapsed
+                self._pipelines[key] = pipeline
+            return pipeline
+
+    def release(self, name: str, device: Optional[str] = None, params: Optional[dict] = None) -> bool:
+        """
+        Libera un pipeline de la caché.
+
+        Returns:
+            bool: True si el pipeline estaba cargado
+        """
+        key = self.make_key(name, device, params)
+        with self._lock:
+            return self._pipelines.pop(key, None) is not None
+
+    def clear(self):
+        """Libera todos los pipelines y reinicia los contadores."""
+        with self._lock:
+            self._pipelines.clear()
+            self._key_locks.clear()
+            self.hits = 0
+            self.misses = 0
+            self.load_time = 0.0
+
+    def stats(self) -> dict:
+        """
+        Devuelve los contadores de uso de la caché.
+
+        Returns:
+            dict: hits, misses, load_time (s) y pipelines (claves residentes)
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'load_time': self.load_time,
+                'pipelines': list(self._pipelines.keys()),
+            }
+
+
+# Caché por defecto compartida por todo el proceso
+_cache = PipelineCache()
+
+
+def get_pipeline_cache() -> PipelineCache:
+    """Devuelve la caché de pipelines del proceso."""
+    return _cache
+
+
+def warm_up_pipeline(
+    name: str,
+    hf_token: Optional[str] = None,
+    device: Optional[str] = None,
+    params: Optional[dict] = None,
+    loader: Optional[Callable] = None
+):
+    """
+    Instancia el pipeline por adelantado para que la primera diarización no pague la carga.
+
+    Returns:
+        Pipeline de pyannote ya en caché
+    """
+    return _cache.get(name, hf_token=hf_token, device=device, params=params, loader=loader)
+
+
+def release_pipeline(name: str, device: Optional[str] = None, params: Optional[dict] = None) -> bool:
+    """Libera un pipeline de la caché del proceso."""
+    return _cache.release(name, device=device, params=params)
@@ -0,0 +1,128 @@
+"""
+Decodificación especulativa del audio seleccionado.
+
+Mientras el usuario elige modelo e idioma la CPU está libre: `prefetch_audio`
+decodifica el archivo a 16kHz mono (con el mismo ffmpeg que Whisper), calcula
+su hash para las cachés de resultados y guarda el buffer en memoria del
+proceso. `transcribe_audio` y la diarización lo usan si el archivo no ha
+cambiado (misma ruta, tamaño y fecha de modificación), así que la
+transcripción empieza sin decodificar.
+
+Sólo se guarda un archivo: prefetch de otro archivo (o `discard_prefetched`)
+libera el anterior. La decodificación (y después el hash) publica eventos de
+progreso 'decode' por bloques, de modo que un `JobWorker` puede interrumpirla
+de forma cooperativa si el usuario cambia de archivo.
+"""
+import os
+import threading
+import time
+from typing import NamedTuple, Optional
+
+from .audio_stream import SAMPLE_RATE, iter_audio_windows, probe_duration
+from .progress import ProgressTracker
+
+# Duración de cada bloque decodificado (y de cada evento de progreso)
+PREFETCH_BLOCK_SECONDS = 60.0
+
+# Intervalo mínimo entre eventos mientras se calcula el hash (s); muy por debajo
+# de `WHISPER_CANCEL_GRACE` para que cancelar no mate al trabajador con su modelo
+HASH_EVENT_INTERVAL = 0.1
+
+
+class PrefetchedAudio(NamedTuple):
+    """Audio ya decodificado de un archivo concreto."""
+    signature: tuple
+    samples: object  # np.ndarray float32 mono a 16kHz
+    audio_hash: str
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / SAMPLE_RATE
+
+
+_lock = threading.Lock()
+_entry: Optional[PrefetchedAudio] = None
+
+
+def file_signature(audio_path: str) -> tuple:
+    """Identifica una versión de un archivo: (ruta absoluta, tamaño, mtime en ns)."""
+    stat = os.stat(audio_path)
+    return (os.path.abspath(audio_path), stat.st_size, stat.st_mtime_ns)
+
+
+def prefetch_audio(audio_path: str) -> dict:
+    """
+    Decodifica `audio_path` y guarda el buffer para la siguiente transcripción.
+
+    Si el mismo archivo ya está decodificado no se repite el trabajo.
+
+    Args:
+        audio_path (str): Ruta al archivo de audio
+
+    Returns:
+        dict: path, duration (s) y cached (True si ya estaba decodificado)
+    """
+    import numpy as np
+    from .result_cache import hash_file
+
+    global _entry
+    signature = file_signature(audio_path)
+    with _lock:
+        if _entry is not None and _entry.signature == signature:
+            return {'path': audio_path, 'duration': _entry.duration, 'cached': True}
+        # Liberar el archivo anterior antes de decodificar el nuevo
+        _entry = None
+
+    tracker = ProgressTracker('decode', probe_duration(audio_path), audio_path)
+    tracker.update(0.0)
+    blocks, decoded = [], 0.0
+    for block in iter_audio_windows(audio_path, PREFETCH_BLOCK_SECONDS):
+        blocks.append(block)
+        decoded += len(block) / SAMPLE_RATE
+        tracker.update(decoded)
+    samples = np.concatenate(blocks) if blocks else np.zeros(0, np.float32)
+
+    last_event = time.monotonic()
+
+    def hash_progress():
+        # Cada evento es un punto donde el JobWorker atiende una cancelación
+        nonlocal last_event
+        if time.monotonic() - last_event >= HASH_EVENT_INTERVAL:
+            last_event = time.monotonic()
+            tracker.update(decoded)
+
+    entry = PrefetchedAudio(signature, samples, hash_file(audio_path, on_chunk=hash_progress))
+
+    with _lock:
+        _entry = entry
+    return {'path': audio_path, 'duration': entry.duration, 'cached': False}
+
+
+def get_prefetched(audio_path: str) -> Optional[PrefetchedAudio]:
+    """Audio decodificado de `audio_path` si sigue siendo válido (None si no)."""
+    with _lock:
+        entry = _entry
+    if entry is None:
+        return None
+    try:
+        if file_signature(audio_path) != entry.signature:
+            return None
+    except OSError:
+        return None
+    return entry
+
+
+def prefetched_hash(audio_path: str) -> str:
+    """Hash del contenido de `audio_path`: el ya calculado al decodificarlo o uno nuevo."""
+    from .result_cache import hash_file
+
+    entry = get_prefetched(audio_path)
+    return entry.audio_hash if entry is not None else hash_file(audio_path)
+
+
+def discard_prefetched() -> bool:
+    """Libera el audio decodificado. Devuelve True si había uno."""
+    global _entry
+    with _lock:
+        had_entry, _entry = _entry is not None, None
+    return had_entry
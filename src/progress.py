@@ -0,0 +1,220 @@
+"""
+Eventos de progreso de transcripción y diarización.
+
+Las funciones de `src.transcribe` y `src.diarize` publican un `ProgressEvent`
+por cada avance (y por cada segmento terminado). Hay dos formas de recibirlos:
+
+- `on_progress=callback` en la llamada concreta.
+- `subscribe(callback)`: suscripción global del proceso, útil para CLIs y la GUI
+  que no controlan la llamada (devuelve el callback para `unsubscribe`).
+
+Los callbacks se ejecutan en el hilo que hace el trabajo: una GUI debe
+reenviarlos a su bucle principal. Si un callback lanza una excepción, el
+trabajo se interrumpe con ella (sirve para cancelar).
+"""
+import threading
+import time
+from typing import Callable, List, NamedTuple, Optional
+
+# Etapas del pipeline, en orden
+STAGES = ('decode', 'diarize', 'transcribe', 'merge')
+
+STAGE_LABELS = {
+    'decode': 'Decodificando',
+    'diarize': 'Diarización',
+    'transcribe': 'Transcripción',
+    'merge': 'Combinando',
+}
+
+# Peso aproximado de cada etapa en el tiempo total (para una barra de progreso global)
+SIMPLE_WEIGHTS = {'transcribe': 1.0}
+DIARIZATION_WEIGHTS = {'decode': 0.05, 'diarize': 0.45, 'transcribe': 0.45, 'merge': 0.05}
+
+_subscribers: List[Callable] = []
+_lock = threading.Lock()
+
+
+class ProgressEvent(NamedTuple):
+    """Avance de una etapa de procesamiento."""
+    stage: str
+    fraction: Optional[float]        # 0..1 dentro de la etapa (None si no se conoce la duración)
+    processed_seconds: float         # Segundos de audio procesados en la etapa
+    total_seconds: Optional[float]   # Duración total del audio (None si no se conoce)
+    elapsed: float                   # Segundos de reloj desde que empezó la etapa
+    eta: Optional[float]             # Segundos restantes estimados para la etapa
+    segment: Optional[dict] = None   # Segmento recién terminado (etapa 'transcribe')
+    source: Optional[str] = None     # Archivo de audio
+
+    @property
+    def rtf(self) -> Optional[float]:
+        """Factor de tiempo real: segundos de cálculo por segundo de audio (<1 es más rápido que tiempo real)."""
+        if self.processed_seconds <= 0:
+            return None
+        return self.elapsed / self.processed_seconds
+
+
+def subscribe(callback: Callable) -> Callable:
+    """Registra un callback para todos los eventos de progreso del proceso."""
+    with _lock:
+        _subscribers.append(callback)
+    return callback
+
+
+def unsubscribe(callback: Callable):
+    """Elimina un callback registrado con `subscribe` (no falla si ya no estaba)."""
+    with _lock:
+        if callback in _subscribers:
+            _subscribers.remove(callback)
+
+
+def has_listeners(on_progress: Optional[Callable] = None) -> bool:
+    """Indica si alguien recibirá los eventos (callback directo o suscriptores)."""
+    return on_progress is not None or bool(_subscribers)
+
+
+def emit(event: ProgressEvent, on_progress: Optional[Callable] = None):
+    """Entrega un evento al callback de la llamada y a los suscriptores globales."""
+    with _lock:
+        callbacks = list(_subscribers)
+    if on_progress is not None:
+        on_progress(event)
+    for callback in callbacks:
+        callback(event)
+
+
+class ProgressTracker:
+    """Calcula fracción, tiempo transcurrido y ETA de una etapa y publica los eventos."""
+
+    def __init__(
+        self,
+        stage: str,
+        total_seconds: Optional[float] = None,
+        source: Optional[str] = None,
+        on_progress: Optional[Callable] = None
+    ):
+        """
+        Args:
+            stage (str): Etapa ('decode', 'diarize', 'transcribe', 'merge')
+            total_seconds (float): Duración del audio, si se conoce
+            source (str): Archivo de audio
+            on_progress (callable): Callback de la llamada (además de los suscriptores)
+        """
+        self.stage = stage
+        self.total_seconds = total_seconds
+        self.source = source
+        self.on_progress = on_progress
+        self.started = time.perf_counter()
+        self.processed_seconds = 0.0
+
+    def update(self, processed_seconds: float, segment: Optional[dict] = None) -> ProgressEvent:
+        """
+        Publica el avance hasta `processed_seconds` de audio.
+
+        Returns:
+            ProgressEvent: El evento publicado
+        """
+        self.processed_seconds = max(self.processed_seconds, processed_seconds)
+        elapsed = time.perf_counter() - self.started
+        total = self.total_seconds
+        fraction = eta = None
+        if total:
+            fraction = min(1.0, self.processed_seconds / total)
+            if self.processed_seconds > 0:
+                eta = max(0.0, elapsed * (total - self.processed_seconds) / self.processed_seconds)
+        return self._publish(fraction, elapsed, eta, segment)
+
+    def finish(self) -> ProgressEvent:
+        """Publica el final de la etapa (fracción 1.0, ETA 0)."""
+        if self.total_seconds is None or self.total_seconds < self.processed_seconds:
+            self.total_seconds = self.processed_seconds
+        self.processed_seconds = self.total_seconds
+        return self._publish(1.0, time.perf_counter() - self.started, 0.0, None)
+
+    def _publish(self, fraction, elapsed, eta, segment) -> ProgressEvent:
+        event = ProgressEvent(self.stage, fraction, self.processed_seconds, self.total_seconds,
+                              elapsed, eta, segment, self.source)
+        emit(event, self.on_progress)
+        return event
+
+
+class PipelineProgress:
+    """Combina los eventos de varias etapas en un progreso global y una ETA."""
+
+    def __init__(self, weights: dict = DIARIZATION_WEIGHTS):
+        """
+        Args:
+            weights (dict): Peso de cada etapa ({'diarize': 0.45, ...})
+        """
+        self.weights = dict(weights)
+        self.fractions = {}
+        self.started = time.perf_counter()
+
+    def update(self, event: ProgressEvent) -> float:
+        """Registra un evento y devuelve el progreso global (0..1)."""
+        if event.stage in self.weights and event.fraction is not None:
+            self.fractions[event.stage] = max(self.fractions.get(event.stage, 0.0), event.fraction)
+        return self.fraction
+
+    @property
+    def fraction(self) -> float:
+        total = sum(self.weights.values())
+        done = sum(weight * self.fractions.get(stage, 0.0) for stage, weight in self.weights.items())
+        return done / total if total else 0.0
+
+    @property
+    def eta(self) -> Optional[float]:
+        """Segundos restantes estimados para todo el pipeline (None al principio)."""
+        fraction = self.fraction
+        if fraction <= 0:
+            return None
+        return (time.perf_counter() - self.started) * (1 - fraction) / fraction
+
+
+def format_event(event: ProgressEvent) -> str:
+    """Describe un evento: 'Diarización 45% · 270s/600s de audio · RTF 0.35 · ETA 3m 10s'."""
+    parts = [STAGE_LABELS.get(event.stage, event.stage)]
+    if event.fraction is not None:
+        parts[0] += f" {event.fraction * 100:.0f}%"
+    if event.total_seconds:
+        parts.append(f"{event.processed_seconds:.0f}s/{event.total_seconds:.0f}s de audio")
+    elif event.processed_seconds:
+        parts.append(f"{event.processed_seconds:.0f}s de audio")
+    if event.rtf is not None:
+        parts.append(f"RTF {event.rtf:.2f}")
+    if event.eta is not None:
+        parts.append(f"ETA {format_eta(event.eta)}")
+    return ' · '.join(parts)
+
+
+class ProgressPrinter:
+    """Callback para CLIs: imprime una línea al cambiar de etapa o cada `step` de avance."""
+
+    def __init__(self, step: float = 0.05):
+        """
+        Args:
+            step (float): Avance mínimo (fracción de la etapa) entre dos líneas
+        """
+        self.step = step
+        self.last = (None, None)
+
+    def __call__(self, event: ProgressEvent):
+        stage, fraction = self.last
+        if (event.stage == stage and event.fraction is not None and fraction is not None
+                and event.fraction < 1.0 and event.fraction - fraction < self.step):
+            return
+        if event.stage == stage and event.fraction == fraction:
+            return
+        self.last = (event.stage, event.fraction)
+        print(format_event(event), flush=True)
+
+
+def format_eta(seconds: Optional[float]) -> str:
+    """Formatea una ETA como '1h 02m', '3m 05s' o '12s' ('?' si no se conoce)."""
+    if seconds is None:
+        return '?'
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds}s"
@@ -0,0 +1,157 @@
+"""
+Ventana de cola de archivos de WhisperGUI.
+
+Muestra los elementos de una `JobQueue` (archivo, estado, progreso y tiempo) y
+permite añadir archivos, reordenar los pendientes, cancelar y elegir cuántos se
+procesan en paralelo. Los cambios llegan desde los hilos de la cola y se
+repintan por lotes desde el bucle de Tk.
+"""
+import os
+import threading
+import tkinter as tk
+from pathlib import Path
+from tkinter import filedialog, messagebox, ttk
+
+from .job_queue import JobQueue
+from .progress import format_eta
+
+# Intervalo mínimo entre repintados de la tabla (ms)
+QUEUE_REFRESH_MS = 250
+
+
+def format_row(item) -> tuple:
+    """Valores de la fila de un elemento: (archivo, estado, progreso, tiempo)."""
+    elapsed = item.elapsed
+    return (
+        Path(item.audio_path).name,
+        item.status,
+        f"{int(item.fraction * 100)}%",
+        format_eta(elapsed) if elapsed is not None else "",
+    )
+
+
+class QueuePanel(tk.Toplevel):
+    """Ventana con la tabla de la cola y sus controles."""
+
+    def __init__(self, app, queue: JobQueue):
+        """
+        Args:
+            app (WhisperGUI): Ventana principal (de ella se toman modelo, idioma y modo)
+            queue (JobQueue): Cola a mostrar; su `on_change` pasa a ser este panel
+        """
+        super().__init__(app.root)
+        self.app = app
+        self.queue = queue
+        self._refresh_lock = threading.Lock()
+        self._refresh_scheduled = False
+        queue.on_change = self.on_change
+
+        self.title("Cola de archivos")
+        self.geometry("700x400")
+        self.protocol("WM_DELETE_WINDOW", self.withdraw)
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(1, weight=1)
+
+        controls = ttk.Frame(self, padding="5")
+        controls.grid(row=0, column=0, sticky=(tk.W, tk.E))
+        ttk.Button(controls, text="➕ Añadir archivos", command=self.add_files).pack(side=tk.LEFT, padx=2)
+        ttk.Button(controls, text="▲", width=3, command=lambda: self.move_selected(-1)).pack(side=tk.LEFT)
+        ttk.Button(controls, text="▼", width=3, command=lambda: self.move_selected(1)).pack(side=tk.LEFT)
+        ttk.Button(controls, text="⏹️ Cancelar", command=self.cancel_selected).pack(side=tk.LEFT, padx=2)
+        ttk.Button(controls, text="🗑️ Quitar terminados", command=self.remove_finished).pack(side=tk.LEFT, padx=2)
+        ttk.Label(controls, text="En paralelo:").pack(side=tk.LEFT, padx=(10, 2))
+        self.workers_var = tk.IntVar(value=queue.max_workers)
+        ttk.Spinbox(controls, from_=1, to=max(1, os.cpu_count() or 1), width=4,
+                    textvariable=self.workers_var, command=self.apply_workers).pack(side=tk.LEFT)
+
+        columns = ('archivo', 'estado', 'progreso', 'tiempo')
+        self.tree = ttk.Treeview(self, columns=columns, show='headings', selectmode='browse')
+        for column, width in zip(columns, (330, 110, 80, 80)):
+            self.tree.heading(column, text=column.capitalize())
+            self.tree.column(column, width=width, anchor=tk.W if column == 'archivo' else tk.CENTER)
+        self.tree.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), padx=5, pady=5)
+        scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.tree.yview)
+        scrollbar.grid(row=1, column=1, sticky=(tk.N, tk.S))
+        self.tree.config(yscrollcommand=scrollbar.set)
+        self.refresh()
+
+    def job_options(self) -> dict:
+        """Opciones de `batch.process_file` según la configuración de la ventana principal."""
+        language = self.app.language_var.get()
+        diarize = self.app.transcription_type.get() == "diarization"
+        return {
+            'model_size': self.app.model_var.get(),
+            'language': language if language != "auto" else None,
+            'diarize': diarize,
+            'hf_token': os.getenv('HF_TOKEN') if diarize else None,
+        }
+
+    def add_files(self):
+        """Elegir archivos y añadirlos al final de la cola"""
+        filenames = filedialog.askopenfilenames(
+            parent=self,
+            title='Añadir archivos a la cola',
+            filetypes=(('Archivos de audio', '*.mp3 *.wav *.m4a *.mp4 *.webm *.ogg *.flac'),
+                       ('Todos los archivos', '*.*'))
+        )
+        if not filenames:
+            return
+        options = self.job_options()
+        if options['diarize'] and not options['hf_token']:
+            messagebox.showerror("Token no encontrado",
+                                 "Para usar diarización necesitas configurar HF_TOKEN en el archivo .env",
+                                 parent=self)
+            return
+        self.queue.add(list(filenames), **options)
+
+    def selected_id(self):
+        selection = self.tree.selection()
+        return int(selection[0]) if selection else None
+
+    def move_selected(self, offset: int):
+        item_id = self.selected_id()
+        if item_id is not None and self.queue.move(item_id, offset):
+            self.refresh()
+
+    def cancel_selected(self):
+        item_id = self.selected_id()
+        if item_id is not None:
+            self.queue.cancel(item_id)
+
+    def remove_finished(self):
+        if self.queue.remove_finished():
+            self.refresh()
+
+    def apply_workers(self):
+        try:
+            self.queue.set_max_workers(int(self.workers_var.get()))
+        except (tk.TclError, ValueError):
+            self.workers_var.set(self.queue.max_workers)
+
+    def on_change(self, item):
+        """Cambio en la cola (desde sus hilos): programa un repintado si no hay uno pendiente."""
+        with self._refresh_lock:
+            if self._refresh_scheduled:
+                return
+            self._refresh_scheduled = True
+        self.app.root.after(QUEUE_REFRESH_MS, self.refresh)
+
+    def refresh(self):
+        """Repinta la tabla con el estado actual de la cola (hilo de Tk)."""
+        with self._refresh_lock:
+            self._refresh_scheduled = False
+        items = self.queue.items
+        ids = [str(item.id) for item in items]
+        stale = set(self.tree.get_children()) - set(ids)
+        if stale:
+            self.tree.delete(*stale)
+        for position, item in enumerate(items):
+            iid = str(item.id)
+            if self.tree.exists(iid):
+                self.tree.item(iid, values=format_row(item))
+                self.tree.move(iid, '', position)
+            else:
+                self.tree.insert('', position, iid=iid, values=format_row(item))
+        if any(item.started is not None and item.finished is None for item in items):
+            # Mantener el reloj de los elementos en curso aunque no lleguen eventos
+            self.on_change(None)
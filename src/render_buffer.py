@@ -0,0 +1,89 @@
+"""
+Buffer de renderizado para la GUI.
+
+Los eventos de progreso llegan desde el hilo de trabajo, a veces cientos por
+segundo. En lugar de programar una llamada a Tk por evento, se acumulan aquí
+(texto nuevo, segmentos y último estado de progreso) y la GUI los vuelca en lotes a un
+ritmo acotado desde su bucle principal.
+"""
+import threading
+from collections import deque
+from typing import List, Optional, Tuple
+
+# Caracteres máximos insertados en el widget por volcado (mantiene fluido el bucle de Tk)
+RENDER_CHUNK_CHARS = 20000
+
+
+class RenderBuffer:
+    """Acumula texto y progreso de otros hilos para volcarlos en Tk por lotes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._chunks = deque()
+        self._segments = []
+        self._progress = None
+        self._scheduled = False
+
+    def append(self, text: str, segment: Optional[dict] = None) -> bool:
+        """
+        Añade texto pendiente de mostrar (y el segmento del que sale, si lo hay).
+
+        Returns:
+            bool: True si el llamador debe programar un volcado (no había uno pendiente)
+        """
+        with self._lock:
+            if text:
+                self._chunks.append(text)
+            if segment is not None:
+                self._segments.append(segment)
+            return self._request()
+
+    def set_progress(self, value: float, message: str) -> bool:
+        """Guarda el último estado de progreso (los anteriores sin volcar se descartan)."""
+        with self._lock:
+            self._progress = (value, message)
+            return self._request()
+
+    def _request(self) -> bool:
+        if self._scheduled:
+            return False
+        self._scheduled = True
+        return True
+
+    def drain(self, max_chars: int = RENDER_CHUNK_CHARS) -> Tuple[str, Optional[tuple]]:
+        """
+        Extrae el texto pendiente (hasta `max_chars`) y el último progreso.
+
+        Returns:
+            tuple: (texto, (valor, mensaje) o None)
+        """
+        with self._lock:
+            parts, size = [], 0
+            while self._chunks and size < max_chars:
+                chunk = self._chunks.popleft()
+                if size + len(chunk) > max_chars:
+                    cut = max_chars - size
+                    self._chunks.appendleft(chunk[cut:])
+                    chunk = chunk[:cut]
+                parts.append(chunk)
+                size += len(chunk)
+            progress, self._progress = self._progress, None
+            self._scheduled = bool(self._chunks)
+            return ''.join(parts), progress
+
+    def take_segments(self) -> List[dict]:
+        """Extrae los segmentos recibidos desde la última llamada."""
+        with self._lock:
+            segments, self._segments = self._segments, []
+            return segments
+
+    @property
+    def pending(self) -> bool:
+        with self._lock:
+            return bool(self._chunks)
+
+    def clear_text(self):
+        """Descarta el texto y los segmentos pendientes (p.ej. al mostrar el resultado final)."""
+        with self._lock:
+            self._chunks.clear()
+            self._segments.clear()
@@ -0,0 +1,268 @@
+"""
+Caché en disco de resultados de transcripción, direccionada por contenido.
+
+La clave combina el hash SHA-256 del audio con todos los parámetros que
+afectan a la salida (modelo, idioma, opciones de decodificación) y las
+versiones de las librerías, de modo que repetir una transcripción idéntica
+devuelve el resultado guardado sin cargar el modelo. El tamaño total está
+acotado: al superarlo se eliminan las entradas usadas hace más tiempo (LRU).
+
+La diarización usa el mismo formato en un directorio propio: su resultado no
+depende del modelo Whisper ni del idioma, así que se reutiliza al cambiarlos.
+
+Configuración por variables de entorno:
+    WHISPER_CACHE=0            Desactivar las cachés
+    WHISPER_CACHE_DIR=ruta     Directorio (por defecto ~/.cache/poc_whisper/transcripciones)
+    DIARIZATION_CACHE_DIR=ruta Directorio de diarizaciones (por defecto ~/.cache/poc_whisper/diarizaciones)
+    WHISPER_CACHE_MAX_MB=N     Tamaño máximo de cada caché (por defecto 500 MB)
+
+Uso:
+    python -m src.result_cache [--diarization] [list|stats|prune [--max-mb N]|clear]
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, List, Optional
+
+DEFAULT_CACHE_DIR = Path.home() / '.cache' / 'poc_whisper' / 'transcripciones'
+DEFAULT_DIARIZATION_CACHE_DIR = Path.home() / '.cache' / 'poc_whisper' / 'diarizaciones'
+DEFAULT_MAX_MB = 500
+
+# Paquetes cuya versión puede cambiar el resultado de una transcripción
+VERSIONED_PACKAGES = ('openai-whisper', 'torch', 'numpy')
+
+
+def cache_enabled(cache: Optional[bool] = None) -> bool:
+    """Resuelve el parámetro `cache` (None = variable de entorno `WHISPER_CACHE`, activa por defecto)."""
+    if cache is None:
+        return os.getenv('WHISPER_CACHE', '1').lower() not in ('0', 'false', 'no')
+    return bool(cache)
+
+
+def hash_file(path: str, chunk_size: int = 1 << 20, on_chunk: Optional[Callable[[], None]] = None) -> str:
+    """
+    Hash SHA-256 del contenido de un archivo, leído por bloques.
+
+    Args:
+        path (str): Archivo
+        chunk_size (int): Bytes por bloque
+        on_chunk (callable): Se llama tras cada bloque (p.ej. para atender una cancelación)
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+            if on_chunk is not None:
+                on_chunk()
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=8)
+def library_versions(packages: Optional[tuple] = None) -> dict:
+    """Versiones instaladas de `packages` (None = `VERSIONED_PACKAGES`), sin importarlos."""
+    from importlib import metadata
+
+    versions = {}
+    for package in packages or VERSIONED_PACKAGES:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+def make_key(audio_hash: str, packages: Optional[tuple] = None, **params) -> str:
+    """
+    Construye la clave de caché de un resultado.
+
+    Args:
+        audio_hash (str): Hash del contenido del audio
+        packages (tuple): Paquetes cuya versión forma parte de la clave (None = `VERSIONED_PACKAGES`)
+        **params: Parámetros que afectan a la salida (modelo, idioma, opciones...)
+
+    Returns:
+        str: Clave hexadecimal estable
+    """
+    payload = {'audio': audio_hash, 'params': params, 'versions': library_versions(packages)}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def _to_json(value):
+    """Convierte tipos de numpy/torch presentes en los resultados de Whisper a JSON."""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+
+class ResultCache:
+    """Almacén de resultados en disco con límite de tamaño y desalojo LRU."""
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None):
+        """
+        Args:
+            directory (str): Directorio de la caché (None = `WHISPER_CACHE_DIR` o el de por defecto)
+            max_bytes (int): Tamaño máximo (None = `WHISPER_CACHE_MAX_MB` o 500 MB)
+        """
+        self.directory = Path(directory or os.getenv('WHISPER_CACHE_DIR') or DEFAULT_CACHE_DIR)
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv('WHISPER_CACHE_MAX_MB', DEFAULT_MAX_MB)) * 1024 * 1024)
+        self.max_bytes = max_bytes
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[dict]:
+        """Devuelve el resultado guardado para `key` (o None) y lo marca como usado recientemente."""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return entry.get('result')
+
+    def put(self, key: str, result: dict, meta: Optional[dict] = None):
+        """
+        Guarda un resultado de forma atómica y aplica el límite de tamaño.
+
+        Args:
+            key (str): Clave de `make_key`
+            result (dict): Resultado de `transcribe_audio`
+            meta (dict): Información descriptiva para `list` (archivo, modelo...)
+        """
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {'meta': dict(meta or {}, created=time.time()), 'result': result}
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False, default=_to_json)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self.prune()
+
+    def entries(self) -> List[dict]:
+        """Entradas de la caché ordenadas de la menos a la más recientemente usada."""
+        entries = []
+        for path in self.directory.glob('*/*.json'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append({'key': path.stem, 'path': str(path), 'size': stat.st_size, 'last_used': stat.st_mtime})
+        entries.sort(key=lambda e: e['last_used'])
+        return entries
+
+    def meta(self, key: str) -> dict:
+        """Metadatos guardados con una entrada ({} si no existe o está dañada)."""
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                return json.load(f).get('meta', {})
+        except (OSError, ValueError):
+            return {}
+
+    def prune(self, max_bytes: Optional[int] = None) -> int:
+        """
+        Elimina las entradas menos usadas hasta respetar el límite de tamaño.
+
+        Args:
+            max_bytes (int): Límite a aplicar (None = el de la caché)
+
+        Returns:
+            int: Número de entradas eliminadas
+        """
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = self.entries()
+        total = sum(e['size'] for e in entries)
+        removed = 0
+        for entry in entries:
+            if total <= limit:
+                break
+            try:
+                os.remove(entry['path'])
+            except OSError:
+                continue
+            total -= entry['size']
+            removed += 1
+        return removed
+
+    def clear(self) -> int:
+        """Elimina todas las entradas. Devuelve cuántas se borraron."""
+        return self.prune(0)
+
+    def stats(self) -> dict:
+        """Número de entradas, bytes ocupados y límite configurado."""
+        entries = self.entries()
+        return {
+            'directory': str(self.directory),
+            'entries': len(entries),
+            'bytes': sum(e['size'] for e in entries),
+            'max_bytes': self.max_bytes,
+        }
+
+
+def diarization_cache() -> ResultCache:
+    """Caché de diarizaciones (`DIARIZATION_CACHE_DIR` o el directorio por defecto)."""
+    return ResultCache(os.getenv('DIARIZATION_CACHE_DIR') or DEFAULT_DIARIZATION_CACHE_DIR)
+
+
+def describe_meta(meta: dict) -> str:
+    """Resumen de una entrada para `list`: modelo e idioma, o pipeline y hablantes."""
+    if 'pipeline' in meta:
+        speakers = meta.get('num_speakers')
+        return f"[{meta['pipeline']}, {f'{speakers} hablantes' if speakers else 'hablantes auto'}]"
+    return f"[{meta.get('model_size', '?')}, {meta.get('language') or 'auto'}]"
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.result_cache",
+        description="Inspecciona y poda la caché en disco de transcripciones."
+    )
+    parser.add_argument('--dir', default=None, help="Directorio de la caché (default: WHISPER_CACHE_DIR)")
+    parser.add_argument('--diarization', action='store_true',
+                        help="Operar sobre la caché de diarizaciones (DIARIZATION_CACHE_DIR)")
+    sub = parser.add_subparsers(dest='command')
+    sub.add_parser('list', help="Lista las entradas, de la menos a la más recientemente usada")
+    sub.add_parser('stats', help="Muestra el tamaño total de la caché")
+    prune = sub.add_parser('prune', help="Elimina las entradas menos usadas hasta el límite")
+    prune.add_argument('--max-mb', type=float, default=None, help="Límite en MB (default: WHISPER_CACHE_MAX_MB)")
+    sub.add_parser('clear', help="Vacía la caché")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    cache = diarization_cache() if args.diarization and not args.dir else ResultCache(args.dir)
+    command = args.command or 'stats'
+
+    if command == 'list':
+        for entry in cache.entries():
+            meta = cache.meta(entry['key'])
+            used = time.strftime('%Y-%m-%d %H:%M', time.localtime(entry['last_used']))
+            print(f"{entry['key'][:12]}  {entry['size'] / 1024:8.1f} KB  {used}  "
+                  f"{meta.get('audio_path', '?')} {describe_meta(meta)}")
+    elif command == 'prune':
+        limit = None if args.max_mb is None else int(args.max_mb * 1024 * 1024)
+        print(f"Entradas eliminadas: {cache.prune(limit)}")
+    elif command == 'clear':
+        print(f"Entradas eliminadas: {cache.clear()}")
+
+    stats = cache.stats()
+    print(f"Caché: {stats['directory']} - {stats['entries']} entradas, "
+          f"{stats['bytes'] / 1024 / 1024:.1f} MB de {stats['max_bytes'] / 1024 / 1024:.0f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
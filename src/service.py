@@ -0,0 +1,332 @@
+"""
+Servicio HTTP local de transcripción.
+
+Otros servicios pueden enviar trabajos sin lanzar `python src/transcribe.py` (y
+pagar el arranque en frío) cada vez: el servicio mantiene un pool acotado de
+procesos trabajadores con los modelos cargados (`JobQueue`) y una cola de
+pendientes limitada.
+
+API (JSON, sólo en 127.0.0.1 por defecto):
+    POST   /jobs              {"audio_path", "model", "language", "diarize", "num_speakers"}
+                              -> 202 {"id", "status", ...}  (429 si la cola está llena)
+    GET    /jobs/<id>         Estado, progreso y tiempo del trabajo
+    GET    /jobs/<id>/result  Resultado (409 si aún no ha terminado o falló)
+    DELETE /jobs/<id>         Cancelar (pendiente o en curso)
+    GET    /health            Trabajadores, pendientes y en curso
+
+El audio se indica por ruta: el servicio es local y lee el mismo disco que el
+cliente. Con `--fake` los trabajos usan un modelo simulado (carga y tiempo de
+proceso configurables) para pruebas de carga sin Whisper ni GPU.
+
+Uso:
+    python -m src.service [--port 8765] [--workers 2] [--max-pending 100] [--fake]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Optional
+
+from .job_queue import DONE, PENDING, RUNNING, JobQueue, QueueFull
+from .progress import ProgressTracker
+from .thread_policy import ThreadPolicy, add_thread_arguments, policy_from_args
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = int(os.getenv('WHISPER_SERVICE_PORT', 8765))
+
+# Trabajos pendientes admitidos antes de responder 429
+DEFAULT_MAX_PENDING = 100
+
+# Trabajos terminados que se conservan para consultar su resultado
+DEFAULT_KEEP_FINISHED = 1000
+
+_JOB_PATH = re.compile(r'^/jobs/(\d+)(/result)?$')
+
+
+def run_job(audio_path: str, options: dict) -> dict:
+    """
+    Trabajo real de cada proceso trabajador.
+
+    Returns:
+        dict: Resultado de `transcribe_audio`, o {'text', 'segments'} con hablantes
+    """
+    if options.get('diarize'):
+        from .diarize import format_transcription_by_speaker, transcribe_with_speaker_diarization
+        segments = transcribe_with_speaker_diarization(
+            audio_path, options.get('hf_token'), options.get('model_size', 'base'),
+            options.get('language'), options.get('num_speakers')
+        )
+        return {'text': format_transcription_by_speaker(segments), 'segments': segments}
+    from .transcribe import transcribe_audio
+    return transcribe_audio(audio_path, options.get('model_size', 'base'), options.get('language'))
+
+
+_fake_models = set()
+
+
+def fake_job(audio_path: str, options: dict) -> dict:
+    """
+    Modelo simulado para pruebas de carga: la primera vez que un proceso usa un
+    modelo espera `fake_load` segundos y cada trabajo tarda `fake_seconds`.
+    """
+    model_size = options.get('model_size', 'base')
+    if model_size not in _fake_models:
+        time.sleep(options.get('fake_load', 0.0))
+        _fake_models.add(model_size)
+    seconds = options.get('fake_seconds', 0.0)
+    tracker = ProgressTracker('transcribe', 10.0, audio_path)
+    for step in range(10):
+        time.sleep(seconds / 10)
+        tracker.update(step + 1.0)
+    segment = {'start': 0.0, 'end': 10.0, 'text': f" {os.path.basename(audio_path)}"}
+    return {'text': segment['text'], 'segments': [segment], 'language': options.get('language'),
+            'pid': os.getpid()}
+
+
+class TranscriptionService:
+    """Cola de trabajos del servicio y operaciones de la API, sin detalles de HTTP."""
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        keep_finished: int = DEFAULT_KEEP_FINISHED,
+        task: Optional[Callable] = None,
+        job_defaults: Optional[dict] = None,
+        worker_factory: Optional[Callable] = None,
+        thread_policy: Optional[ThreadPolicy] = None
+    ):
+        """
+        Args:
+            workers (int): Procesos trabajadores con el modelo cargado
+            max_pending (int): Trabajos pendientes admitidos
+            keep_finished (int): Trabajos terminados que se conservan
+            task (callable): Trabajo f(audio_path, options) (None = `run_job`)
+            job_defaults (dict): Opciones añadidas a cada trabajo (p.ej. las de `fake_job`)
+            worker_factory (callable): Ver `JobQueue`
+            thread_policy (ThreadPolicy): Política a repartir entre los trabajadores
+        """
+        self.keep_finished = keep_finished
+        self.job_defaults = dict(job_defaults or {})
+        self.queue = JobQueue(max_workers=workers, worker_factory=worker_factory,
+                              thread_policy=thread_policy, task=task or run_job, max_pending=max_pending)
+
+    def submit(self, payload: dict) -> dict:
+        """
+        Encola un trabajo.
+
+        Raises:
+            ValueError: Si la petición no es válida
+            QueueFull: Si ya hay `max_pending` trabajos esperando
+        """
+        audio_path = payload.get('audio_path')
+        if not isinstance(audio_path, str) or not audio_path:
+            raise ValueError("Falta 'audio_path'")
+        if not os.path.exists(audio_path):
+            raise ValueError(f"El archivo {audio_path} no existe")
+        num_speakers = payload.get('num_speakers')
+        if num_speakers is not None and (type(num_speakers) is not int or num_speakers < 1):
+            raise ValueError("'num_speakers' debe ser un entero positivo o null")
+        diarize = bool(payload.get('diarize'))
+        options = dict(self.job_defaults)
+        options.update(
+            model_size=payload.get('model') or 'base',
+            language=payload.get('language') or None,
+            diarize=diarize,
+            num_speakers=num_speakers,
+        )
+        if diarize:
+            options['hf_token'] = os.getenv('HF_TOKEN')
+            if not options['hf_token'] and 'fake_seconds' not in options:
+                raise ValueError("La diarización necesita HF_TOKEN en el entorno del servicio")
+        self.queue.remove_finished(keep=self.keep_finished)
+        item = self.queue.add([audio_path], **options)[0]
+        return self.describe(item)
+
+    @staticmethod
+    def describe(item) -> dict:
+        elapsed = item.elapsed
+        return {
+            'id': item.id,
+            'audio_path': item.audio_path,
+            'status': item.status,
+            'progress': round(item.fraction, 4),
+            'elapsed': round(elapsed, 3) if elapsed is not None else None,
+            'error': item.error,
+        }
+
+    def status(self, item_id: int) -> Optional[dict]:
+        item = self.queue.get(item_id)
+        return self.describe(item) if item is not None else None
+
+    def result(self, item_id: int):
+        """Devuelve (item, resultado); el resultado es None si no ha terminado bien."""
+        item = self.queue.get(item_id)
+        if item is None or item.status != DONE:
+            return item, None
+        return item, item.result
+
+    def cancel(self, item_id: int) -> Optional[dict]:
+        """
+        Cancela un trabajo.
+
+        Returns:
+            dict: Su estado tras cancelarlo con 'cancelled' (False si ya había
+            terminado), o None si no existe. Se toma del propio elemento, así que
+            sirve aunque otra petición lo quite de la cola entretanto
+        """
+        item = self.queue.get(item_id)
+        if item is None:
+            return None
+        cancelled = self.queue.cancel(item_id)
+        return {'cancelled': cancelled, **self.describe(item)}
+
+    def health(self) -> dict:
+        items = self.queue.items
+        return {
+            'workers': self.queue.max_workers,
+            'pending': sum(1 for item in items if item.status == PENDING),
+            'running': sum(1 for item in items if item.status == RUNNING),
+            'max_pending': self.queue.max_pending,
+        }
+
+    def shutdown(self):
+        self.queue.shutdown()
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """Traduce las peticiones HTTP a operaciones de `TranscriptionService`."""
+
+    server_version = 'WhisperService/1.0'
+
+    @property
+    def service(self) -> TranscriptionService:
+        return self.server.service
+
+    def log_message(self, format, *args):
+        if getattr(self.server, 'verbose', False):
+            super().log_message(format, *args)
+
+    def send_json(self, code: int, body: dict):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_error_json(self, code: int, message: str, **extra):
+        self.send_json(code, {'error': message, **extra})
+
+    def do_GET(self):
+        if self.path == '/health':
+            self.send_json(HTTPStatus.OK, self.service.health())
+            return
+        match = _JOB_PATH.match(self.path)
+        if match is None:
+            self.send_error_json(HTTPStatus.NOT_FOUND, "Ruta no encontrada")
+            return
+        item_id = int(match.group(1))
+        if match.group(2):
+            item, result = self.service.result(item_id)
+            if item is None:
+                self.send_error_json(HTTPStatus.NOT_FOUND, "Trabajo no encontrado")
+            elif result is None:
+                self.send_error_json(HTTPStatus.CONFLICT, "El trabajo no tiene resultado",
+                                     **self.service.describe(item))
+            else:
+                self.send_json(HTTPStatus.OK, result)
+            return
+        status = self.service.status(item_id)
+        if status is None:
+            self.send_error_json(HTTPStatus.NOT_FOUND, "Trabajo no encontrado")
+        else:
+            self.send_json(HTTPStatus.OK, status)
+
+    def do_POST(self):
+        if self.path != '/jobs':
+            self.send_error_json(HTTPStatus.NOT_FOUND, "Ruta no encontrada")
+            return
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            payload = json.loads(self.rfile.read(length) or b'{}')
+            if not isinstance(payload, dict):
+                raise ValueError("Se esperaba un objeto JSON")
+            self.send_json(HTTPStatus.ACCEPTED, self.service.submit(payload))
+        except QueueFull as e:
+            self.send_error_json(HTTPStatus.TOO_MANY_REQUESTS, str(e))
+        except ValueError as e:
+            # json.JSONDecodeError también es ValueError
+            self.send_error_json(HTTPStatus.BAD_REQUEST, str(e))
+
+    def do_DELETE(self):
+        match = _JOB_PATH.match(self.path)
+        if match is None or match.group(2):
+            self.send_error_json(HTTPStatus.NOT_FOUND, "Ruta no encontrada")
+            return
+        body = self.service.cancel(int(match.group(1)))
+        if body is None:
+            self.send_error_json(HTTPStatus.NOT_FOUND, "Trabajo no encontrado")
+        else:
+            self.send_json(HTTPStatus.OK, body)
+
+
+def make_server(service: TranscriptionService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                verbose: bool = False) -> ThreadingHTTPServer:
+    """Crea el servidor HTTP (un hilo por petición) sin arrancarlo; port=0 elige uno libre."""
+    server = ThreadingHTTPServer((host, port), ServiceHandler)
+    server.daemon_threads = True
+    server.service = service
+    server.verbose = verbose
+    return server
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.service",
+        description="Servicio HTTP local de transcripción con trabajadores precargados."
+    )
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f"Dirección (default: {DEFAULT_HOST})")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"Puerto (default: {DEFAULT_PORT})")
+    parser.add_argument('--workers', type=int, default=2, help="Procesos trabajadores (default: 2)")
+    parser.add_argument('--max-pending', type=int, default=DEFAULT_MAX_PENDING,
+                        help=f"Trabajos en espera antes de responder 429 (default: {DEFAULT_MAX_PENDING})")
+    parser.add_argument('--fake', action='store_true', help="Usar un modelo simulado (pruebas de carga)")
+    parser.add_argument('--fake-load', type=float, default=2.0,
+                        help="Segundos de carga del modelo simulado por trabajador (default: 2)")
+    parser.add_argument('--fake-seconds', type=float, default=0.5,
+                        help="Segundos de proceso por trabajo simulado (default: 0.5)")
+    parser.add_argument('--verbose', action='store_true', help="Registrar cada petición")
+    return add_thread_arguments(parser, workers=False)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    task, defaults = None, None
+    if args.fake:
+        task, defaults = fake_job, {'fake_load': args.fake_load, 'fake_seconds': args.fake_seconds}
+    service = TranscriptionService(workers=args.workers, max_pending=args.max_pending, task=task,
+                                   job_defaults=defaults, thread_policy=policy_from_args(args))
+    server = make_server(service, args.host, args.port, args.verbose)
+    host, port = server.server_address[:2]
+    mode = " (modelo simulado)" if args.fake else ""
+    print(f"Servicio de transcripción en http://{host}:{port} con {args.workers} trabajador(es){mode}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nDeteniendo el servicio...")
+    finally:
+        server.server_close()
+        service.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
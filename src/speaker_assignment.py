@@ -0,0 +1,252 @@
+"""
+Asignación de hablantes a segmentos de Whisper mediante barrido (sweep-line).
+
+`get_speaker_for_segment` recorre todos los turnos de la diarización por cada
+segmento (O(segmentos × turnos)). Aquí los turnos se materializan una sola vez
+en arrays ordenados y todos los segmentos se asignan en un único barrido, con
+el mismo resultado (hablante con mayor solapamiento, "UNKNOWN" si no hay).
+
+`attribute_speakers_vectorized` resuelve lo mismo en bloque con NumPy y además
+devuelve los solapamientos por hablante y el ratio de cobertura de cada segmento.
+"""
+import heapq
+from typing import Iterable, List, NamedTuple
+
+
+class SpeakerTurns:
+    """Turnos de una diarización materializados como arrays paralelos."""
+
+    def __init__(self, starts: list, ends: list, labels: list):
+        """
+        Args:
+            starts (list): Inicio de cada turno, en el orden original de `itertracks`
+            ends (list): Fin de cada turno
+            labels (list): Hablante de cada turno
+        """
+        self.starts = list(starts)
+        self.ends = list(ends)
+        self.labels = list(labels)
+        # Índices de los turnos ordenados por inicio (sort estable)
+        self.order = sorted(range(len(self.starts)), key=self.starts.__getitem__)
+
+    @classmethod
+    def from_diarization(cls, diarization) -> 'SpeakerTurns':
+        """Recorre `diarization.itertracks` una única vez."""
+        starts, ends, labels = [], [], []
+        for turn, _, speaker in diarization.itertracks(yield_label=True):
+            starts.append(turn.start)
+            ends.append(turn.end)
+            labels.append(speaker)
+        return cls(starts, ends, labels)
+
+    def to_dict(self) -> dict:
+        """Forma serializable compacta: etiquetas únicas y turnos [inicio, fin, índice de etiqueta]."""
+        names = list(dict.fromkeys(self.labels))
+        index = {name: i for i, name in enumerate(names)}
+        return {
+            'labels': names,
+            'turns': [[float(s), float(e), index[label]] for s, e, label in zip(self.starts, self.ends, self.labels)],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'SpeakerTurns':
+        """Reconstruye los turnos guardados con `to_dict` (mismo orden original)."""
+        names = data['labels']
+        turns = data['turns']
+        return cls([t[0] for t in turns], [t[1] for t in turns], [names[t[2]] for t in turns])
+
+    def __len__(self):
+        return len(self.starts)
+
+
+def assign_speakers(diarization, segments: Iterable[dict]) -> List[str]:
+    """
+    Asigna a cada segmento el hablante con mayor solapamiento temporal.
+
+    Equivale a llamar a `get_speaker_for_segment` para cada segmento (incluido el
+    desempate y la suma de solapamientos en el orden original de los turnos),
+    pero en O((segmentos + turnos) · log turnos + solapamientos).
+
+    Args:
+        diarization: Resultado de pyannote o un `SpeakerTurns` ya materializado
+        segments (iterable): Segmentos con claves 'start' y 'end'
+
+    Returns:
+        list: Hablante de cada segmento, en el mismo orden que `segments`
+    """
+    turns = diarization if isinstance(diarization, SpeakerTurns) else SpeakerTurns.from_diarization(diarization)
+    segments = list(segments)
+    speakers = ["UNKNOWN"] * len(segments)
+    if not segments or not len(turns):
+        return speakers
+
+    starts, ends, labels, order = turns.starts, turns.ends, turns.labels, turns.order
+    seg_order = sorted(range(len(segments)), key=lambda i: segments[i]['start'])
+
+    active = []  # heap de (fin, índice original) de turnos ya iniciados
+    next_turn = 0
+    for i in seg_order:
+        seg_start = segments[i]['start']
+        seg_end = segments[i]['end']
+
+        # Incorporar los turnos que empiezan antes del fin del segmento
+        while next_turn < len(order) and starts[order[next_turn]] < seg_end:
+            idx = order[next_turn]
+            heapq.heappush(active, (ends[idx], idx))
+            next_turn += 1
+
+        # Los inicios de segmento son crecientes: un turno que acaba antes de
+        # este inicio ya no puede solapar con ningún segmento posterior
+        while active and active[0][0] <= seg_start:
+            heapq.heappop(active)
+
+        # Turnos activos que solapan de verdad (el fin de segmentos previos puede
+        # haber incorporado turnos que empiezan después de este fin)
+        overlapping = sorted(idx for _, idx in active if starts[idx] < seg_end)
+        if not overlapping:
+            continue
+
+        speaker_times = {}
+        for idx in overlapping:
+            overlap_duration = min(ends[idx], seg_end) - max(starts[idx], seg_start)
+            speaker_times[labels[idx]] = speaker_times.get(labels[idx], 0) + overlap_duration
+        speakers[i] = max(speaker_times, key=speaker_times.get)
+
+    return speakers
+
+
+class SpeakerAttribution(NamedTuple):
+    """Resultado de `attribute_speakers_vectorized`."""
+    speakers: list      # hablante asignado a cada segmento ("UNKNOWN" si no hay solapamiento)
+    ratios: object      # np.ndarray: fracción del segmento cubierta por el hablante asignado
+    scores: object      # np.ndarray (segmentos × hablantes): segundos de solapamiento por hablante
+    labels: list        # hablante de cada columna de `scores`
+
+
+def attribute_speakers_vectorized(
+    seg_starts,
+    seg_ends,
+    turn_starts,
+    turn_ends,
+    turn_labels,
+    chunk_size: int = 1 << 20
+) -> SpeakerAttribution:
+    """
+    Atribuye hablantes a todos los segmentos con NumPy, sin bucles por segmento ni por hablante.
+
+    Con los turnos ordenados por inicio, cada segmento sólo puede solapar con un
+    rango contiguo de turnos (`searchsorted`). Esos pares segmento × turno se
+    generan de una vez y se agregan por (segmento, hablante): `np.bincount`
+    suma los solapamientos y `np.minimum.at` guarda el primer turno de cada
+    hablante para el desempate. Los pares se generan por bloques de segmentos
+    para acotar la memoria.
+
+    Args:
+        seg_starts, seg_ends: Inicio y fin de cada segmento (array-like)
+        turn_starts, turn_ends: Inicio y fin de cada turno de la diarización
+        turn_labels: Hablante de cada turno
+        chunk_size (int): Máximo de pares segmento × turno por bloque (un bloque
+            tiene al menos un segmento)
+
+    Returns:
+        SpeakerAttribution: hablante, ratio de solapamiento y puntuaciones por hablante.
+        Los empates se resuelven como en `get_speaker_for_segment`: gana el hablante
+        cuyo primer turno solapado aparece antes en la diarización.
+    """
+    import numpy as np
+
+    seg_starts = np.asarray(seg_starts, dtype=np.float64)
+    seg_ends = np.asarray(seg_ends, dtype=np.float64)
+    turn_starts = np.asarray(turn_starts, dtype=np.float64)
+    turn_ends = np.asarray(turn_ends, dtype=np.float64)
+
+    # Índice de etiqueta por turno, con las columnas en orden de primera aparición
+    labels = list(dict.fromkeys(turn_labels))
+    label_index = {label: i for i, label in enumerate(labels)}
+    turn_label_idx = np.fromiter((label_index[label] for label in turn_labels), dtype=np.int64,
+                                 count=len(turn_starts))
+
+    n_segments, n_speakers = len(seg_starts), len(labels)
+    scores = np.zeros((n_segments, n_speakers))
+    # Primer turno (orden original) de cada hablante que solapa con el segmento;
+    # sirve para desempatar igual que el bucle escalar
+    no_turn = len(turn_starts)
+    first_turn = np.full((n_segments, n_speakers), no_turn, dtype=np.int64)
+
+    if n_segments and n_speakers:
+        order = np.argsort(turn_starts, kind='stable')
+        ts, te, tl = turn_starts[order], turn_ends[order], turn_label_idx[order]
+        # Máximo acumulado de los fines: los turnos anteriores a `lo` acaban antes del segmento
+        ends_cummax = np.maximum.accumulate(te)
+        lo_all = np.searchsorted(ends_cummax, seg_starts, side='right')
+        hi_all = np.searchsorted(ts, seg_ends, side='left')
+        counts_all = np.maximum(hi_all - lo_all, 0)
+        pairs_until = np.cumsum(counts_all)
+
+        first = 0
+        while first < n_segments:
+            done = int(pairs_until[first - 1]) if first else 0
+            last = max(int(np.searchsorted(pairs_until, done + chunk_size, side='right')), first + 1)
+            block = slice(first, last)
+            first = last
+            lo, counts = lo_all[block], counts_all[block]
+            total = int(pairs_until[last - 1]) - done
+            if not total:
+                continue
+            # Pares (segmento del bloque, turno candidato)
+            pair_seg = np.repeat(np.arange(len(counts)), counts)
+            offsets = np.cumsum(counts) - counts
+            pair_turn = np.arange(total) - np.repeat(offsets - lo, counts)
+
+            s = seg_starts[block][pair_seg]
+            e = seg_ends[block][pair_seg]
+            ps, pe = ts[pair_turn], te[pair_turn]
+            hit = (ps < e) & (pe > s)
+            pair_seg, pair_turn = pair_seg[hit], pair_turn[hit]
+            overlap = np.minimum(pe[hit], e[hit]) - np.maximum(ps[hit], s[hit])
+
+            key = pair_seg * n_speakers + tl[pair_turn]
+            size = len(counts) * n_speakers
+            scores[block] = np.bincount(key, weights=overlap, minlength=size).reshape(-1, n_speakers)
+            block_first = np.full(size, no_turn, dtype=np.int64)
+            np.minimum.at(block_first, key, order[pair_turn])
+            first_turn[block] = block_first.reshape(-1, n_speakers)
+
+    hits = first_turn < no_turn
+    has_speaker = hits.any(axis=1)
+    if n_speakers:
+        best_overlap = np.where(hits, scores, -np.inf).max(axis=1)
+        tied = hits & (scores == best_overlap[:, None])
+        best = np.where(tied, first_turn, no_turn).argmin(axis=1)
+        best_overlap = np.where(has_speaker, best_overlap, 0.0)
+    else:
+        best = np.zeros(n_segments, dtype=np.int64)
+        best_overlap = np.zeros(n_segments)
+
+    durations = seg_ends - seg_starts
+    ratios = np.divide(best_overlap, durations, out=np.zeros(n_segments), where=durations > 0)
+    speakers = [labels[b] if h else "UNKNOWN" for b, h in zip(best.tolist(), has_speaker.tolist())]
+    return SpeakerAttribution(speakers, ratios, scores, labels)
+
+
+def attribute_speakers(diarization, segments: Iterable[dict]) -> SpeakerAttribution:
+    """
+    Variante de `attribute_speakers_vectorized` que acepta directamente la
+    diarización (o `SpeakerTurns`) y los segmentos de Whisper.
+
+    Args:
+        diarization: Resultado de pyannote o un `SpeakerTurns` ya materializado
+        segments (iterable): Segmentos con claves 'start' y 'end'
+
+    Returns:
+        SpeakerAttribution
+    """
+    turns = diarization if isinstance(diarization, SpeakerTurns) else SpeakerTurns.from_diarization(diarization)
+    segments = list(segments)
+    return attribute_speakers_vectorized(
+        [seg['start'] for seg in segments],
+        [seg['end'] for seg in segments],
+        turns.starts,
+        turns.ends,
+        turns.labels
+    )
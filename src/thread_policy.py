@@ -0,0 +1,185 @@
+"""
+Política de hilos de CPU para transcripción y diarización.
+
+Con varios procesos trabajadores en la misma máquina, dejar que cada uno use
+todos los núcleos provoca sobresuscripción. La política se aplica
+explícitamente al empezar cada trabajo (nunca al importar):
+
+    threads          Hilos intra-op de torch por trabajador
+    interop_threads  Hilos inter-op de torch (sólo se puede fijar una vez por proceso)
+    affinity         Núcleos permitidos al proceso (Linux), ej: {0, 1, 2, 3}
+
+Configuración por variables de entorno:
+    WHISPER_THREADS=N            Hilos por trabajador (por defecto: núcleos disponibles)
+    WHISPER_INTEROP_THREADS=N    Hilos inter-op (por defecto 1)
+    WHISPER_CPU_AFFINITY=0-3,8   Núcleos permitidos (por defecto sin restricción)
+"""
+import os
+from typing import List, NamedTuple, Optional, Set
+
+# Valor inter-op por defecto: mínimo para interoperabilidad
+DEFAULT_INTEROP_THREADS = 1
+
+_interop_applied = None
+
+
+def parse_cpu_list(value: str) -> Set[int]:
+    """
+    Convierte una lista de núcleos estilo `taskset` ("0-3,8,10-11") en un conjunto.
+
+    Raises:
+        ValueError: Si la lista no es válida
+    """
+    cpus = set()
+    for part in value.replace(' ', '').split(','):
+        if not part:
+            continue
+        if '-' in part:
+            first, last = part.split('-', 1)
+            first, last = int(first), int(last)
+            if first > last:
+                raise ValueError(f"Rango de núcleos no válido: '{part}'")
+            cpus.update(range(first, last + 1))
+        else:
+            cpus.add(int(part))
+    if not cpus:
+        raise ValueError(f"Lista de núcleos vacía: '{value}'")
+    return cpus
+
+
+def available_cpus() -> List[int]:
+    """Núcleos que el proceso puede usar (respeta la afinidad heredada, p.ej. de taskset/cgroups)."""
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+class ThreadPolicy(NamedTuple):
+    """Configuración de hilos de un proceso trabajador (None = valor por defecto)."""
+    threads: Optional[int] = None
+    interop_threads: Optional[int] = None
+    affinity: Optional[frozenset] = None
+
+    @classmethod
+    def from_env(cls) -> 'ThreadPolicy':
+        """Lee `WHISPER_THREADS`, `WHISPER_INTEROP_THREADS` y `WHISPER_CPU_AFFINITY`."""
+        threads = os.getenv('WHISPER_THREADS')
+        interop = os.getenv('WHISPER_INTEROP_THREADS')
+        affinity = os.getenv('WHISPER_CPU_AFFINITY')
+        return cls(
+            threads=int(threads) if threads else None,
+            interop_threads=int(interop) if interop else None,
+            affinity=frozenset(parse_cpu_list(affinity)) if affinity else None,
+        )
+
+    def to_env(self) -> dict:
+        """Variables de entorno equivalentes (para heredarla en un proceso hijo)."""
+        env = {}
+        if self.threads:
+            env['WHISPER_THREADS'] = str(self.threads)
+        if self.interop_threads:
+            env['WHISPER_INTEROP_THREADS'] = str(self.interop_threads)
+        if self.affinity:
+            env['WHISPER_CPU_AFFINITY'] = ','.join(str(cpu) for cpu in sorted(self.affinity))
+        return env
+
+    def resolved(self) -> 'ThreadPolicy':
+        """Rellena los valores por defecto: tantos hilos como núcleos permitidos."""
+        affinity = self.affinity
+        cpus = sorted(affinity) if affinity else available_cpus()
+        return ThreadPolicy(
+            threads=max(1, self.threads or len(cpus)),
+            interop_threads=max(1, self.interop_threads or DEFAULT_INTEROP_THREADS),
+            affinity=affinity,
+        )
+
+    def partition(self, workers: int, pin: bool = False) -> List['ThreadPolicy']:
+        """
+        Reparte la política entre `workers` procesos sin sobresuscribir la CPU.
+
+        Args:
+            workers (int): Número de procesos trabajadores
+            pin (bool): Asignar a cada trabajador un bloque de núcleos disjunto
+
+        Returns:
+            list: Una política por trabajador
+        """
+        workers = max(1, workers)
+        cpus = sorted(self.affinity) if self.affinity else available_cpus()
+        threads = self.threads or max(1, len(cpus) // workers)
+        policies = []
+        for i in range(workers):
+            affinity = self.affinity
+            if pin and len(cpus) >= workers:
+                size = len(cpus) // workers
+                affinity = frozenset(cpus[i * size:(i + 1) * size])
+            policies.append(ThreadPolicy(threads, self.interop_threads, affinity))
+        return policies
+
+
+def apply_thread_policy(policy: Optional[ThreadPolicy] = None) -> ThreadPolicy:
+    """
+    Aplica una política de hilos al proceso actual.
+
+    Se llama al empezar cada trabajo; aplicarla varias veces es seguro. Los
+    hilos inter-op sólo se fijan la primera vez (torch no permite cambiarlos
+    después) y los errores de torch o del sistema se ignoran.
+
+    Args:
+        policy (ThreadPolicy): Política a aplicar (None = variables de entorno)
+
+    Returns:
+        ThreadPolicy: Política efectiva, con los valores por defecto resueltos
+    """
+    global _interop_applied
+    policy = (policy if policy is not None else ThreadPolicy.from_env()).resolved()
+
+    if policy.affinity and hasattr(os, 'sched_setaffinity'):
+        try:
+            os.sched_setaffinity(0, policy.affinity)
+        except OSError as e:
+            print(f"Aviso: no se pudo fijar la afinidad de CPU {sorted(policy.affinity)}: {e}")
+
+    import torch
+    try:
+        torch.set_num_threads(policy.threads)
+    except Exception:
+        pass
+    if _interop_applied is None:
+        _interop_applied = policy.interop_threads
+        try:
+            torch.set_num_interop_threads(policy.interop_threads)
+        except Exception:
+            pass
+    return policy
+
+
+def add_thread_arguments(parser, workers: bool = True):
+    """
+    Añade a un `argparse.ArgumentParser` las opciones de la política de hilos.
+
+    Args:
+        parser: Parser de la CLI
+        workers (bool): La CLI usa varios procesos trabajadores (añade `--pin`)
+    """
+    group = parser.add_argument_group('hilos de CPU')
+    group.add_argument('--threads', type=int, default=None,
+                       help="Hilos de torch por trabajador (default: WHISPER_THREADS o núcleos / trabajadores)")
+    group.add_argument('--interop-threads', type=int, default=None,
+                       help="Hilos inter-op de torch (default: WHISPER_INTEROP_THREADS o 1)")
+    group.add_argument('--cpu-affinity', default=None,
+                       help="Núcleos permitidos, ej: 0-3,8 (default: WHISPER_CPU_AFFINITY)")
+    if workers:
+        group.add_argument('--pin', action='store_true',
+                           help="Asignar a cada trabajador un bloque de núcleos disjunto")
+    return parser
+
+
+def policy_from_args(args) -> ThreadPolicy:
+    """Política de las opciones de `add_thread_arguments`, con las variables de entorno como respaldo."""
+    env = ThreadPolicy.from_env()
+    return ThreadPolicy(
+        threads=args.threads or env.threads,
+        interop_threads=args.interop_threads or env.interop_threads,
+        affinity=frozenset(parse_cpu_list(args.cpu_affinity)) if args.cpu_affinity else env.affinity,
+    )
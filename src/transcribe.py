@@ -1,13 +1,47 @@
 """
 Módulo para transcribir audio a texto usando Whisper de OpenAI
 """
-import whisper
+import contextlib
+import importlib
 import os
+import sys
+import threading
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterator, Optional
+from .audio_stream import SAMPLE_RATE, iter_audio_windows, probe_duration
+from .lazy_import import LazyModule
+from .model_registry import get_model
+from .prefetch import get_prefetched, prefetched_hash
+from .progress import ProgressEvent, ProgressTracker, format_eta, has_listeners, subscribe, unsubscribe
+from .result_cache import ResultCache, cache_enabled, make_key
+from .thread_policy import ThreadPolicy, apply_thread_policy
+from .vad import transcribe_speech_only, vad_enabled
 
+# Whisper (y con él torch) se importa en el primer uso, no al cargar el módulo
+whisper = LazyModule('whisper')
 
-def transcribe_audio(audio_path: str, model_size: str = "base", language: Optional[str] = None) -> dict:
+# Duración por defecto de cada ventana en modo streaming (segundos)
+DEFAULT_STREAM_WINDOW = 300.0
+
+# Caracteres del texto previo que se pasan como contexto a la siguiente ventana
+STREAM_CONTEXT_CHARS = 200
+
+# Audio máximo que se arrastra a la ventana siguiente (un segmento de Whisper no supera 30s)
+STREAM_MAX_CARRY = 30.0
+
+# Ventana de `iter_transcription`: la misma que procesa Whisper internamente
+DEFAULT_PROGRESS_WINDOW = 30.0
+
+
+def transcribe_audio(
+    audio_path: str,
+    model_size: str = "base",
+    language: Optional[str] = None,
+    vad: Optional[bool] = None,
+    cache: Optional[bool] = None,
+    thread_policy: Optional[ThreadPolicy] = None,
+    on_progress: Optional[Callable[[ProgressEvent], None]] = None
+) -> dict:
     """
     Transcribe un archivo de audio a texto usando Whisper.
     
@@ -15,6 +49,16 @@ def transcribe_audio(audio_path: str, model_size: str = "base", language: Option
         audio_path (str): Ruta al archivo de audio
         model_size (str): Tamaño del modelo ('tiny', 'base', 'small', 'medium', 'large')
         language (str): Idioma del audio (ej: 'es', 'en'). Si es None, se detecta automáticamente
+        vad (bool): Saltar los silencios con un pre-paso de detección de voz; los
+            timestamps se devuelven en la línea de tiempo original. Si es None se
+            usa la variable de entorno `WHISPER_VAD` (1/true para activarlo)
+        cache (bool): Reutilizar resultados guardados en disco para el mismo audio
+            y parámetros. Si es None se usa `WHISPER_CACHE` (activa por defecto)
+        thread_policy (ThreadPolicy): Hilos/afinidad de CPU a aplicar antes de
+            transcribir (None = variables de entorno, ver `src/thread_policy.py`)
+        on_progress (callable): Recibe un `ProgressEvent` tras cada ventana de 30s
+            de Whisper y por cada segmento terminado (también los suscriptores de
+            `src.progress.subscribe`). El resultado no cambia por tener oyentes
     
     Returns:
         dict: Diccionario con el texto transcrito y metadatos
@@ -23,8 +67,27 @@ def transcribe_audio(audio_path: str, model_size: str = "base", language: Option
     if not os.path.exists(audio_path):
         raise FileNotFoundError(f"El archivo {audio_path} no existe")
     
-    print(f"Cargando modelo Whisper '{model_size}'...")
-    model = whisper.load_model(model_size)
+    vad = vad_enabled(vad)
+    result_cache, cache_key = None, None
+    if cache_enabled(cache):
+        try:
+            cache_key = make_key(prefetched_hash(audio_path), task='transcribe', model_size=model_size,
+                                 language=language, vad=vad)
+            result_cache = ResultCache()
+            cached = result_cache.get(cache_key)
+        except OSError as e:
+            print(f"Aviso: caché de transcripciones no disponible: {e}")
+            cached = None
+        if cached is not None:
+            print(f"Transcripción de '{audio_path}' recuperada de la caché")
+            if has_listeners(on_progress):
+                publish_segments(cached, ProgressTracker('transcribe', None, audio_path, on_progress))
+            return cached
+    
+    apply_thread_policy(thread_policy)
+    
+    # Reutilizar el modelo si ya está cargado en este proceso
+    model = get_model(model_size, loader=whisper.load_model)
     
     print(f"Transcribiendo '{audio_path}'...")
     
@@ -33,8 +96,30 @@ def transcribe_audio(audio_path: str, model_size: str = "base", language: Option
     if language:
         options['language'] = language
     
+    # Audio ya decodificado de forma especulativa (p.ej. al elegirlo en la GUI)
+    prefetched = get_prefetched(audio_path)
+    
     # Realizar la transcripción
-    result = model.transcribe(audio_path, **options)
+    if vad:
+        samples = prefetched.samples if prefetched is not None else whisper.load_audio(audio_path)
+        result = transcribe_speech_only(model, samples, SAMPLE_RATE, **options)
+        if has_listeners(on_progress):
+            publish_segments(result, ProgressTracker('transcribe', None, audio_path, on_progress))
+    else:
+        audio = prefetched.samples if prefetched is not None else audio_path
+        if has_listeners(on_progress):
+            duration = prefetched.duration if prefetched is not None else None
+            tracker = ProgressTracker('transcribe', duration, audio_path, on_progress)
+            result = transcribe_with_progress(model, audio, tracker, **options)
+        else:
+            result = model.transcribe(audio, **options)
+    
+    if result_cache is not None:
+        try:
+            result_cache.put(cache_key, result, {'audio_path': os.path.abspath(audio_path),
+                                                 'model_size': model_size, 'language': language})
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Aviso: no se pudo guardar la transcripción en la caché: {e}")
     
     return result
 
@@ -64,6 +149,328 @@ def transcribe_with_timestamps(audio_path: str, model_size: str = "base", langua
     return segments
 
 
+def transcribe_stream(
+    audio_path: str,
+    model_size: str = "base",
+    language: Optional[str] = None,
+    window_seconds: float = DEFAULT_STREAM_WINDOW,
+    thread_policy: Optional[ThreadPolicy] = None
+) -> Iterator[dict]:
+    """
+    Transcribe un archivo largo por ventanas, con memoria constante.
+
+    El audio se decodifica y transcribe ventana a ventana. El último segmento de
+    cada ventana (que puede estar cortado) no se emite: su audio se antepone a la
+    ventana siguiente. El texto previo se pasa como `initial_prompt` y el idioma
+    detectado en la primera ventana se mantiene en las demás.
+    
+    Args:
+        audio_path (str): Ruta al archivo de audio
+        model_size (str): Tamaño del modelo ('tiny', 'base', 'small', 'medium', 'large')
+        language (str): Idioma del audio (ej: 'es', 'en'). Si es None, se detecta automáticamente
+        window_seconds (float): Duración de cada ventana de decodificación
+        thread_policy (ThreadPolicy): Hilos/afinidad de CPU (None = variables de entorno)
+    
+    Yields:
+        dict: Segmentos con 'start', 'end' (en la línea de tiempo original) y 'text'
+    """
+    if not os.path.exists(audio_path):
+        raise FileNotFoundError(f"El archivo {audio_path} no existe")
+    
+    apply_thread_policy(thread_policy)
+    model = get_model(model_size, loader=whisper.load_model)
+    print(f"Transcribiendo '{audio_path}' por ventanas de {window_seconds:.0f}s...")
+    
+    yield from _transcribe_windows(model, iter_audio_windows(audio_path, window_seconds), language)
+
+
+def transcribe_window(model, buffer, offset: float = 0.0, language: Optional[str] = None,
+                      prompt: Optional[str] = None, is_last: bool = True, **options) -> dict:
+    """
+    Transcribe una ventana de audio continuando el contexto de las anteriores.
+
+    Es el paso común de `transcribe_stream` y de los trabajos con checkpoints
+    (`src/diarize_job.py`). Si no es la última ventana, su último segmento (que
+    puede estar cortado) se descarta y su audio debe reprocesarse con la
+    ventana siguiente, a partir de 'next_offset'.
+
+    Args:
+        model: Modelo de Whisper
+        buffer (np.ndarray): Audio float32 a 16kHz de la ventana
+        offset (float): Posición del buffer en la línea de tiempo original (segundos)
+        language (str): Idioma, o None para detectarlo en esta ventana
+        prompt (str): Texto previo que se pasa como `initial_prompt`
+        is_last (bool): Si es la última ventana (se conservan todos sus segmentos)
+        **options: Opciones adicionales de `model.transcribe` (ej: word_timestamps)
+
+    Returns:
+        dict: {'offset', 'next_offset', 'segments' (en la línea de tiempo original),
+        'prompt', 'language'}: el estado necesario para seguir con la ventana siguiente
+    """
+    window_options = dict(options)
+    if language:
+        window_options['language'] = language
+    if prompt:
+        window_options['initial_prompt'] = prompt
+    result = model.transcribe(buffer, **window_options)
+    language = language or result.get('language')
+
+    segments = result['segments']
+    consumed = len(buffer) / SAMPLE_RATE
+    if (not is_last and len(segments) > 1 and segments[-1]['start'] > 0
+            and 0 < consumed - segments[-1]['start'] <= STREAM_MAX_CARRY):
+        # Reprocesar el último segmento junto con la ventana siguiente
+        consumed = segments[-1]['start']
+        segments = segments[:-1]
+
+    kept = [{'start': seg['start'] + offset, 'end': seg['end'] + offset, 'text': seg['text']}
+            for seg in segments]
+    if kept:
+        prompt = ((prompt or '') + ''.join(seg['text'] for seg in kept))[-STREAM_CONTEXT_CHARS:]
+    return {'offset': offset, 'next_offset': offset + consumed, 'segments': kept,
+            'prompt': prompt, 'language': language}
+
+
+def _transcribe_windows(model, windows: Iterator, language: Optional[str] = None,
+                        state: Optional[dict] = None, offset: float = 0.0, prompt: Optional[str] = None,
+                        on_window: Optional[Callable[[dict], None]] = None, **options) -> Iterator[dict]:
+    """
+    Transcribe una secuencia de ventanas de audio (ver `transcribe_stream`).
+
+    Args:
+        model: Modelo de Whisper
+        windows: Iterador de ventanas float32 a 16kHz
+        language (str): Idioma, o None para detectarlo en la primera ventana
+        state (dict): Si se pasa, recibe el idioma detectado en 'language'
+        offset (float): Posición de la primera ventana en la línea de tiempo original
+        prompt (str): Contexto inicial (al reanudar un trabajo)
+        on_window (callable): Recibe el estado de cada ventana terminada (el de
+            `transcribe_window` más 'decoded', el final del audio ya leído), p.ej.
+            para guardar un checkpoint
+        **options: Opciones adicionales de `model.transcribe` (ej: word_timestamps)
+
+    Yields:
+        dict: Segmentos con 'start', 'end' (en la línea de tiempo original) y 'text'
+    """
+    import numpy as np
+
+    carry = np.zeros(0, dtype=np.float32)
+
+    window = next(windows, None)
+    while window is not None:
+        next_window = next(windows, None)
+        buffer = np.concatenate([carry, window]) if len(carry) else window
+
+        step = transcribe_window(model, buffer, offset, language, prompt, next_window is None, **options)
+        language, prompt = step['language'], step['prompt']
+        if state is not None:
+            state['language'] = language
+        yield from step['segments']
+
+        buffer_seconds = len(buffer) / SAMPLE_RATE
+        if on_window is not None:
+            on_window(dict(step, decoded=offset + buffer_seconds))
+        cut = int(round((step['next_offset'] - offset) * SAMPLE_RATE))
+        if cut < len(buffer):
+            carry = buffer[cut:]
+            offset += cut / SAMPLE_RATE
+        else:
+            carry = np.zeros(0, dtype=np.float32)
+            offset += buffer_seconds
+        window = next_window
+
+
+def _progress_events(model, windows: Iterator, tracker: ProgressTracker, language: Optional[str] = None,
+                     state: Optional[dict] = None, **options) -> Iterator[ProgressEvent]:
+    """Transcribe por ventanas y publica un evento por segmento más uno final (sin segmento)."""
+    for segment in _transcribe_windows(model, windows, language, state, **options):
+        yield tracker.update(segment['end'], segment)
+    yield tracker.finish()
+
+
+class _WindowProgress:
+    """Barra de progreso de `whisper.transcribe` que avisa al terminar cada ventana de 30s."""
+
+    def __init__(self, total, callback):
+        self.total = total
+        self.n = 0
+        self._callback = callback
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def update(self, n=1):
+        self.n += n
+        # Whisper llama a update() justo después de añadir los segmentos de la
+        # ventana a su lista `all_segments`; es un detalle interno, así que si no
+        # aparece sólo se publica el avance y los segmentos llegan al terminar
+        get_frame = getattr(sys, '_getframe', None)
+        segments = get_frame(1).f_locals.get('all_segments') if get_frame is not None else None
+        self._callback(self.n, self.total, segments if isinstance(segments, list) else None)
+
+
+class _TqdmHook:
+    """Sustituye al módulo `tqdm` dentro de `whisper.transcribe` (sólo en los hilos con oyente)."""
+
+    def __init__(self, tqdm_module):
+        self._tqdm = tqdm_module
+
+    def __getattr__(self, name):
+        return getattr(self._tqdm, name)
+
+    def tqdm(self, *args, **kwargs):
+        callback = getattr(_window_progress, 'callback', None)
+        if callback is None:
+            return self._tqdm.tqdm(*args, **kwargs)
+        return _WindowProgress(kwargs.get('total'), callback)
+
+
+# Oyente de `transcribe_with_progress` en el hilo actual
+_window_progress = threading.local()
+
+# Llamadas en curso que usan el gancho (se quita al terminar la última)
+_hook_lock = threading.Lock()
+_hook_users = 0
+
+
+@contextlib.contextmanager
+def _whisper_window_progress(callback: Callable):
+    """
+    Instala `_TqdmHook` en `whisper.transcribe` mientras dura el bloque y
+    restaura el `tqdm` original al salir (con llamadas concurrentes, al salir la última).
+
+    Yields:
+        float: Frames por segundo de Whisper, o None si su módulo no tiene lo
+        que el gancho necesita (el llamador publica el progreso al terminar)
+    """
+    global _hook_users
+    try:
+        module = importlib.import_module('whisper.transcribe')
+    except ImportError:
+        module = None
+    frames_per_second = getattr(module, 'FRAMES_PER_SECOND', None)
+    if frames_per_second is None or not hasattr(getattr(module, 'tqdm', None), 'tqdm'):
+        yield None
+        return
+    with _hook_lock:
+        if _hook_users == 0:
+            module.tqdm = _TqdmHook(module.tqdm)
+        _hook_users += 1
+    previous = getattr(_window_progress, 'callback', None)
+    _window_progress.callback = callback
+    try:
+        yield frames_per_second
+    finally:
+        _window_progress.callback = previous
+        with _hook_lock:
+            _hook_users -= 1
+            if _hook_users == 0 and isinstance(module.tqdm, _TqdmHook):
+                module.tqdm = module.tqdm._tqdm
+
+
+def transcribe_with_progress(model, audio, tracker: ProgressTracker, **options) -> dict:
+    """
+    Ejecuta `model.transcribe` sin cambios y publica el avance de cada ventana de Whisper.
+
+    Whisper procesa el audio en ventanas de 30s; tras cada una se publica el
+    audio procesado y los segmentos nuevos. El resultado es idéntico al de
+    `model.transcribe(audio, **options)` (misma decodificación y contexto). Si
+    el modelo no es el de Whisper (p.ej. en tests) o su versión no expone lo
+    que usa el gancho, los segmentos se publican al terminar.
+
+    Args:
+        model: Modelo de Whisper
+        audio: Ruta o buffer float32 a 16kHz
+        tracker (ProgressTracker): Seguimiento de la etapa 'transcribe'
+        **options: Opciones de `model.transcribe`
+
+    Returns:
+        dict: El resultado de `model.transcribe`
+    """
+    published = 0
+    frames_per_second = None
+
+    def publish(segments):
+        nonlocal published
+        for segment in segments[published:]:
+            tracker.update(segment['end'], {'start': segment['start'], 'end': segment['end'],
+                                            'text': segment['text']})
+        published = len(segments)
+
+    def on_window(frames, total_frames, segments):
+        if tracker.total_seconds is None and total_frames:
+            tracker.total_seconds = total_frames / frames_per_second
+        if segments is not None:
+            publish(segments)
+        tracker.update(frames / frames_per_second)
+
+    with _whisper_window_progress(on_window) as frames_per_second:
+        result = model.transcribe(audio, **options)
+    publish(result.get('segments') or [])
+    tracker.finish()
+    return result
+
+
+def publish_segments(result: dict, tracker: ProgressTracker):
+    """Publica los segmentos de un resultado ya completo (caché, VAD) y el final de la etapa."""
+    segments = result.get('segments') or []
+    if segments and tracker.total_seconds is None:
+        tracker.total_seconds = segments[-1]['end']
+    for segment in segments:
+        tracker.update(segment['end'], segment)
+    tracker.finish()
+
+
+def iter_transcription(
+    audio_path: str,
+    model_size: str = "base",
+    language: Optional[str] = None,
+    window_seconds: float = DEFAULT_PROGRESS_WINDOW,
+    on_progress: Optional[Callable[[ProgressEvent], None]] = None,
+    thread_policy: Optional[ThreadPolicy] = None
+) -> Iterator[ProgressEvent]:
+    """
+    Transcribe un archivo y entrega cada segmento en cuanto Whisper lo termina.
+
+    Cada evento lleva el segmento (`event.segment`), la fracción del audio
+    procesada, el tiempo transcurrido y la ETA. El último evento no lleva
+    segmento y marca el final (fracción 1.0). La fracción y la ETA son None si
+    ffprobe no puede leer la duración del archivo.
+    
+    Args:
+        audio_path (str): Ruta al archivo de audio
+        model_size (str): Tamaño del modelo ('tiny', 'base', 'small', 'medium', 'large')
+        language (str): Idioma del audio (ej: 'es', 'en'). Si es None, se detecta automáticamente
+        window_seconds (float): Duración de cada ventana de decodificación
+        on_progress (callable): Callback adicional para cada evento
+        thread_policy (ThreadPolicy): Hilos/afinidad de CPU (None = variables de entorno)
+    
+    Yields:
+        ProgressEvent: Eventos de la etapa 'transcribe'
+    """
+    if not os.path.exists(audio_path):
+        raise FileNotFoundError(f"El archivo {audio_path} no existe")
+    
+    apply_thread_policy(thread_policy)
+    model = get_model(model_size, loader=whisper.load_model)
+    tracker = ProgressTracker('transcribe', probe_duration(audio_path), audio_path, on_progress)
+    print(f"Transcribiendo '{audio_path}'...")
+    yield from _progress_events(model, iter_audio_windows(audio_path, window_seconds), tracker, language)
+
+
+def print_progress(event: ProgressEvent):
+    """Callback de progreso para las CLIs: una línea por segmento terminado."""
+    if event.segment is None:
+        return
+    percent = f"{event.fraction * 100:5.1f}%" if event.fraction is not None else "  ?  "
+    segment = event.segment
+    print(f"[{percent}] [{segment['start']:.2f}s - {segment['end']:.2f}s] {segment['text']}"
+          f"  (ETA {format_eta(event.eta)})", flush=True)
+
+
 def save_transcription(text: str, output_path: str):
     """
     Guarda la transcripción en un archivo de texto.
@@ -79,22 +486,51 @@ def save_transcription(text: str, output_path: str):
 
 if __name__ == "__main__":
     import sys
+    from .daemon import forward_to_daemon
+    
+    # Con el daemon en marcha (python -m src.daemon) la CLI se ejecuta allí, con el modelo ya cargado
+    exit_code = forward_to_daemon('transcribe', sys.argv[1:])
+    if exit_code is not None:
+        sys.exit(exit_code)
+    
+    # --stream: transcripción por ventanas con memoria constante
+    # --progress: mostrar cada segmento con el porcentaje y la ETA al terminarlo
+    stream = '--stream' in sys.argv
+    progress = '--progress' in sys.argv
+    argv = [arg for arg in sys.argv if arg not in ('--stream', '--progress')]
     
-    if len(sys.argv) < 2:
-        print("Uso: python transcribe.py <archivo_audio> [modelo] [idioma]")
+    if len(argv) < 2:
+        print("Uso: python transcribe.py <archivo_audio> [modelo] [idioma] [--stream] [--progress]")
         print("Ejemplo: python transcribe.py audio.mp3 base es")
+        print("  --stream: procesa el audio por ventanas (grabaciones muy largas)")
+        print("  --progress: muestra cada segmento con el progreso y la ETA")
         sys.exit(1)
     
-    audio_file = sys.argv[1]
-    model = sys.argv[2] if len(sys.argv) > 2 else "base"
-    lang = sys.argv[3] if len(sys.argv) > 3 else None
+    audio_file = argv[1]
+    model = argv[2] if len(argv) > 2 else "base"
+    lang = argv[3] if len(argv) > 3 else None
     
     try:
-        result = transcribe_audio(audio_file, model, lang)
-        print("\n" + "="*50)
-        print("TRANSCRIPCIÓN:")
-        print("="*50)
-        print(result["text"])
+        if stream:
+            print("\n" + "="*50)
+            print("TRANSCRIPCIÓN:")
+            print("="*50)
+            texts = []
+            for segment in transcribe_stream(audio_file, model, lang):
+                print(f"[{segment['start']:.2f}s - {segment['end']:.2f}s] {segment['text']}")
+                texts.append(segment['text'])
+            result = {"text": ''.join(texts)}
+        else:
+            if progress:
+                subscribe(print_progress)
+            try:
+                result = transcribe_audio(audio_file, model, lang)
+            finally:
+                unsubscribe(print_progress)
+            print("\n" + "="*50)
+            print("TRANSCRIPCIÓN:")
+            print("="*50)
+            print(result["text"])
         
         # Guardar en archivo
         output_file = Path(audio_file).stem + "_transcripcion.txt"
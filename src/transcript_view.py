@@ -0,0 +1,236 @@
+"""
+Visor virtualizado de transcripciones largas.
+
+Un `ScrolledText` con una transcripción diarizada de varias horas guarda todo
+el texto en el widget y se vuelve lento al desplazarse o buscar. Este visor se
+apoya en la lista de segmentos y sólo pinta los que caben en pantalla; el
+widget de texto nunca contiene más que la ventana visible.
+
+`SegmentIndex` (sin Tk) mantiene los índices para saltar a un instante o al
+siguiente turno de un hablante (no sólo su siguiente segmento) con búsqueda binaria (O(log n)).
+"""
+import bisect
+import tkinter as tk
+from tkinter import ttk
+from typing import Dict, List, Optional
+
+
+def format_timestamp(seconds: float) -> str:
+    """Formatea segundos como 'hh:mm:ss'."""
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def parse_timestamp(value: str) -> float:
+    """
+    Convierte 'hh:mm:ss', 'mm:ss' o segundos ('754.5') en segundos.
+
+    Raises:
+        ValueError: Si el formato no es válido
+    """
+    seconds = 0.0
+    for part in value.strip().split(':'):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def format_segment(segment: dict) -> str:
+    """Línea del visor: '[00:12:03] SPEAKER_00: texto'."""
+    speaker = segment.get('speaker')
+    prefix = f"[{format_timestamp(segment['start'])}]"
+    if speaker:
+        prefix += f" {speaker}:"
+    return f"{prefix} {segment['text'].strip()}"
+
+
+class SegmentIndex:
+    """Segmentos ordenados por inicio con índices por tiempo y por hablante."""
+
+    def __init__(self, segments: Optional[List[dict]] = None):
+        self.segments: List[dict] = []
+        self._starts: List[float] = []
+        self._by_speaker: Dict[str, List[int]] = {}
+        # Primer segmento de cada turno (cambio de hablante respecto al segmento anterior)
+        self._turns: Dict[str, List[int]] = {}
+        self.extend(segments or [])
+
+    def __len__(self):
+        return len(self.segments)
+
+    def extend(self, segments: List[dict]):
+        """Añade segmentos al final (llegan en orden, p.ej. durante la transcripción)."""
+        for segment in segments:
+            index = len(self.segments)
+            self.segments.append(segment)
+            self._starts.append(segment['start'])
+            speaker = segment.get('speaker')
+            if speaker:
+                self._by_speaker.setdefault(speaker, []).append(index)
+                if index == 0 or self.segments[index - 1].get('speaker') != speaker:
+                    self._turns.setdefault(speaker, []).append(index)
+
+    @property
+    def speakers(self) -> List[str]:
+        return sorted(self._by_speaker)
+
+    def index_at(self, seconds: float) -> int:
+        """Índice del segmento que se está oyendo en `seconds` (el último que empezó antes)."""
+        return max(0, bisect.bisect_right(self._starts, seconds) - 1)
+
+    def next_of_speaker(self, speaker: str, after: int) -> Optional[int]:
+        """Primer segmento de `speaker` con índice mayor que `after` (None si no hay más)."""
+        indices = self._by_speaker.get(speaker, [])
+        position = bisect.bisect_right(indices, after)
+        return indices[position] if position < len(indices) else None
+
+    def previous_of_speaker(self, speaker: str, before: int) -> Optional[int]:
+        """Último segmento de `speaker` con índice menor que `before` (None si no hay)."""
+        indices = self._by_speaker.get(speaker, [])
+        position = bisect.bisect_left(indices, before)
+        return indices[position - 1] if position > 0 else None
+
+    def next_turn_of_speaker(self, speaker: str, after: int) -> Optional[int]:
+        """Primer segmento del siguiente turno de `speaker` con índice mayor que `after`."""
+        indices = self._turns.get(speaker, [])
+        position = bisect.bisect_right(indices, after)
+        return indices[position] if position < len(indices) else None
+
+    def previous_turn_of_speaker(self, speaker: str, before: int) -> Optional[int]:
+        """Primer segmento del último turno de `speaker` que empieza antes de `before`."""
+        indices = self._turns.get(speaker, [])
+        position = bisect.bisect_left(indices, before)
+        return indices[position - 1] if position > 0 else None
+
+    def lines(self, first: int, count: int) -> List[str]:
+        """Líneas formateadas de los segmentos [first, first + count)."""
+        return [format_segment(segment) for segment in self.segments[first:first + count]]
+
+
+class VirtualTranscript(ttk.Frame):
+    """Widget que muestra una lista de segmentos pintando sólo la ventana visible."""
+
+    def __init__(self, parent, rows: int = 20, font=('Arial', 10)):
+        """
+        Args:
+            parent: Widget contenedor
+            rows (int): Segmentos visibles a la vez
+            font: Fuente del texto
+        """
+        super().__init__(parent)
+        self.index = SegmentIndex()
+        self.rows = rows
+        self.first = 0
+        # Último segmento al que se saltó (cerca del final no coincide con la primera fila)
+        self.cursor: Optional[int] = None
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+
+        self.text = tk.Text(self, wrap=tk.NONE, height=rows, font=font, state=tk.DISABLED)
+        self.text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.text.tag_configure('cursor', background='#fff3b0')
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        self.hscrollbar = ttk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.text.xview)
+        self.hscrollbar.grid(row=1, column=0, sticky=(tk.W, tk.E))
+        self.text.config(xscrollcommand=self.hscrollbar.set)
+
+        self.text.bind('<MouseWheel>', lambda e: self.scroll(-1 if e.delta > 0 else 1) or 'break')
+        self.text.bind('<Button-4>', lambda e: self.scroll(-1) or 'break')
+        self.text.bind('<Button-5>', lambda e: self.scroll(1) or 'break')
+        self.text.bind('<Prior>', lambda e: self.scroll(-self.rows) or 'break')
+        self.text.bind('<Next>', lambda e: self.scroll(self.rows) or 'break')
+        self.text.bind('<Configure>', self.on_resize)
+
+    def set_segments(self, segments: List[dict]):
+        """Sustituye los segmentos mostrados."""
+        self.index = SegmentIndex(segments)
+        self.first = 0
+        self.cursor = None
+        self.render()
+
+    def append_segments(self, segments: List[dict]):
+        """Añade segmentos sin mover la vista (salvo que estuviera al final)."""
+        at_end = self.first + self.rows >= len(self.index)
+        self.index.extend(segments)
+        if at_end:
+            self.first = self._clamp(len(self.index) - self.rows)
+        self.render()
+
+    def clear(self):
+        self.set_segments([])
+
+    def _clamp(self, first: int) -> int:
+        return max(0, min(first, len(self.index) - self.rows))
+
+    def render(self):
+        """Pinta la ventana visible y actualiza la barra de desplazamiento."""
+        lines = self.index.lines(self.first, self.rows)
+        self.text.config(state=tk.NORMAL)
+        self.text.delete(1.0, tk.END)
+        self.text.insert(1.0, '\n'.join(lines))
+        if self.cursor is not None and self.first <= self.cursor < self.first + len(lines):
+            row = self.cursor - self.first + 1
+            self.text.tag_add('cursor', f'{row}.0', f'{row}.end')
+        self.text.config(state=tk.DISABLED)
+        total = len(self.index)
+        if total:
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + self.rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def scroll_to(self, first: int):
+        self.first = self._clamp(first)
+        self.render()
+
+    def scroll(self, delta: int):
+        """Desplazamiento del usuario: las búsquedas vuelven a partir de la primera fila."""
+        self.cursor = None
+        self.scroll_to(self.first + delta)
+
+    def on_scrollbar(self, action, value, unit=None):
+        """Comando de la barra: ('moveto', fracción) o ('scroll', n, 'units'|'pages')."""
+        if action == 'moveto':
+            self.cursor = None
+            self.scroll_to(int(float(value) * len(self.index)))
+        elif action == 'scroll':
+            step = self.rows if unit == 'pages' else 1
+            self.scroll(int(value) * step)
+
+    def on_resize(self, event):
+        """Ajusta el número de filas visibles a la altura del widget."""
+        line_height = self.text.tk.call('font', 'metrics', self.text.cget('font'), '-linespace') or 1
+        rows = max(1, event.height // int(line_height))
+        if rows != self.rows:
+            self.rows = rows
+            self.scroll_to(self.first)
+
+    def jump_to_time(self, seconds: float) -> int:
+        """Muestra el segmento que suena en `seconds` en la primera fila."""
+        self.cursor = self.index.index_at(seconds)
+        self.scroll_to(self.cursor)
+        return self.first
+
+    def jump_to_speaker(self, speaker: str, forward: bool = True) -> Optional[int]:
+        """
+        Muestra el siguiente (o anterior) turno de `speaker` en la primera fila.
+
+        La búsqueda parte del último salto (o de la primera fila si el usuario se
+        ha desplazado después), así que cerca del final, donde la vista ya no puede
+        bajar más, las llamadas siguientes avanzan igualmente.
+
+        Returns:
+            int: Índice del primer segmento del turno, o None si no hay más
+        """
+        position = self.first if self.cursor is None else self.cursor
+        if forward:
+            target = self.index.next_turn_of_speaker(speaker, position)
+        else:
+            target = self.index.previous_turn_of_speaker(speaker, position)
+        if target is not None:
+            self.cursor = target
+            self.scroll_to(target)
+        return target
+
+    def get_text(self) -> str:
+        """Texto completo (generado bajo demanda, p.ej. para guardarlo)."""
+        return '\n'.join(self.index.lines(0, len(self.index)))
@@ -0,0 +1,215 @@
+"""
+Detección de actividad de voz (VAD) por energía, sin red y en CPU.
+
+Se usa como pre-paso opcional antes de Whisper: sólo las regiones con voz se
+concatenan y se transcriben, y los timestamps resultantes se devuelven a la
+línea de tiempo del audio original mediante `TimeMap`.
+"""
+import os
+from bisect import bisect_left, bisect_right
+from typing import List, Optional, Tuple
+
+# Activar el VAD por defecto en transcribe_audio / diarización (1/true)
+VAD_ENV = 'WHISPER_VAD'
+
+# Si la voz detectada cubre menos de esta fracción del audio con señal, se
+# transcribe el archivo completo (p.ej. voz sin pausas o con fondo constante)
+MIN_SPEECH_COVERAGE = 0.5
+
+
+def vad_enabled(vad: Optional[bool] = None) -> bool:
+    """Resuelve el parámetro `vad` (None = variable de entorno `WHISPER_VAD`)."""
+    if vad is None:
+        return os.getenv(VAD_ENV, '').lower() in ('1', 'true', 'yes')
+    return bool(vad)
+
+
+def _frame_energy_db(audio, sample_rate: int, frame_ms: float):
+    """Energía (dBFS) de cada trama completa y su duración en segundos."""
+    import numpy as np
+
+    frame_len = max(1, int(sample_rate * frame_ms / 1000))
+    n_frames = len(audio) // frame_len
+    frames = audio[:n_frames * frame_len].reshape(n_frames, frame_len)
+    return 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10), frame_len / sample_rate
+
+
+def signal_duration(audio, sample_rate: int = 16000, frame_ms: float = 30.0,
+                    min_threshold_db: float = -55.0) -> float:
+    """Segundos de audio por encima del umbral absoluto (lo que no es silencio digital)."""
+    import numpy as np
+
+    energy_db, frame_seconds = _frame_energy_db(np.asarray(audio, dtype=np.float32), sample_rate, frame_ms)
+    return float(np.count_nonzero(energy_db > min_threshold_db)) * frame_seconds
+
+
+def detect_speech(
+    audio,
+    sample_rate: int = 16000,
+    frame_ms: float = 30.0,
+    margin_db: float = 12.0,
+    peak_margin_db: float = 20.0,
+    min_threshold_db: float = -55.0,
+    min_speech: float = 0.25,
+    min_silence: float = 0.5,
+    padding: float = 0.2
+) -> List[Tuple[float, float]]:
+    """
+    Encuentra las regiones con voz comparando la energía de cada trama con el ruido de fondo.
+
+    El umbral se adapta a cada grabación: percentil 10 de la energía (ruido de
+    fondo) más `margin_db`, pero nunca más de `peak_margin_db` por debajo del
+    nivel de pico (percentil 95), para que el audio sin silencios no quede
+    entero por debajo de su propio umbral; y nunca por debajo de `min_threshold_db`.
+
+    Args:
+        audio: Muestras mono float (np.ndarray)
+        sample_rate (int): Frecuencia de muestreo
+        frame_ms (float): Duración de cada trama de análisis
+        margin_db (float): Margen sobre el ruido de fondo para considerar voz
+        peak_margin_db (float): Distancia máxima del umbral bajo el nivel de pico
+        min_threshold_db (float): Umbral mínimo absoluto (dBFS)
+        min_speech (float): Regiones de voz más cortas se descartan (s)
+        min_silence (float): Silencios más cortos no separan regiones (s)
+        padding (float): Margen añadido a cada lado de una región (s)
+
+    Returns:
+        list: Regiones (inicio, fin) en segundos, ordenadas y sin solapes
+    """
+    import numpy as np
+
+    audio = np.asarray(audio, dtype=np.float32)
+    energy_db, frame_seconds = _frame_energy_db(audio, sample_rate, frame_ms)
+    if len(energy_db) == 0:
+        return []
+
+    threshold = min(np.percentile(energy_db, 10) + margin_db, np.percentile(energy_db, 95) - peak_margin_db)
+    voiced = energy_db > max(threshold, min_threshold_db)
+
+    # Convertir tramas activas en regiones (inicio, fin) en segundos
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], voiced.astype(np.int8), [0]))))
+    regions = [(start * frame_seconds, end * frame_seconds) for start, end in zip(edges[::2], edges[1::2])]
+
+    # Unir regiones separadas por silencios cortos
+    merged = []
+    for start, end in regions:
+        if merged and start - merged[-1][1] < min_silence:
+            merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+
+    # Descartar ruidos breves, añadir margen y volver a unir solapes
+    duration = len(audio) / sample_rate
+    padded = []
+    for start, end in merged:
+        if end - start < min_speech:
+            continue
+        start, end = max(0.0, start - padding), min(duration, end + padding)
+        if padded and start <= padded[-1][1]:
+            padded[-1] = (padded[-1][0], end)
+        else:
+            padded.append((start, end))
+    return padded
+
+
+class TimeMap:
+    """Traduce tiempos del audio compactado (sólo voz) a la línea de tiempo original."""
+
+    def __init__(self, regions: List[Tuple[float, float]]):
+        """
+        Args:
+            regions (list): Regiones (inicio, fin) originales, en el orden en que se concatenaron
+        """
+        self.regions = list(regions)
+        self.compact_starts = []
+        position = 0.0
+        for start, end in self.regions:
+            self.compact_starts.append(position)
+            position += end - start
+        self.compact_duration = position
+
+    def to_original(self, t: float, is_end: bool = False) -> float:
+        """
+        Convierte un tiempo del audio compactado al tiempo original.
+
+        Args:
+            t (float): Tiempo en el audio compactado
+            is_end (bool): Si el tiempo es un final, en una frontera entre regiones
+                se asigna al final de la región anterior en lugar de al inicio de la siguiente
+
+        Returns:
+            float: Tiempo en el audio original
+        """
+        if not self.regions:
+            return t
+        find = bisect_left if is_end else bisect_right
+        i = min(max(find(self.compact_starts, t) - 1, 0), len(self.regions) - 1)
+        start, end = self.regions[i]
+        return min(start + (t - self.compact_starts[i]), end)
+
+
+def extract_speech(audio, regions: List[Tuple[float, float]], sample_rate: int = 16000):
+    """
+    Concatena las regiones con voz en un único buffer.
+
+    Returns:
+        tuple: (np.ndarray con sólo la voz, TimeMap para recuperar los tiempos originales)
+    """
+    import numpy as np
+
+    sample_regions = [(int(round(s * sample_rate)), int(round(e * sample_rate))) for s, e in regions]
+    chunks = [audio[s:e] for s, e in sample_regions if e > s]
+    speech = np.concatenate(chunks).astype(np.float32, copy=False) if chunks else np.zeros(0, dtype=np.float32)
+    # Usar los límites en muestras para que el mapa sea exacto
+    time_map = TimeMap([(s / sample_rate, e / sample_rate) for s, e in sample_regions if e > s])
+    return speech, time_map
+
+
+def remap_result(result: dict, time_map: TimeMap) -> dict:
+    """
+    Devuelve los timestamps de un resultado de Whisper a la línea de tiempo original.
+
+    Modifica `result` en el sitio (segmentos y, si existen, palabras) y lo devuelve.
+    """
+    for segment in result.get('segments', []):
+        segment['start'] = time_map.to_original(segment['start'])
+        segment['end'] = time_map.to_original(segment['end'], is_end=True)
+        for word in segment.get('words') or []:
+            word['start'] = time_map.to_original(word['start'])
+            word['end'] = time_map.to_original(word['end'], is_end=True)
+    return result
+
+
+def transcribe_speech_only(model, audio, sample_rate: int = 16000, **options) -> dict:
+    """
+    Ejecuta el VAD y transcribe sólo las regiones con voz.
+
+    Si la voz detectada cubre menos de `MIN_SPEECH_COVERAGE` del audio con señal
+    (el VAD no ha sabido separar voz y fondo), se transcribe el archivo completo
+    en lugar de descartar lo que no reconoció.
+
+    Args:
+        model: Modelo Whisper cargado
+        audio: Muestras mono float a `sample_rate`
+        **options: Opciones de `model.transcribe`
+
+    Returns:
+        dict: Resultado de Whisper con timestamps en la línea de tiempo original
+    """
+    import numpy as np
+
+    audio = np.asarray(audio, dtype=np.float32)
+    regions = detect_speech(audio, sample_rate)
+    signal = signal_duration(audio, sample_rate)
+    if signal and sum(end - start for start, end in regions) < MIN_SPEECH_COVERAGE * signal:
+        print(f"VAD: no se distingue la voz del fondo en {signal:.1f}s de señal; "
+              f"se transcribe el archivo completo")
+        return model.transcribe(audio, **options)
+    speech, time_map = extract_speech(audio, regions, sample_rate)
+    total = len(audio) / sample_rate if len(audio) else 0.0
+    if total:
+        print(f"VAD: {time_map.compact_duration:.1f}s de voz de {total:.1f}s "
+              f"({100 * time_map.compact_duration / total:.0f}%)")
+    if not len(speech):
+        return {'text': '', 'segments': [], 'language': options.get('language')}
+    return remap_result(model.transcribe(speech, **options), time_map)
@@ -0,0 +1,258 @@
+"""
+Proceso trabajador para ejecutar transcripciones fuera del proceso de la GUI.
+
+Un hilo no se puede interrumpir en Python: cancelar una transcripción lanzada
+en un hilo deja el modelo ocupando CPU y memoria hasta que termina. `JobWorker`
+ejecuta cada trabajo en un proceso hijo de larga duración (que mantiene los
+modelos cargados entre trabajos) comunicado por dos colas:
+
+    comandos   (id, función, args, kwargs) o None para terminar
+    resultados ('progress' | 'result' | 'error' | 'cancelled', id, dato)
+
+Los eventos de progreso del hijo se vuelven a publicar en el proceso padre, de
+modo que los suscriptores de `src.progress` (la GUI) los reciben igual que si el
+trabajo se ejecutara en un hilo.
+
+Cancelar tiene dos modos:
+- keep_warm=False: se termina el proceso de inmediato (se libera toda su memoria;
+  el siguiente trabajo arranca uno nuevo y vuelve a cargar el modelo).
+- keep_warm=True: el trabajo se interrumpe en su siguiente evento de progreso y el
+  proceso sigue vivo con el modelo cargado; si no responde en `cancel_grace`
+  segundos se termina igualmente.
+
+Configuración por variables de entorno:
+    WHISPER_KEEP_WARM=1        Cancelar conservando el modelo (por defecto 0)
+    WHISPER_CANCEL_GRACE=5     Segundos de espera antes de terminar el proceso
+"""
+import itertools
+import multiprocessing
+import os
+import pickle
+import queue
+import threading
+import time
+from typing import Callable, Optional
+
+# Espera máxima de una cancelación cooperativa antes de terminar el proceso
+DEFAULT_CANCEL_GRACE = 5.0
+
+# Intervalo con el que el padre comprueba si el hijo sigue vivo mientras espera
+POLL_INTERVAL = 0.1
+
+
+class JobCancelled(Exception):
+    """El trabajo se canceló antes de terminar."""
+
+
+def is_transferable(func: Callable) -> bool:
+    """Indica si una función puede enviarse al proceso trabajador (importable por nombre)."""
+    try:
+        pickle.dumps(func)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return False
+    return True
+
+
+def _worker_main(commands, results, cancel_event, thread_policy=None):
+    """Bucle del proceso trabajador: ejecuta los trabajos de `commands` uno a uno."""
+    from .progress import subscribe
+
+    if thread_policy is not None:
+        # Los trabajos aplican la política de las variables de entorno al empezar
+        os.environ.update(thread_policy.to_env())
+
+    current = {'job': None}
+
+    def forward(event):
+        if cancel_event.is_set():
+            raise JobCancelled()
+        results.put(('progress', current['job'], event))
+
+    subscribe(forward)
+    while True:
+        command = commands.get()
+        if command is None:
+            break
+        job_id, func, args, kwargs = command
+        current['job'] = job_id
+        try:
+            results.put(('result', job_id, func(*args, **kwargs)))
+        except JobCancelled:
+            results.put(('cancelled', job_id, None))
+        except Exception as e:
+            if not is_transferable(e):
+                e = RuntimeError(str(e))
+            results.put(('error', job_id, e))
+
+
+class JobWorker:
+    """Proceso hijo reutilizable que ejecuta trabajos y se puede cancelar de verdad."""
+
+    def __init__(
+        self,
+        keep_warm: Optional[bool] = None,
+        cancel_grace: Optional[float] = None,
+        mp_context=None,
+        thread_policy=None
+    ):
+        """
+        Args:
+            keep_warm (bool): Cancelar conservando el proceso y su modelo cargado.
+                Si es None se usa `WHISPER_KEEP_WARM`
+            cancel_grace (float): Segundos que se espera a una cancelación
+                cooperativa antes de terminar el proceso (None = `WHISPER_CANCEL_GRACE`)
+            mp_context: Contexto de multiprocessing (por defecto 'spawn': el
+                proceso padre puede tener Tk e hilos activos)
+            thread_policy (ThreadPolicy): Hilos/afinidad del proceso trabajador
+                (None = variables de entorno)
+        """
+        if keep_warm is None:
+            keep_warm = os.getenv('WHISPER_KEEP_WARM', '').lower() in ('1', 'true', 'yes')
+        if cancel_grace is None:
+            cancel_grace = float(os.getenv('WHISPER_CANCEL_GRACE', DEFAULT_CANCEL_GRACE))
+        self.keep_warm = keep_warm
+        self.cancel_grace = cancel_grace
+        self._context = mp_context or multiprocessing.get_context('spawn')
+        self.thread_policy = thread_policy
+        self._process = None
+        self._ids = itertools.count(1)
+        self._run_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._job = None
+        self._job_func = None
+        self._cancelled = False
+        self._deadline = None
+        self._cancels = 0
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self._process.pid if self.alive else None
+
+    def start(self):
+        """Arranca el proceso trabajador si no está vivo (también sirve de warm-up)."""
+        with self._state_lock:
+            if self.alive:
+                return
+            # Colas nuevas: las de un proceso terminado pueden haber quedado bloqueadas
+            self._commands = self._context.Queue()
+            self._results = self._context.Queue()
+            self._cancel_event = self._context.Event()
+            self._process = self._context.Process(
+                target=_worker_main,
+                args=(self._commands, self._results, self._cancel_event, self.thread_policy),
+                name='whisper-worker', daemon=True
+            )
+            self._process.start()
+
+    def run(self, func: Callable, *args, **kwargs):
+        """
+        Ejecuta `func(*args, **kwargs)` en el proceso trabajador y espera el resultado.
+
+        Los eventos de progreso del trabajo se publican en este proceso con
+        `src.progress.emit`. Bloquea el hilo que llama (no el de la GUI).
+
+        Raises:
+            JobCancelled: Si se llamó a `cancel()` durante el trabajo (o mientras
+                esperaba a que terminara otro)
+            Exception: La excepción del trabajo, o RuntimeError si el proceso murió
+        """
+        from .progress import emit
+
+        cancels = self._cancels
+        with self._run_lock:
+            if self._cancels != cancels:
+                raise JobCancelled()
+            self.start()
+            with self._state_lock:
+                job_id = next(self._ids)
+                self._job = job_id
+                self._job_func = func
+                self._cancelled = False
+                self._deadline = None
+                self._cancel_event.clear()
+            self._commands.put((job_id, func, args, kwargs))
+            try:
+                return self._wait(job_id, emit)
+            finally:
+                with self._state_lock:
+                    self._job = None
+                    self._job_func = None
+
+    def _wait(self, job_id: int, emit: Callable):
+        while True:
+            try:
+                kind, message_job, payload = self._results.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                if self._deadline is not None and time.monotonic() > self._deadline:
+                    self._terminate()
+                if not self.alive:
+                    if self._cancelled:
+                        raise JobCancelled()
+                    code = self._process.exitcode if self._process is not None else None
+                    self._process = None
+                    raise RuntimeError(f"El proceso de transcripción terminó inesperadamente (código {code})")
+                continue
+            if message_job != job_id:
+                continue  # Mensajes de un trabajo anterior ya cancelado
+            if kind == 'progress':
+                emit(payload)
+            elif kind == 'result':
+                return payload
+            elif kind == 'cancelled':
+                raise JobCancelled()
+            else:
+                raise payload
+
+    def cancel(self, terminate: Optional[bool] = None, func: Optional[Callable] = None):
+        """
+        Cancela el trabajo en curso sin bloquear (se puede llamar desde el hilo de la GUI).
+
+        Con `keep_warm` el trabajo se detiene en su siguiente evento de progreso y
+        el proceso conserva el modelo; si no, el proceso se termina ya. Los
+        trabajos que esperaban su turno en `run()` también se cancelan.
+
+        Args:
+            terminate (bool): Forzar el modo: True termina el proceso, False
+                cancela de forma cooperativa (None = según `keep_warm`)
+            func (callable): Cancelar sólo si el trabajo en curso ejecuta esta
+                función (los que esperan turno no se tocan)
+        """
+        with self._state_lock:
+            if func is None:
+                self._cancels += 1
+            elif self._job_func is not func:
+                return
+            if self._job is None:
+                return
+            self._cancelled = True
+            cooperative = self.keep_warm if terminate is None else not terminate
+            if cooperative and self.alive:
+                self._cancel_event.set()
+                self._deadline = time.monotonic() + self.cancel_grace
+                return
+        self._terminate()
+
+    def _terminate(self):
+        """Termina el proceso trabajador (SIGTERM y, si no basta, SIGKILL)."""
+        process = self._process
+        if process is None:
+            return
+        process.terminate()
+        process.join(1.0)
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+    def stop(self, timeout: float = 2.0):
+        """Detiene el proceso trabajador (al cerrar la aplicación)."""
+        if self._process is None:
+            return
+        if self.alive:
+            self._commands.put(None)
+            self._process.join(timeout)
+        self._terminate()
+        self._process = None
@@ -11,6 +11,47 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 
+@pytest.fixture(autouse=True)
+def clear_model_registry():
+    """Empty the process-wide model/pipeline caches so each test loads its own fakes."""
+    from src.model_registry import get_registry
+    from src.pipeline_cache import get_pipeline_cache
+    get_registry().clear()
+    get_pipeline_cache().clear()
+    yield
+    get_registry().clear()
+    get_pipeline_cache().clear()
+
+
+@pytest.fixture(autouse=True)
+def discard_prefetched_audio():
+    """Drop any speculatively decoded audio left behind by a previous test."""
+    from src.prefetch import discard_prefetched
+    discard_prefetched()
+    yield
+    discard_prefetched()
+
+
+@pytest.fixture(autouse=True)
+def no_warm_daemon(monkeypatch, tmp_path_factory):
+    """CLI tests must never reach a warm daemon running on the developer's machine."""
+    monkeypatch.setenv('WHISPER_DAEMON_SOCKET', str(tmp_path_factory.getbasetemp() / 'no-daemon.sock'))
+
+
+@pytest.fixture(autouse=True)
+def no_gui_background_jobs(monkeypatch):
+    """GUI tests must not start real worker processes to warm up models or decode the chosen file."""
+    monkeypatch.setenv('WHISPER_GUI_WARMUP', '0')
+    monkeypatch.setenv('WHISPER_GUI_PREFETCH', '0')
+
+
+@pytest.fixture(autouse=True)
+def isolated_result_cache(monkeypatch, tmp_path_factory):
+    """Point the on-disk transcription/diarization caches at per-test directories."""
+    monkeypatch.setenv('WHISPER_CACHE_DIR', str(tmp_path_factory.mktemp('result_cache')))
+    monkeypatch.setenv('DIARIZATION_CACHE_DIR', str(tmp_path_factory.mktemp('diarization_cache')))
+
+
 @pytest.fixture(autouse=True)
 def fake_whisper(monkeypatch):
     """Provide a lightweight fake for whisper.load_model to avoid heavy imports."""
@@ -0,0 +1,160 @@
+import io
+import os
+import socket
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from src import daemon
+from src.model_registry import get_registry
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+@pytest.fixture
+def running_daemon(monkeypatch, tmp_path):
+    path = str(tmp_path / 'd.sock')
+    monkeypatch.setenv('WHISPER_DAEMON_SOCKET', path)
+    server = daemon.make_daemon(path)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield path
+    server.shutdown()
+    server.server_close()
+
+
+def test_cli_runs_in_the_daemon_and_streams_output(running_daemon, monkeypatch, tmp_path):
+    audio = tmp_path / 'a.mp3'
+    audio.write_bytes(b'RIFF')
+    workdir = tmp_path / 'work'
+    workdir.mkdir()
+    monkeypatch.chdir(workdir)
+
+    out = io.StringIO()
+    assert daemon.forward_to_daemon('transcribe', [str(audio), 'tiny', 'es'], stdout=out) == 0
+    assert 'TRANSCRIPCIÓN' in out.getvalue() and 'texto' in out.getvalue()
+    # outputs land in the client's working directory
+    assert (workdir / 'a_transcripcion.txt').exists()
+
+    # the second request reuses the model already loaded in the daemon
+    assert daemon.forward_to_daemon('transcribe', [str(audio), 'tiny', 'en'], stdout=io.StringIO()) == 0
+    assert get_registry().stats()['misses'] == 1
+    assert os.getcwd() == str(workdir)
+
+
+def test_exit_codes_and_unknown_commands(running_daemon):
+    out, err = io.StringIO(), io.StringIO()
+    assert daemon.forward_to_daemon('transcribe', [], stdout=out) == 1
+    assert 'Uso:' in out.getvalue()
+    assert daemon.forward_to_daemon('borrar', [], stdout=out, stderr=err) == 2
+    assert 'desconocido' in err.getvalue()
+
+
+def test_shell_client_forwards_to_the_daemon(running_daemon, tmp_path):
+    audio = tmp_path / 'b.mp3'
+    audio.write_bytes(b'RIFF')
+    env = dict(os.environ, WHISPER_DAEMON_SOCKET=running_daemon, PYTHONPATH=str(ROOT))
+    proc = subprocess.run([sys.executable, '-m', 'src.transcribe', str(audio), 'tiny'], cwd=str(tmp_path),
+                          env=env, capture_output=True, text=True, timeout=60)
+    assert proc.returncode == 0, proc.stderr
+    # the fake model only exists inside this test process, i.e. in the daemon
+    assert 'texto' in proc.stdout
+    assert (tmp_path / 'b_transcripcion.txt').read_text(encoding='utf-8').strip() == 'texto'
+
+
+def test_falls_back_without_a_listening_daemon(monkeypatch, tmp_path):
+    path = tmp_path / 'stale.sock'
+    assert daemon.forward_to_daemon('transcribe', ['a.mp3'], path=str(path)) is None
+
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(path))
+    stale.close()
+    assert daemon.forward_to_daemon('transcribe', ['a.mp3'], path=str(path)) is None
+
+    # a new daemon replaces the stale socket file
+    server = daemon.make_daemon(str(path))
+    server.server_close()
+
+    monkeypatch.setenv('WHISPER_DAEMON', '0')
+    assert daemon.forward_to_daemon('transcribe', ['a.mp3']) is None
+
+
+def test_ping_stop_and_single_instance(running_daemon):
+    reply = daemon.daemon_request('ping')
+    assert reply == {'pid': os.getpid(), 'busy': False}
+    with pytest.raises(RuntimeError):
+        daemon.make_daemon(running_daemon)
+    assert daemon.main(['--status']) == 0
+    assert daemon.daemon_request('shutdown')['stopping'] is True
+
+
+def test_client_environment_is_mirrored_during_a_job(monkeypatch, tmp_path):
+    monkeypatch.setenv('WHISPER_VAD', '1')
+    monkeypatch.delenv('WHISPER_THREADS', raising=False)
+    with daemon._client_context(str(tmp_path), {'WHISPER_THREADS': '2'}):
+        assert os.getcwd() == str(tmp_path)
+        assert os.environ.get('WHISPER_THREADS') == '2'
+        assert 'WHISPER_VAD' not in os.environ
+    assert os.environ['WHISPER_VAD'] == '1' and 'WHISPER_THREADS' not in os.environ
+
+
+def test_socket_is_private_from_the_moment_it_is_bound(monkeypatch, tmp_path):
+    modes = []
+    bind = daemon.DaemonServer.server_bind
+
+    def record_mode(self):
+        bind(self)
+        modes.append(os.stat(self.server_address).st_mode & 0o777)
+
+    monkeypatch.setattr(daemon.DaemonServer, 'server_bind', record_mode)
+    previous = os.umask(0o022)
+    try:
+        server = daemon.make_daemon(str(tmp_path / 'p.sock'))
+        server.server_close()
+        assert os.umask(0o022) == 0o022
+    finally:
+        os.umask(previous)
+    assert modes == [0o600]
+
+
+def test_client_refuses_sockets_of_other_users(monkeypatch, tmp_path, capsys):
+    path = str(tmp_path / 'foreign.sock')
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    listener.listen(1)
+    listener.settimeout(0.2)
+    getuid = os.getuid
+    monkeypatch.setenv('HF_TOKEN', 'hf_secret')
+    try:
+        # the socket belongs to the real uid; pretend the client runs as someone else
+        monkeypatch.setattr(os, 'getuid', lambda: os.stat(path).st_uid + 1)
+        assert daemon.forward_to_daemon('transcribe', ['a.mp3'], path=path) is None
+        assert daemon.daemon_request('ping', path) is None
+        with pytest.raises(socket.timeout):
+            listener.accept()
+    finally:
+        listener.close()
+    assert 'no es un socket de este usuario' in capsys.readouterr().err
+
+    regular = tmp_path / 'plain'
+    regular.write_text('')
+    monkeypatch.setattr(os, 'getuid', getuid)
+    assert daemon.forward_to_daemon('transcribe', ['a.mp3'], path=str(regular)) is None
+
+
+def test_default_socket_lives_in_a_private_directory(monkeypatch, tmp_path):
+    monkeypatch.delenv('WHISPER_DAEMON_SOCKET')
+    monkeypatch.delenv('XDG_RUNTIME_DIR', raising=False)
+    monkeypatch.setattr(daemon.tempfile, 'gettempdir', lambda: str(tmp_path))
+
+    path = daemon.socket_path()
+    assert os.path.dirname(path) == str(tmp_path / f'whisper-daemon-{os.getuid()}')
+    server = daemon.make_daemon()
+    try:
+        assert os.stat(os.path.dirname(path)).st_mode & 0o777 == 0o700
+        assert os.stat(path).st_mode & 0o777 == 0o600
+    finally:
+        server.server_close()
+
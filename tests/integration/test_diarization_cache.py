@@ -0,0 +1,91 @@
+import types
+
+import pytest
+
+from src import diarize
+from src.result_cache import diarization_cache
+
+
+class CountingPipeline:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, audio, **kwargs):
+        self.calls += 1
+
+        class D:
+            def itertracks(self, yield_label=True):
+                yield (types.SimpleNamespace(start=0.0, end=1.0), None, 'S1')
+                yield (types.SimpleNamespace(start=1.0, end=3.0), None, 'S2')
+
+        return D()
+
+
+class DummyModel:
+    def __init__(self, size):
+        self.size = size
+
+    def transcribe(self, audio, **opts):
+        return {'segments': [{'start': 0.0, 'end': 0.9, 'text': f' {self.size}'},
+                             {'start': 1.2, 'end': 2.8, 'text': ' adiós'}]}
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    pipeline = CountingPipeline()
+    monkeypatch.setattr(diarize, 'load_diarization_pipeline', lambda token, params=None: pipeline)
+    monkeypatch.setattr(diarize, 'decode_audio', lambda path: {'waveform': None, 'sample_rate': 16000})
+    monkeypatch.setattr(diarize, '_run_transcription',
+                        lambda audio, size, language, threads=None, vad=False, tracker=None:
+                        DummyModel(size).transcribe(audio))
+    return pipeline
+
+
+def test_changing_whisper_model_reuses_cached_diarization(pipeline, tmp_path, capsys):
+    audio = tmp_path / 'a.wav'
+    audio.write_bytes(b'RIFF-a')
+
+    first = diarize.transcribe_with_speaker_diarization(str(audio), 'hf', model_size='small')
+    second = diarize.transcribe_with_speaker_diarization(str(audio), 'hf', model_size='medium', language='en')
+
+    assert pipeline.calls == 1
+    assert 'Diarización recuperada de la caché' in capsys.readouterr().out
+    assert [s['speaker'] for s in first] == [s['speaker'] for s in second] == ['S1', 'S2']
+    assert second[0]['text'] == ' medium'
+    assert diarization_cache().stats()['entries'] == 1
+
+
+def test_diarization_cache_key_includes_num_speakers_and_content(pipeline, tmp_path):
+    audio = tmp_path / 'a.wav'
+    audio.write_bytes(b'RIFF-a')
+    other = tmp_path / 'b.wav'
+    other.write_bytes(b'RIFF-b')
+
+    diarize.transcribe_with_speaker_diarization(str(audio), 'hf')
+    diarize.transcribe_with_speaker_diarization(str(audio), 'hf', num_speakers=2)
+    diarize.transcribe_with_speaker_diarization(str(other), 'hf')
+    diarize.transcribe_with_speaker_diarization(str(audio), 'hf', cache=False)
+    assert pipeline.calls == 4
+
+    diarize.transcribe_with_speaker_diarization(str(audio), 'hf', num_speakers=2, concurrent=True)
+    assert pipeline.calls == 4
+
+
+def test_diarization_entries_list_pipeline_and_speakers(pipeline, tmp_path, capsys):
+    from src import result_cache
+
+    audio = tmp_path / 'a.wav'
+    audio.write_bytes(b'RIFF-a')
+    diarize.transcribe_with_speaker_diarization(str(audio), 'hf', model_size='small', num_speakers=2)
+    diarize.transcribe_with_speaker_diarization(str(audio), 'hf', model_size='small')
+    capsys.readouterr()
+
+    metas = [diarization_cache().meta(entry['key']) for entry in diarization_cache().entries()]
+    assert sorted(meta['num_speakers'] or 0 for meta in metas) == [0, 2]
+    assert all(meta['pipeline'] == diarize.DIARIZATION_PIPELINE and 'model_size' not in meta for meta in metas)
+
+    assert result_cache.main(['--diarization', 'list']) == 0
+    out = capsys.readouterr().out
+    assert f'a.wav [{diarize.DIARIZATION_PIPELINE}, 2 hablantes]' in out
+    assert f'a.wav [{diarize.DIARIZATION_PIPELINE}, hablantes auto]' in out
+
@@ -0,0 +1,90 @@
+import sys
+import threading
+import time
+import types
+
+import pytest
+import torch
+
+from src import diarize
+
+
+def setup_fakes(monkeypatch, events, fail_stage=None):
+    class FakePipeline:
+        def __call__(self, audio, **kwargs):
+            events.append(('diarize', threading.get_ident(), time.perf_counter()))
+            time.sleep(0.05)
+            if fail_stage == 'diarize':
+                raise RuntimeError('diarization failed')
+
+            class D:
+                def itertracks(self, yield_label=True):
+                    yield (types.SimpleNamespace(start=0.0, end=2.0), None, 'S1')
+
+            return D()
+
+    class FakeModel:
+        def transcribe(self, audio, **opts):
+            events.append(('transcribe', threading.get_ident(), time.perf_counter()))
+            time.sleep(0.05)
+            return {'segments': [{'start': 0.0, 'end': 1.0, 'text': 'hola'},
+                                 {'start': 3.0, 'end': 4.0, 'text': 'fin'}]}
+
+    fake_module = types.ModuleType('pyannote.audio')
+    fake_module.Pipeline = types.SimpleNamespace(from_pretrained=lambda *a, **k: FakePipeline())
+    monkeypatch.setitem(sys.modules, 'pyannote.audio', fake_module)
+    monkeypatch.setattr(diarize, 'whisper', types.SimpleNamespace(load_model=lambda s: FakeModel()))
+    monkeypatch.setattr(torch.cuda, 'is_available', lambda: False)
+
+
+def test_split_thread_budget():
+    assert diarize.split_thread_budget(8) == [4, 4]
+    assert diarize.split_thread_budget(7) == [4, 3]
+    assert diarize.split_thread_budget(1) == [1, 1]
+    assert diarize.split_thread_budget(10, 3) == [4, 3, 3]
+
+
+def test_concurrent_mode_matches_sequential(monkeypatch, tmp_path):
+    audio = tmp_path / 'a.mp3'
+    audio.write_bytes(b'RIFF')
+
+    events = []
+    setup_fakes(monkeypatch, events)
+    sequential = diarize.transcribe_with_speaker_diarization(str(audio), 'hf', concurrent=False)
+    concurrent = diarize.transcribe_with_speaker_diarization(str(audio), 'hf', concurrent=True)
+
+    assert concurrent == sequential
+    assert [s['speaker'] for s in concurrent] == ['S1', 'UNKNOWN']
+
+
+def test_concurrent_mode_runs_stages_on_separate_workers(monkeypatch, tmp_path):
+    audio = tmp_path / 'a.mp3'
+    audio.write_bytes(b'RIFF')
+
+    events = []
+    setup_fakes(monkeypatch, events)
+    thread_calls = []
+    monkeypatch.setattr(torch, 'get_num_threads', lambda: 6)
+    monkeypatch.setattr(torch, 'set_num_threads', lambda n: thread_calls.append(n))
+    monkeypatch.setenv('DIARIZE_CONCURRENT', '1')
+    monkeypatch.setenv('WHISPER_THREADS', '6')
+
+    diarize.transcribe_with_speaker_diarization(str(audio), 'hf')
+
+    threads = {name: ident for name, ident, _ in events}
+    assert threads['diarize'] != threads['transcribe']
+    assert threading.get_ident() not in threads.values()
+    # the thread policy is applied when the job starts, each stage gets half
+    # of the budget, then the full budget is restored
+    assert thread_calls[0] == 6
+    assert sorted(thread_calls[1:3]) == [3, 3]
+    assert thread_calls[-1] == 6
+
+
+def test_concurrent_mode_propagates_stage_errors(monkeypatch, tmp_path):
+    audio = tmp_path / 'a.mp3'
+    audio.write_bytes(b'RIFF')
+
+    setup_fakes(monkeypatch, [], fail_stage='diarize')
+    with pytest.raises(RuntimeError, match='diarization failed'):
+        diarize.transcribe_with_speaker_diarization(str(audio), 'hf', concurrent=True)
@@ -0,0 +1,100 @@
+import os
+import sys
+import tempfile
+import types
+
+import pytest
+import torch
+
+from src import diarize
+
+
+class RecordingPipeline:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.inputs = []
+
+    def __call__(self, audio, **kwargs):
+        self.inputs.append(audio)
+        if isinstance(audio, str):
+            assert os.path.exists(audio)
+        if self.fail:
+            raise RuntimeError('pipeline crashed')
+
+        class D:
+            def itertracks(self, yield_label=True):
+                yield (types.SimpleNamespace(start=0.0, end=1.0), None, 'S1')
+
+        return D()
+
+
+class DummyModel:
+    def transcribe(self, audio, **opts):
+        return {'segments': [{'start': 0.0, 'end': 1.0, 'text': 'hola'}]}
+
+
+def setup_fakes(monkeypatch, pipeline):
+    fake_module = types.ModuleType('pyannote.audio')
+    fake_module.Pipeline = types.SimpleNamespace(from_pretrained=lambda *a, **k: pipeline)
+    monkeypatch.setitem(sys.modules, 'pyannote.audio', fake_module)
+    monkeypatch.setattr(diarize, 'whisper', types.SimpleNamespace(load_model=lambda s: DummyModel()))
+    monkeypatch.setattr(torch.cuda, 'is_available', lambda: False)
+
+
+def test_normalize_in_memory_touches_no_disk(monkeypatch, tmp_path):
+    def no_tempfile(*a, **k):
+        raise AssertionError('no temp file expected')
+
+    monkeypatch.setattr(diarize.tempfile, 'NamedTemporaryFile', no_tempfile)
+    audio = tmp_path / 'a.wav'
+    audio.write_bytes(b'RIFF')
+
+    result = diarize.normalize_audio_for_diarization(str(audio), in_memory=True)
+    assert set(result) == {'waveform', 'sample_rate'}
+    assert result['sample_rate'] == 16000
+
+
+def test_normalize_removes_temp_when_save_fails(monkeypatch, tmp_path):
+    created = []
+    real_ntf = tempfile.NamedTemporaryFile
+
+    def recording_ntf(*a, **k):
+        f = real_ntf(*a, **k)
+        created.append(f.name)
+        return f
+
+    def bad_save(path, waveform, sr):
+        raise IOError('disk full')
+
+    monkeypatch.setattr(diarize.tempfile, 'NamedTemporaryFile', recording_ntf)
+    monkeypatch.setattr(sys.modules['torchaudio'], 'save', bad_save)
+    audio = tmp_path / 'a.wav'
+    audio.write_bytes(b'RIFF')
+
+    with pytest.raises(IOError):
+        diarize.normalize_audio_for_diarization(str(audio))
+    assert created and not os.path.exists(created[0])
+
+
+def test_pipeline_in_memory_by_default(monkeypatch, tmp_path):
+    pipeline = RecordingPipeline()
+    setup_fakes(monkeypatch, pipeline)
+    audio = tmp_path / 'a.mp3'
+    audio.write_bytes(b'RIFF')
+
+    diarize.transcribe_with_speaker_diarization(str(audio), 'hf_fake')
+    assert isinstance(pipeline.inputs[0], dict)
+
+
+def test_temp_file_fallback_cleaned_up_when_pipeline_fails(monkeypatch, tmp_path):
+    pipeline = RecordingPipeline(fail=True)
+    setup_fakes(monkeypatch, pipeline)
+    audio = tmp_path / 'a.mp3'
+    audio.write_bytes(b'RIFF')
+
+    with pytest.raises(RuntimeError):
+        diarize.transcribe_with_speaker_diarization(str(audio), 'hf_fake', in_memory=False)
+
+    temp_path = pipeline.inputs[0]
+    assert isinstance(temp_path, str) and temp_path.endswith('.wav')
+    assert not os.path.exists(temp_path)
@@ -4,22 +4,24 @@ import sys
 from pathlib import Path
 
 
-def test_transcribe_with_speaker_diarization_deletes_temp(monkeypatch, tmp_path):
+def test_transcribe_with_speaker_diarization_writes_no_temp(monkeypatch, tmp_path):
     from src import diarize
 
-    # create a temp file to act as normalized audio
-    temp = tmp_path / 'norm.wav'
-    temp.write_bytes(b'RIFF')
+    # The pipeline decodes once in memory; the temp-WAV normalizer must not be used
+    def fail_normalize(p):
+        raise AssertionError('normalize_audio_for_diarization should not be called')
 
-    # Monkeypatch normalize_audio_for_diarization to return our temp path
-    monkeypatch.setattr(diarize, 'normalize_audio_for_diarization', lambda p: str(temp))
+    monkeypatch.setattr(diarize, 'normalize_audio_for_diarization', fail_normalize)
 
     # Ensure HF_TOKEN is present
     monkeypatch.setenv('HF_TOKEN', 'hf_fake')
 
     # Monkeypatch diarize.whisper to avoid real whisper audio decoding
+    received = {}
+
     class DummyModel:
-        def transcribe(self, audio_path, **opts):
+        def transcribe(self, audio, **opts):
+            received['audio'] = audio
             return {"text": "hola", "segments": [{"start": 0.0, "end": 1.0, "text": "hola"}]}
 
     fake_whisper = type('W', (), {'load_model': lambda size: DummyModel()})
@@ -32,8 +34,9 @@ def test_transcribe_with_speaker_diarization_deletes_temp(monkeypatch, tmp_path)
     segments = diarize.transcribe_with_speaker_diarization(str(audio), 'hf_fake', model_size='tiny')
 
     assert isinstance(segments, list)
-    # temp should have been removed by the function
-    assert not temp.exists()
+    # Whisper receives the decoded mono buffer, not the original path
+    assert not isinstance(received['audio'], str)
+    assert received['audio'].dim() == 1
 
 
 def test_main_exits_when_no_token(monkeypatch):
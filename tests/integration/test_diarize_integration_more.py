@@ -13,6 +13,7 @@ class DummyPipeline:
 
     def __call__(self, audio_path, **kwargs):
         # return a simple diarization-like object
+        self.last_audio = audio_path
         self.last_kwargs = kwargs
 
         class Turn:
@@ -33,6 +34,7 @@ class DummyPipeline:
 
 class DummyModel:
     def transcribe(self, audio_path, **opts):
+        self.last_audio = audio_path
         return {
             'text': 'hola mundo',
             'segments': [
@@ -43,15 +45,20 @@ class DummyModel:
 
 
 def test_transcribe_with_speaker_diarization_success(monkeypatch, tmp_path):
-    # create a dummy audio file and a normalized file that will be cleaned up
+    # create a dummy audio file
     audio = tmp_path / 'audio.mp3'
     audio.write_bytes(b'RIFF')
 
-    norm = tmp_path / 'norm.wav'
-    norm.write_bytes(b'WAVE')
+    # monkeypatch the single decode stage to return a known in-memory buffer
+    import torch
+    decoded = {'waveform': torch.zeros((1, 32000)), 'sample_rate': 16000}
+    decode_calls = []
 
-    # monkeypatch normalize to return our norm file
-    monkeypatch.setattr(diarize, 'normalize_audio_for_diarization', lambda p: str(norm))
+    def fake_decode(p):
+        decode_calls.append(p)
+        return decoded
+
+    monkeypatch.setattr(diarize, 'decode_audio', fake_decode)
 
     # monkeypatch pyannote Pipeline.from_pretrained
     dummy_pipeline = DummyPipeline()
@@ -59,7 +66,8 @@ def test_transcribe_with_speaker_diarization_success(monkeypatch, tmp_path):
     monkeypatch.setattr(pyannote.audio.Pipeline, 'from_pretrained', lambda name, token=None: dummy_pipeline)
 
     # monkeypatch whisper model
-    monkeypatch.setattr(diarize.whisper, 'load_model', lambda size: DummyModel())
+    model = DummyModel()
+    monkeypatch.setattr(diarize.whisper, 'load_model', lambda size: model)
 
     res = diarize.transcribe_with_speaker_diarization(str(audio), hf_token='hf_fake', model_size='tiny', language='es', num_speakers=2)
 
@@ -70,8 +78,10 @@ def test_transcribe_with_speaker_diarization_success(monkeypatch, tmp_path):
     # ensure the pipeline received the num_speakers parameter
     assert dummy_pipeline.last_kwargs.get('num_speakers') == 2
 
-    # normalized file should have been removed by function
-    assert not norm.exists()
+    # audio decoded once and shared: pyannote gets the mapping, Whisper its mono channel
+    assert decode_calls == [str(audio)]
+    assert dummy_pipeline.last_audio is decoded
+    assert model.last_audio.shape == (32000,)
 
 
 def test_normalize_audio_with_fake_torchaudio(monkeypatch, tmp_path):
@@ -0,0 +1,156 @@
+import types
+
+import pytest
+import torch
+
+from src import diarize, diarize_job
+
+SR = 16000
+
+
+class CountingPipeline:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, audio, **kwargs):
+        self.calls += 1
+
+        class D:
+            def itertracks(self, yield_label=True):
+                yield (types.SimpleNamespace(start=0.0, end=30.0), None, 'S1')
+                yield (types.SimpleNamespace(start=30.0, end=60.0), None, 'S2')
+
+        return D()
+
+
+class WindowModel:
+    """One segment per 10 seconds of buffer; optionally crashes on a given call."""
+
+    def __init__(self, crash_on=None):
+        self.calls = []
+        self.crash_on = crash_on
+
+    def transcribe(self, audio, **opts):
+        self.calls.append((len(audio), opts))
+        if self.crash_on == len(self.calls):
+            raise RuntimeError('killed')
+        seconds = len(audio) / SR
+        segments, start = [], 0.0
+        while start < seconds:
+            end = min(start + 10.0, seconds)
+            segments.append({'start': start, 'end': end, 'text': f' t{len(self.calls)}'})
+            start = end
+        return {'segments': segments, 'language': 'es'}
+
+
+@pytest.fixture
+def job_env(monkeypatch, tmp_path):
+    audio = tmp_path / 'long.wav'
+    audio.write_bytes(b'RIFF-long')
+    decodes = []
+
+    def fake_decode(path):
+        decodes.append(path)
+        return {'waveform': torch.zeros(1, SR * 60), 'sample_rate': SR}
+
+    pipeline = CountingPipeline()
+    monkeypatch.setattr(diarize, 'decode_audio', fake_decode)
+    monkeypatch.setattr(diarize, 'load_diarization_pipeline', lambda token, params=None: pipeline)
+    env = types.SimpleNamespace(audio=str(audio), decodes=decodes, pipeline=pipeline, model=None)
+
+    def use_model(model):
+        env.model = model
+        monkeypatch.setattr(diarize, 'whisper', types.SimpleNamespace(load_model=lambda size: model))
+        from src.model_registry import get_registry
+        get_registry().clear()
+
+    env.use_model = use_model
+    return env
+
+
+def test_job_resumes_after_crash_from_last_window(job_env, tmp_path):
+    job_dir = tmp_path / 'job'
+    job_env.use_model(WindowModel(crash_on=3))
+    with pytest.raises(RuntimeError, match='killed'):
+        diarize_job.run_diarization_job(job_env.audio, str(job_dir), 'hf', window_seconds=25)
+
+    status = diarize_job.DiarizationJob(str(job_dir)).status()
+    assert status['normalization'] and status['diarization'] and status['windows'] == 2
+    assert not status['finished']
+
+    job_env.use_model(WindowModel())
+    segments = diarize_job.run_diarization_job(job_env.audio, str(job_dir), 'hf', window_seconds=25)
+
+    # normalization and diarization were not recomputed; only the remaining audio was transcribed
+    assert len(job_env.decodes) == 1 and job_env.pipeline.calls == 1
+    assert len(job_env.model.calls) == 1
+    assert job_env.model.calls[0][1]['language'] == 'es'
+    assert 'initial_prompt' in job_env.model.calls[0][1]
+
+    assert [s['start'] for s in segments] == [0.0, 10.0, 20.0, 30.0, 40.0, 50.0]
+    assert [s['speaker'] for s in segments] == ['S1'] * 3 + ['S2'] * 3
+    assert segments[-1]['end'] == pytest.approx(60.0)
+
+
+def test_finished_job_is_returned_and_parameter_change_keeps_valid_stages(job_env, tmp_path):
+    job_dir = str(tmp_path / 'job')
+    job_env.use_model(WindowModel())
+    first = diarize.transcribe_with_speaker_diarization(job_env.audio, 'hf', job_dir=job_dir)
+
+    job_env.use_model(WindowModel())
+    again = diarize.transcribe_with_speaker_diarization(job_env.audio, 'hf', job_dir=job_dir)
+    assert again == first and job_env.model.calls == []
+
+    # a different Whisper model only invalidates the transcription windows
+    diarize.transcribe_with_speaker_diarization(job_env.audio, 'hf', model_size='small', job_dir=job_dir)
+    assert len(job_env.model.calls) > 0
+    assert len(job_env.decodes) == 1 and job_env.pipeline.calls == 1
+
+    diarize.transcribe_with_speaker_diarization(job_env.audio, 'hf', model_size='small',
+                                                num_speakers=2, job_dir=job_dir)
+    assert job_env.pipeline.calls == 2 and len(job_env.decodes) == 1
+
+
+def test_main_status(job_env, tmp_path, capsys):
+    job_dir = str(tmp_path / 'job')
+    job_env.use_model(WindowModel())
+    diarize_job.run_diarization_job(job_env.audio, job_dir, 'hf', window_seconds=25)
+
+    assert diarize_job.main([job_env.audio, '--job-dir', job_dir, '--status']) == 0
+    out = capsys.readouterr().out
+    assert 'Ventanas transcritas: 3 (60s)' in out and 'Completado: sí' in out
+
+
+def test_resumed_job_matches_uninterrupted_run(job_env, tmp_path):
+    job_env.use_model(WindowModel())
+    whole = diarize_job.run_diarization_job(job_env.audio, str(tmp_path / 'a'), 'hf', window_seconds=25)
+    buffers = [n for n, _ in job_env.model.calls]
+
+    job_env.use_model(WindowModel(crash_on=2))
+    with pytest.raises(RuntimeError):
+        diarize_job.run_diarization_job(job_env.audio, str(tmp_path / 'b'), 'hf', window_seconds=25)
+    job_env.use_model(WindowModel())
+    resumed = diarize_job.run_diarization_job(job_env.audio, str(tmp_path / 'b'), 'hf', window_seconds=25)
+
+    # the resumed window sees the same audio (carried tail + a new window) as the uninterrupted run
+    assert [n for n, _ in job_env.model.calls] == buffers[1:]
+    assert [(s['start'], s['end']) for s in resumed] == [(s['start'], s['end']) for s in whole]
+
+
+def test_job_dir_passes_options_through_and_rejects_unsupported_ones(job_env, tmp_path):
+    job_env.use_model(WindowModel())
+    events = []
+    diarize.transcribe_with_speaker_diarization(job_env.audio, 'hf', job_dir=str(tmp_path / 'a'),
+                                                on_progress=events.append)
+    assert list(dict.fromkeys(e.stage for e in events)) == ['decode', 'diarize', 'transcribe', 'merge']
+    assert all(e.fraction == 1.0 for e in events if e.stage == 'merge')
+    assert sum(1 for e in events if e.segment is not None) == 6
+
+    # a second job on the same audio reuses the diarization cache
+    diarize.transcribe_with_speaker_diarization(job_env.audio, 'hf', job_dir=str(tmp_path / 'b'))
+    assert job_env.pipeline.calls == 1
+
+    for option in ({'vad': True}, {'concurrent': True}):
+        with pytest.raises(ValueError, match='job_dir'):
+            diarize.transcribe_with_speaker_diarization(job_env.audio, 'hf', job_dir=str(tmp_path / 'c'),
+                                                        **option)
@@ -57,23 +57,31 @@ def test_diarize_main_exception_path(monkeypatch, tmp_path):
 def test_reload_diarize_handles_torch_threads_exceptions(monkeypatch):
     # Simulate torch where set_num_threads raises
     import sys as _sys
+    from src import thread_policy
     orig_torch = _sys.modules.get('torch')
     orig_module = _sys.modules.get('src.diarize')
 
+    calls = []
     fake_torch = types.ModuleType('torch')
     def bad_set(n):
+        calls.append(n)
         raise RuntimeError('no threads')
     fake_torch.set_num_threads = bad_set
     fake_torch.set_num_interop_threads = bad_set
     fake_torch.cuda = types.SimpleNamespace(is_available=lambda: False)
+    monkeypatch.setattr(thread_policy, '_interop_applied', None)
 
     try:
         _sys.modules['torch'] = fake_torch
         if 'src.diarize' in _sys.modules:
             del _sys.modules['src.diarize']
-        # Import fresh module; should handle exceptions during thread setting
+        # Import fresh module; thread settings are no longer an import side effect
         m = importlib.import_module('src.diarize')
         assert hasattr(m, 'transcribe_with_speaker_diarization')
+        assert calls == []
+        # ...they are applied when a job starts, tolerating torch errors
+        policy = thread_policy.apply_thread_policy(thread_policy.ThreadPolicy(threads=2))
+        assert policy.threads == 2 and calls == [2, 1]
     finally:
         # restore
         if orig_module is not None:
@@ -0,0 +1,82 @@
+import types
+
+import pytest
+import torch
+
+from src import diarize, progress
+
+SR = 16000
+
+
+class HookPipeline:
+    def __init__(self):
+        self.kwargs = None
+
+    def __call__(self, audio, **kwargs):
+        self.kwargs = kwargs
+        hook = kwargs.get('hook')
+        if hook:
+            hook('segmentation', None, total=2, completed=1)
+            hook('embeddings', None, total=4, completed=2)
+            hook('discrete_diarization', None)
+
+        class D:
+            def itertracks(self, yield_label=True):
+                yield (types.SimpleNamespace(start=0.0, end=60.0), None, 'S1')
+
+        return D()
+
+
+class WindowModel:
+    def __init__(self):
+        self.calls = []
+
+    def transcribe(self, audio, **opts):
+        self.calls.append((len(audio), opts))
+        seconds = len(audio) / SR
+        return {'segments': [{'start': 0.0, 'end': seconds, 'text': ' x'}], 'language': 'es'}
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    pipeline = HookPipeline()
+    monkeypatch.setattr(diarize, 'decode_audio',
+                        lambda path: {'waveform': torch.zeros(1, SR * 60), 'sample_rate': SR})
+    monkeypatch.setattr(diarize, 'load_diarization_pipeline', lambda token, params=None: pipeline)
+    return pipeline
+
+
+def test_stages_report_progress_in_order(pipeline, monkeypatch, tmp_path):
+    model = WindowModel()
+    monkeypatch.setattr(diarize, 'whisper', types.SimpleNamespace(load_model=lambda size: model))
+    audio = tmp_path / 'a.wav'
+    audio.write_bytes(b'RIFF-progress')
+    events = []
+
+    segments = diarize.transcribe_with_speaker_diarization(str(audio), 'hf', on_progress=events.append)
+
+    stages = [e.stage for e in events]
+    assert stages == sorted(stages, key=progress.STAGES.index)
+    assert all(e.source == str(audio) for e in events)
+    diarize_fractions = [e.fraction for e in events if e.stage == 'diarize']
+    assert diarize_fractions == [pytest.approx(0.15), pytest.approx(0.625), 1.0, 1.0]
+    # listeners do not change how Whisper runs: one pass over the whole buffer
+    assert [len_ for len_, _ in model.calls] == [SR * 60]
+    assert all(opts['word_timestamps'] for _, opts in model.calls)
+    transcribe_events = [e for e in events if e.stage == 'transcribe']
+    assert [e.segment['end'] for e in transcribe_events[:-1]] == [60.0]
+    assert transcribe_events[0].total_seconds == 60.0
+    assert events[-1].stage == 'merge' and events[-1].fraction == 1.0
+    assert [s['speaker'] for s in segments] == ['S1']
+
+
+def test_no_listeners_keeps_single_pass(pipeline, monkeypatch, tmp_path):
+    model = WindowModel()
+    monkeypatch.setattr(diarize, 'whisper', types.SimpleNamespace(load_model=lambda size: model))
+    audio = tmp_path / 'a.wav'
+    audio.write_bytes(b'RIFF-quiet')
+
+    diarize.transcribe_with_speaker_diarization(str(audio), 'hf', cache=False)
+
+    assert 'hook' not in pipeline.kwargs
+    assert [len_ for len_, _ in model.calls] == [SR * 60]
@@ -0,0 +1,217 @@
+import os
+import threading
+
+import pytest
+
+from src import job_queue, progress
+from src.job_queue import CANCELLED, DONE, FAILED, PENDING, RUNNING, JobQueue
+from src.thread_policy import ThreadPolicy
+from src.worker import JobCancelled, JobWorker
+
+
+class InlineWorker:
+    """Runs jobs in the calling slot thread; cancel releases the blocked job."""
+
+    def __init__(self, policy):
+        self.policy = policy
+        self.jobs = []
+        self.stopped = False
+        self._cancel = threading.Event()
+
+    def run(self, func, *args):
+        self._cancel.clear()
+        self.jobs.append(args[0])
+        return func(*args, cancel=self._cancel)
+
+    def cancel(self):
+        self._cancel.set()
+
+    def stop(self):
+        self.stopped = True
+
+
+@pytest.fixture
+def gates(monkeypatch):
+    """Each job blocks on its own gate until the test opens it."""
+    gates = {}
+
+    def fake_run_item(audio_path, options, cancel=None):
+        gate = gates.setdefault(audio_path, threading.Event())
+        tracker = progress.ProgressTracker('transcribe', 10.0, audio_path)
+        tracker.update(5.0)
+        while not gate.wait(0.01):
+            if cancel is not None and cancel.is_set():
+                raise JobCancelled()
+        if audio_path.startswith('bad'):
+            return {'path': audio_path, 'error': 'FileNotFoundError: falta'}
+        return {'path': audio_path, 'error': None}
+
+    monkeypatch.setattr(job_queue, '_run_item', fake_run_item)
+    return gates
+
+
+@pytest.fixture
+def make_queue():
+    queues = []
+
+    def make(**kwargs):
+        workers = []
+
+        def factory(policy):
+            workers.append(InlineWorker(policy))
+            return workers[-1]
+
+        queue = JobQueue(worker_factory=factory, thread_policy=ThreadPolicy(affinity=frozenset(range(4))), **kwargs)
+        queue.workers = workers
+        queues.append(queue)
+        return queue
+
+    yield make
+    for queue in queues:
+        queue.shutdown()
+
+
+def wait_for(predicate, timeout=5.0):
+    event = threading.Event()
+    for _ in range(int(timeout / 0.01)):
+        if predicate():
+            return True
+        event.wait(0.01)
+    return predicate()
+
+
+def test_runs_at_most_max_workers_in_queue_order(gates, make_queue):
+    queue = make_queue(max_workers=2)
+    items = queue.add(['a.wav', 'b.wav', 'c.wav'], model_size='tiny')
+
+    assert wait_for(lambda: [i.status for i in items] == [RUNNING, RUNNING, PENDING])
+    assert len(queue.workers) == 2
+    # cores are split between the slots
+    assert [w.policy.threads for w in queue.workers] == [2, 2]
+    # progress events are routed to their item
+    assert wait_for(lambda: items[0].fraction == 0.5)
+
+    gates.setdefault('a.wav', threading.Event()).set()
+    assert wait_for(lambda: items[2].status == RUNNING)
+    for path in ('b.wav', 'c.wav'):
+        gates.setdefault(path, threading.Event()).set()
+    assert queue.wait(5)
+
+    assert [i.status for i in items] == [DONE] * 3
+    assert items[0].fraction == 1.0 and items[0].elapsed >= 0
+    assert items[0].options == {'model_size': 'tiny'}
+    # slots are reused: the third file ran on an already warm worker
+    assert sorted(len(w.jobs) for w in queue.workers) == [1, 2]
+
+
+def test_move_and_cancel_pending_items(gates, make_queue):
+    queue = make_queue(max_workers=1)
+    first, second, third = queue.add(['a.wav', 'b.wav', 'c.wav'])
+    assert wait_for(lambda: first.status == RUNNING)
+
+    assert not queue.move(first.id, 1)  # running items stay where they are
+    assert queue.move(third.id, -1)
+    assert [i.audio_path for i in queue.items] == ['a.wav', 'c.wav', 'b.wav']
+    assert queue.cancel(second.id)
+    assert not queue.cancel(second.id)
+
+    for gate in ('a.wav', 'c.wav'):
+        gates.setdefault(gate, threading.Event()).set()
+    assert queue.wait(5)
+    assert queue.workers[0].jobs == ['a.wav', 'c.wav']
+    assert second.status == CANCELLED
+
+    assert queue.remove_finished() == 3
+    assert queue.items == []
+
+
+def test_cancel_running_item_and_failures(gates, make_queue):
+    changes = []
+    queue = make_queue(max_workers=1, on_change=changes.append)
+    running, failing = queue.add(['a.wav', 'bad.wav'])
+    assert wait_for(lambda: running.status == RUNNING)
+
+    assert queue.cancel(running.id)
+    gates.setdefault('bad.wav', threading.Event()).set()
+    assert queue.wait(5)
+
+    assert running.status == CANCELLED
+    assert failing.status == FAILED and failing.error.startswith('FileNotFoundError')
+    assert changes and changes[-1] is failing
+
+
+def test_shrinking_pool_releases_extra_workers(gates, make_queue):
+    queue = make_queue(max_workers=2)
+    items = queue.add(['a.wav', 'b.wav'])
+    assert wait_for(lambda: all(i.status == RUNNING for i in items))
+
+    queue.set_max_workers(1)
+    gates.setdefault('b.wav', threading.Event()).set()
+    assert wait_for(lambda: queue.workers[1].stopped)
+    assert not queue.workers[0].stopped
+    gates.setdefault('a.wav', threading.Event()).set()
+    assert queue.wait(5)
+
+
+def test_resizing_pool_repartitions_cores_between_slots(gates, make_queue):
+    queue = make_queue(max_workers=1)
+    first, = queue.add(['a.wav'])
+    assert wait_for(lambda: first.status == RUNNING)
+    assert [w.policy.threads for w in queue.workers] == [4]
+
+    queue.set_max_workers(2)
+    second, third = queue.add(['b.wav', 'c.wav'])
+    assert wait_for(lambda: second.status == RUNNING)
+    # the new slot gets its half while the running file keeps the policy it started with
+    assert [w.policy.threads for w in queue.workers] == [4, 2]
+
+    gates.setdefault('a.wav', threading.Event()).set()
+    assert wait_for(lambda: third.status == RUNNING)
+    # before its next file the first slot swaps its worker for one with its new share
+    assert [w.policy.threads for w in queue.workers] == [4, 2, 2]
+    assert queue.workers[0].stopped and not queue.workers[2].stopped
+    assert queue.workers[2].jobs == ['c.wav']
+    for path in ('b.wav', 'c.wav'):
+        gates.setdefault(path, threading.Event()).set()
+    assert queue.wait(5)
+
+
+def test_shutdown_cancels_pending_and_rejects_new_files(gates, make_queue):
+    queue = make_queue(max_workers=1)
+    running, pending = queue.add(['a.wav', 'b.wav'])
+    assert wait_for(lambda: running.status == RUNNING)
+
+    queue.shutdown()
+    assert pending.status == CANCELLED
+    assert all(w.stopped for w in queue.workers)
+    with pytest.raises(RuntimeError):
+        queue.add(['c.wav'])
+
+
+def warm_job(audio_path, options):
+    return {'path': audio_path, 'pid': os.getpid(), 'error': None}
+
+
+def test_real_workers_keep_their_process_between_jobs(monkeypatch):
+    monkeypatch.setattr(job_queue, '_run_item', warm_job)
+    queue = JobQueue(max_workers=1, worker_factory=lambda policy: JobWorker(keep_warm=False,
+                                                                            thread_policy=policy))
+    try:
+        items = queue.add(['a.wav', 'b.wav'])
+        assert queue.wait(60)
+    finally:
+        queue.shutdown()
+    pids = {item.result['pid'] for item in items}
+    assert len(pids) == 1 and os.getpid() not in pids
+
+
+def test_bounded_pending_items_and_custom_task(gates, make_queue):
+    from src.job_queue import QueueFull
+
+    queue = make_queue(max_workers=1, max_pending=1)
+    running = queue.add(['a.wav'])[0]
+    assert wait_for(lambda: running.status == RUNNING)
+    queue.add(['b.wav'])
+    with pytest.raises(QueueFull):
+        queue.add(['c.wav'])
+    assert queue.pending_count() == 1 and queue.get(running.id) is running
@@ -0,0 +1,140 @@
+import sys
+import types
+
+import pytest
+
+from src import diarize
+from src.pipeline_cache import PipelineCache, get_pipeline_cache, release_pipeline, warm_up_pipeline
+
+
+class FakePipeline:
+    def __init__(self):
+        self.moved_to = None
+        self.instantiated = None
+        self.calls = 0
+
+    def to(self, device):
+        self.moved_to = str(device)
+
+    def instantiate(self, params):
+        self.instantiated = params
+
+    def __call__(self, audio, **kwargs):
+        self.calls += 1
+
+        class D:
+            def itertracks(self, yield_label=True):
+                yield (types.SimpleNamespace(start=0.0, end=1.0), None, 'S1')
+
+        return D()
+
+
+def counting_loader(created):
+    def load(name, token=None):
+        p = FakePipeline()
+        created.append((name, token, p))
+        return p
+    return load
+
+
+def test_cache_reuses_pipeline_per_key():
+    created = []
+    cache = PipelineCache()
+    p1 = cache.get('pipe', hf_token='hf_a', loader=counting_loader(created))
+    p2 = cache.get('pipe', hf_token='hf_b', loader=counting_loader(created))
+    assert p1 is p2
+    assert len(created) == 1
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+
+def test_cache_keys_on_device_and_params():
+    created = []
+    cache = PipelineCache()
+    cpu = cache.get('pipe', loader=counting_loader(created))
+    tuned = cache.get('pipe', params={'clustering': {'threshold': 0.7}}, loader=counting_loader(created))
+    same = cache.get('pipe', params={'clustering': {'threshold': 0.7}}, loader=counting_loader(created))
+    gpu = cache.get('pipe', device='cuda', loader=counting_loader(created))
+
+    assert len(created) == 3
+    assert tuned is same and tuned is not cpu
+    assert tuned.instantiated == {'clustering': {'threshold': 0.7}}
+    assert gpu.moved_to == 'cuda'
+
+
+def test_warm_up_and_release_module_cache():
+    created = []
+    p = warm_up_pipeline('pipe', 'hf_x', loader=counting_loader(created))
+    assert get_pipeline_cache().get('pipe', loader=counting_loader(created)) is p
+    assert release_pipeline('pipe') is True
+    assert release_pipeline('pipe') is False
+    get_pipeline_cache().get('pipe', loader=counting_loader(created))
+    assert len(created) == 2
+
+
+def test_diarization_instantiates_pipeline_once(monkeypatch, tmp_path):
+    created = []
+    fake_module = types.ModuleType('pyannote.audio')
+    fake_module.Pipeline = types.SimpleNamespace(from_pretrained=counting_loader(created))
+    monkeypatch.setitem(sys.modules, 'pyannote.audio', fake_module)
+
+    import torch
+    monkeypatch.setattr(torch.cuda, 'is_available', lambda: False)
+
+    def fake_normalize(path):
+        norm = tmp_path / 'norm.wav'
+        norm.write_bytes(b'RIFF')
+        return str(norm)
+
+    monkeypatch.setattr(diarize, 'normalize_audio_for_diarization', fake_normalize)
+
+    class DummyModel:
+        def transcribe(self, audio_path, **opts):
+            return {'segments': [{'start': 0.0, 'end': 1.0, 'text': 'hola'}]}
+
+    monkeypatch.setattr(diarize, 'whisper', types.SimpleNamespace(load_model=lambda s: DummyModel()))
+
+    audio = tmp_path / 'audio.mp3'
+    audio.write_bytes(b'RIFF')
+    for _ in range(3):
+        segs = diarize.transcribe_with_speaker_diarization(str(audio), 'hf_FAKE', model_size='tiny', cache=False)
+        assert segs[0]['speaker'] == 'S1'
+
+    assert len(created) == 1
+    assert created[0][0] == diarize.DIARIZATION_PIPELINE
+    assert created[0][2].calls == 3
+    assert diarize.release_diarization_pipeline() is True
+
+
+def test_cache_propagates_loader_errors():
+    def bad_loader(name, token=None):
+        raise RuntimeError('401 unauthorized')
+
+    cache = PipelineCache()
+    with pytest.raises(RuntimeError):
+        cache.get('pipe', loader=bad_loader)
+    assert cache.stats()['pipelines'] == []
+
+
+def test_warm_up_models_fills_both_caches(monkeypatch):
+    from src.model_registry import get_registry
+
+    created = []
+    fake_module = types.ModuleType('pyannote.audio')
+    fake_module.Pipeline = types.SimpleNamespace(from_pretrained=counting_loader(created))
+    monkeypatch.setitem(sys.modules, 'pyannote.audio', fake_module)
+    monkeypatch.setattr(diarize, 'torch', types.SimpleNamespace(cuda=types.SimpleNamespace(is_available=lambda: False)))
+    loaded = []
+    monkeypatch.setattr(diarize, 'whisper', types.SimpleNamespace(load_model=lambda s: loaded.append(s) or object()))
+    get_registry().clear()
+    try:
+        info = diarize.warm_up_models('tiny')
+        assert info['model_size'] == 'tiny' and info['pipeline'] is False and info['seconds'] >= 0
+        assert loaded == ['tiny'] and created == []
+
+        info = diarize.warm_up_models('tiny', 'hf_x')
+        # the Whisper model is already resident: only pyannote is loaded
+        assert loaded == ['tiny'] and info['pipeline'] is True
+        assert len(created) == 1
+    finally:
+        get_registry().clear()
+        diarize.release_diarization_pipeline()
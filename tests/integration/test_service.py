@@ -0,0 +1,173 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from src import service as service_mod
+from src.job_queue import CANCELLED, DONE
+from src.service import TranscriptionService, fake_job, make_server
+
+
+def request(base_url, path, method='GET', body=None):
+    data = json.dumps(body).encode('utf-8') if body is not None else None
+    req = urllib.request.Request(base_url + path, data=data, method=method)
+    try:
+        with urllib.request.urlopen(req, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+@pytest.fixture
+def serve():
+    running = []
+
+    def start(service):
+        server = make_server(service, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        running.append((server, service))
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    yield start
+    for server, service in running:
+        server.shutdown()
+        server.server_close()
+        service.shutdown()
+
+
+def wait_result(base_url, job_id, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status, body = request(base_url, f'/jobs/{job_id}/result')
+        if status == 200:
+            return body
+        time.sleep(0.05)
+    raise AssertionError(f'job {job_id} did not finish')
+
+
+def test_submit_status_result_with_warm_fake_workers(serve, tmp_path):
+    audio = tmp_path / 'a.wav'
+    audio.write_bytes(b'RIFF')
+    service = TranscriptionService(workers=2, task=fake_job,
+                                   job_defaults={'fake_load': 0.3, 'fake_seconds': 0.05})
+    base_url = serve(service)
+
+    ids = []
+    for _ in range(6):
+        status, body = request(base_url, '/jobs', 'POST', {'audio_path': str(audio), 'model': 'tiny'})
+        assert status == 202 and body['status'] in ('pendiente', 'en curso')
+        ids.append(body['id'])
+
+    results = [wait_result(base_url, job_id) for job_id in ids]
+    assert results[0]['text'] == ' a.wav'
+    # two long-lived worker processes served all six jobs
+    assert len({r['pid'] for r in results}) == 2
+
+    status, body = request(base_url, f'/jobs/{ids[0]}')
+    assert status == 200 and body['status'] == DONE and body['progress'] == 1.0
+    status, body = request(base_url, '/health')
+    assert body == {'workers': 2, 'pending': 0, 'running': 0, 'max_pending': 100}
+
+
+def test_validation_errors_and_unknown_jobs(serve, tmp_path):
+    base_url = serve(TranscriptionService(workers=1, task=fake_job))
+
+    assert request(base_url, '/jobs', 'POST', {})[0] == 400
+    status, body = request(base_url, '/jobs', 'POST', {'audio_path': str(tmp_path / 'missing.wav')})
+    assert status == 400 and 'no existe' in body['error']
+    audio = tmp_path / 'a.wav'
+    audio.write_bytes(b'RIFF')
+    for speakers in ('2', 0, -1, 1.5, True):
+        status, body = request(base_url, '/jobs', 'POST', {'audio_path': str(audio), 'num_speakers': speakers})
+        assert status == 400 and 'num_speakers' in body['error']
+    for speakers in (None, 2):
+        assert request(base_url, '/jobs', 'POST', {'audio_path': str(audio), 'num_speakers': speakers})[0] == 202
+    assert request(base_url, '/jobs/99')[0] == 404
+    assert request(base_url, '/jobs/99/result')[0] == 404
+    assert request(base_url, '/jobs/99', 'DELETE')[0] == 404
+    assert request(base_url, '/otra')[0] == 404
+
+
+def test_bounded_queue_rejects_and_cancel(serve, tmp_path):
+    audio = tmp_path / 'a.wav'
+    audio.write_bytes(b'RIFF')
+    service = TranscriptionService(workers=1, max_pending=1, task=fake_job,
+                                   job_defaults={'fake_seconds': 30.0})
+    base_url = serve(service)
+
+    first = request(base_url, '/jobs', 'POST', {'audio_path': str(audio)})[1]
+    deadline = time.monotonic() + 30
+    while request(base_url, f"/jobs/{first['id']}")[1]['status'] != 'en curso':
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+    second = request(base_url, '/jobs', 'POST', {'audio_path': str(audio)})[1]
+    status, body = request(base_url, '/jobs', 'POST', {'audio_path': str(audio)})
+    assert status == 429
+
+    status, body = request(base_url, f"/jobs/{first['id']}/result")
+    assert status == 409 and body['status'] == 'en curso'
+
+    for job in (second, first):
+        status, body = request(base_url, f"/jobs/{job['id']}", 'DELETE')
+        assert status == 200 and body['cancelled'] is True and body['status'] == CANCELLED
+    assert service.queue.wait(10)
+    assert request(base_url, f"/jobs/{first['id']}", 'DELETE')[1]['cancelled'] is False
+
+
+def test_cancel_answers_even_if_the_job_is_pruned_meanwhile(serve, tmp_path, monkeypatch):
+    audio = tmp_path / 'a.wav'
+    audio.write_bytes(b'RIFF')
+    service = TranscriptionService(workers=1, task=fake_job, keep_finished=0,
+                                   job_defaults={'fake_seconds': 5.0})
+    base_url = serve(service)
+    first = request(base_url, '/jobs', 'POST', {'audio_path': str(audio)})[1]
+    second = request(base_url, '/jobs', 'POST', {'audio_path': str(audio)})[1]
+
+    # another request prunes finished jobs right after this one is cancelled
+    cancel = service.queue.cancel
+
+    def cancel_then_prune(item_id):
+        cancelled = cancel(item_id)
+        service.queue.remove_finished()
+        return cancelled
+
+    monkeypatch.setattr(service.queue, 'cancel', cancel_then_prune)
+    status, body = request(base_url, f"/jobs/{second['id']}", 'DELETE')
+    assert status == 200 and body['cancelled'] is True and body['status'] == CANCELLED
+    assert body['id'] == second['id']
+    assert request(base_url, f"/jobs/{second['id']}")[0] == 404
+    assert request(base_url, f"/jobs/{first['id']}", 'DELETE')[1]['cancelled'] is True
+
+
+def test_real_job_dispatches_to_transcription_functions(monkeypatch):
+    import sys
+    import src.diarize  # noqa: F401  (CLI tests may re-run these modules under runpy)
+    import src.transcribe  # noqa: F401
+
+    monkeypatch.setattr(sys.modules['src.transcribe'], 'transcribe_audio',
+                        lambda path, model, language: {'text': f'{path}-{model}-{language}'})
+    monkeypatch.setattr(sys.modules['src.diarize'], 'transcribe_with_speaker_diarization',
+                        lambda path, token, model, language, speakers: [
+                            {'start': 0.0, 'end': 1.0, 'speaker': 'S1', 'text': 'hola'}])
+
+    assert service_mod.run_job('a.wav', {'model_size': 'tiny', 'language': 'es'}) == {'text': 'a.wav-tiny-es'}
+    result = service_mod.run_job('a.wav', {'diarize': True, 'hf_token': 'hf_x'})
+    assert result['segments'][0]['speaker'] == 'S1' and 'S1' in result['text']
+
+
+def test_finished_jobs_are_pruned(tmp_path):
+    audio = tmp_path / 'a.wav'
+    audio.write_bytes(b'RIFF')
+    service = TranscriptionService(workers=1, keep_finished=2, task=fake_job)
+    try:
+        for _ in range(4):
+            service.submit({'audio_path': str(audio)})
+            assert service.queue.wait(30)
+        service.submit({'audio_path': str(audio)})
+        assert service.queue.wait(30)
+        assert len(service.queue.items) == 3
+    finally:
+        service.shutdown()
@@ -0,0 +1,147 @@
+import os
+import time
+
+import pytest
+
+from src import progress
+from src.worker import JobCancelled, JobWorker, is_transferable
+
+
+def echo_job(value, steps=3):
+    tracker = progress.ProgressTracker('transcribe', float(steps), 'job.wav')
+    for i in range(steps):
+        tracker.update(i + 1.0, {'start': float(i), 'end': i + 1.0, 'text': f' {value}'})
+    return {'value': value, 'pid': os.getpid()}
+
+
+def failing_job():
+    raise FileNotFoundError('no existe')
+
+
+def silent_job(seconds):
+    time.sleep(seconds)
+    return 'late'
+
+
+def chatty_job(seconds):
+    tracker = progress.ProgressTracker('transcribe', seconds, 'job.wav')
+    started = time.monotonic()
+    while time.monotonic() - started < seconds:
+        time.sleep(0.05)
+        tracker.update(time.monotonic() - started)
+    return 'late'
+
+
+@pytest.fixture
+def worker():
+    workers = []
+
+    def make(**kwargs):
+        w = JobWorker(**kwargs)
+        workers.append(w)
+        return w
+
+    yield make
+    for w in workers:
+        w.stop()
+
+
+def test_run_returns_result_and_forwards_progress(worker):
+    w = worker()
+    events = []
+    callback = progress.subscribe(events.append)
+    try:
+        first = w.run(echo_job, 'hola')
+        second = w.run(echo_job, 'otra', steps=1)
+    finally:
+        progress.unsubscribe(callback)
+
+    assert first['value'] == 'hola' and first['pid'] != os.getpid()
+    # the same long-lived process (and its loaded models) serves every job
+    assert second['pid'] == first['pid']
+    assert [e.segment['text'] for e in events] == [' hola'] * 3 + [' otra']
+    assert events[0].source == 'job.wav'
+
+
+def test_job_exception_is_reraised(worker):
+    w = worker()
+    with pytest.raises(FileNotFoundError, match='no existe'):
+        w.run(failing_job)
+    assert w.alive
+
+
+def test_cancel_terminates_process_and_next_job_restarts(worker):
+    import threading
+
+    w = worker(keep_warm=False)
+    w.start()
+    pid = w.pid
+    threading.Timer(0.5, w.cancel).start()
+
+    started = time.monotonic()
+    with pytest.raises(JobCancelled):
+        w.run(silent_job, 60)
+    assert time.monotonic() - started < 10
+    assert not w.alive
+
+    assert w.run(echo_job, 'x')['pid'] != pid
+
+
+def test_cancel_keep_warm_stops_at_next_event_and_keeps_process(worker):
+    import threading
+
+    w = worker(keep_warm=True, cancel_grace=10)
+    w.start()
+    pid = w.pid
+    threading.Timer(0.5, w.cancel).start()
+
+    with pytest.raises(JobCancelled):
+        w.run(chatty_job, 60)
+
+    assert w.pid == pid
+    assert w.run(echo_job, 'y')['pid'] == pid
+
+
+def test_cancel_also_drops_jobs_waiting_for_the_worker(worker):
+    import threading
+
+    w = worker(keep_warm=False)
+    outcomes = []
+
+    def queued():
+        try:
+            outcomes.append(w.run(echo_job, 'late'))
+        except JobCancelled:
+            outcomes.append('cancelled')
+
+    threading.Timer(0.5, queued).start()
+    threading.Timer(1.0, w.cancel).start()
+    with pytest.raises(JobCancelled):
+        w.run(silent_job, 60)
+    for _ in range(100):
+        if outcomes:
+            break
+        time.sleep(0.05)
+    assert outcomes == ['cancelled']
+
+
+def test_cancel_targets_a_single_job_function_cooperatively(worker):
+    import threading
+
+    w = worker(keep_warm=False, cancel_grace=10)
+    w.start()
+    pid = w.pid
+    # not the running job: ignored
+    threading.Timer(0.3, w.cancel, kwargs={'terminate': False, 'func': echo_job}).start()
+    threading.Timer(0.6, w.cancel, kwargs={'terminate': False, 'func': chatty_job}).start()
+
+    started = time.monotonic()
+    with pytest.raises(JobCancelled):
+        w.run(chatty_job, 60)
+    assert time.monotonic() - started >= 0.6
+    assert w.pid == pid
+
+
+def test_only_importable_functions_are_transferable():
+    assert is_transferable(echo_job)
+    assert not is_transferable(lambda: None)
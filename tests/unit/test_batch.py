@@ -0,0 +1,154 @@
+import multiprocessing
+import sys
+
+import pytest
+
+from src import batch, transcribe
+
+
+class DummyModel:
+    def transcribe(self, audio_path, **opts):
+        if 'broken' in str(audio_path):
+            raise RuntimeError('cannot decode')
+        return {"text": f"texto de {audio_path}", "segments": [{"start": 0.0, "end": 90.0, "text": "hola"}]}
+
+
+def make_audio(tmp_path, *names):
+    paths = []
+    for name in names:
+        p = tmp_path / name
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_bytes(b'RIFF' + name.encode())
+        paths.append(p)
+    return paths
+
+
+def test_collect_inputs_dirs_globs_and_manifest(tmp_path):
+    a, b, c, _ = make_audio(tmp_path, 'd/a.mp3', 'd/sub/b.WAV', 'g/c.flac', 'd/notes.txt')
+    manifest = tmp_path / 'list.txt'
+    manifest.write_text(f"# comentario\n\n{a}\ng/c.flac\n", encoding='utf-8')
+
+    files = batch.collect_inputs([str(tmp_path / 'd'), str(tmp_path / 'g' / '*'), '@' + str(manifest)])
+
+    assert files == [str(a), str(b), str(c)]
+
+
+def test_output_paths_next_to_input_or_in_output_dir(tmp_path):
+    audio = str(tmp_path / 'x' / 'rec.mp3')
+    assert batch.output_paths(audio) == [str(tmp_path / 'x' / 'rec_transcripcion.txt')]
+    assert batch.output_paths(audio, str(tmp_path / 'out'), diarize=True) == [
+        str(tmp_path / 'out' / 'rec_diarized_grouped.txt'),
+        str(tmp_path / 'out' / 'rec_diarized_timestamped.txt'),
+    ]
+
+
+def test_inputs_writing_the_same_output_are_rejected_before_processing(monkeypatch, tmp_path, capsys):
+    monkeypatch.setattr(transcribe.whisper, 'load_model', lambda size: pytest.fail('nothing should run'))
+    a, b = make_audio(tmp_path, 'a/x.wav', 'b/x.wav')
+    out = str(tmp_path / 'out')
+
+    with pytest.raises(ValueError, match='x_transcripcion.txt'):
+        batch.run_batch([str(a), str(b)], output_dir=out)
+    assert batch.main([str(tmp_path / 'a'), str(tmp_path / 'b'), '--output-dir', out]) == 1
+    assert 'misma salida' in capsys.readouterr().out
+    assert not (tmp_path / 'out').exists()
+
+    # next to each input the names do not clash, but two extensions of one stem do
+    batch.check_output_collisions([str(a), str(b)])
+    c, = make_audio(tmp_path, 'a/x.mp3')
+    with pytest.raises(ValueError):
+        batch.check_output_collisions([str(a), str(c)], diarize=True)
+
+
+def test_run_batch_in_process_loads_model_once(monkeypatch, tmp_path):
+    calls = []
+
+    def load(size):
+        calls.append(size)
+        return DummyModel()
+
+    monkeypatch.setattr(transcribe.whisper, 'load_model', load)
+    inputs = [str(p) for p in make_audio(tmp_path, 'a.mp3', 'b.mp3', 'broken.mp3')]
+
+    summary = batch.run_batch(inputs, model_size='tiny', workers=1, output_dir=str(tmp_path / 'out'))
+
+    assert calls == ['tiny']
+    assert summary['files'] == 3 and summary['succeeded'] == 2 and summary['failed'] == 1
+    assert summary['audio_seconds'] == pytest.approx(180.0)
+    assert (tmp_path / 'out' / 'a_transcripcion.txt').exists()
+    assert 'cannot decode' in summary['results'][2]['error']
+    assert summary['files_per_second'] > 0
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='fork context not available')
+def test_run_batch_process_pool(monkeypatch, tmp_path):
+    monkeypatch.setattr(transcribe.whisper, 'load_model', lambda size: DummyModel())
+    inputs = [str(p) for p in make_audio(tmp_path, 'a.mp3', 'b.mp3', 'c.mp3')]
+
+    summary = batch.run_batch(inputs, workers=2, mp_context=multiprocessing.get_context('fork'))
+
+    assert summary['succeeded'] == 3
+    for name in ('a', 'b', 'c'):
+        assert (tmp_path / f'{name}_transcripcion.txt').exists()
+
+
+def test_main_prints_summary_and_exit_code(monkeypatch, tmp_path, capsys):
+    monkeypatch.setattr(transcribe.whisper, 'load_model', lambda size: DummyModel())
+    make_audio(tmp_path, 'a.mp3', 'broken.mp3')
+
+    code = batch.main([str(tmp_path), '--model', 'tiny'])
+
+    out = capsys.readouterr().out
+    assert code == 1
+    assert 'RESUMEN DEL LOTE' in out
+    assert 'archivos/s' in out and 'horas de audio por hora' in out
+
+
+def test_main_without_inputs_or_token(monkeypatch, tmp_path, capsys):
+    assert batch.main([str(tmp_path / 'empty*')]) == 1
+    monkeypatch.setenv('HF_TOKEN', '')
+    monkeypatch.setattr('dotenv.load_dotenv', lambda *a, **k: None)
+    assert batch.main([str(tmp_path), '--diarize']) == 1
+    assert 'HF_TOKEN' in capsys.readouterr().out
+
+
+class ThreadCountingModel:
+    """Writes the torch thread count seen while transcribing into the output text."""
+
+    def transcribe(self, audio_path, **opts):
+        import torch
+        return {"text": f"threads={torch.get_num_threads()}", "segments": [{"start": 0.0, "end": 1.0, "text": ""}]}
+
+
+@pytest.fixture
+def restore_torch_threads():
+    import torch
+    threads = torch.get_num_threads()
+    yield
+    torch.set_num_threads(threads)
+
+
+def test_worker_policy_is_kept_while_each_file_is_processed(monkeypatch, tmp_path, restore_torch_threads):
+    monkeypatch.setattr(transcribe.whisper, 'load_model', lambda size: ThreadCountingModel())
+    monkeypatch.setenv('WHISPER_THREADS', '3')
+    monkeypatch.setenv('WHISPER_CACHE', '0')
+    inputs = [str(p) for p in make_audio(tmp_path, 'a.mp3', 'b.mp3')]
+
+    batch.run_batch(inputs, workers=1, thread_policy=batch.ThreadPolicy(threads=2))
+
+    # the per-file setup must not fall back to WHISPER_THREADS / all cores
+    for name in ('a', 'b'):
+        assert (tmp_path / f'{name}_transcripcion.txt').read_text(encoding='utf-8') == 'threads=2'
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='fork context not available')
+def test_pool_workers_keep_their_share_of_threads(monkeypatch, tmp_path, restore_torch_threads):
+    monkeypatch.setattr(transcribe.whisper, 'load_model', lambda size: ThreadCountingModel())
+    monkeypatch.setenv('WHISPER_CACHE', '0')
+    inputs = [str(p) for p in make_audio(tmp_path, 'a.mp3', 'b.mp3', 'c.mp3')]
+
+    batch.run_batch(inputs, workers=2, thread_policy=batch.ThreadPolicy(threads=1),
+                    mp_context=multiprocessing.get_context('fork'))
+
+    for name in ('a', 'b', 'c'):
+        assert (tmp_path / f'{name}_transcripcion.txt').read_text(encoding='utf-8') == 'threads=1'
@@ -79,3 +79,24 @@ def test_normalize_audio_for_diarization_mock(monkeypatch, tmp_path):
     assert os.path.exists(out)
     # cleanup
     os.unlink(out)
+
+
+def test_decode_audio_returns_mono_16k_mapping(monkeypatch, tmp_path):
+    fake_torchaudio = types.SimpleNamespace()
+    resampled = {}
+
+    def fake_resample(sr_from, sr_to):
+        resampled['rates'] = (sr_from, sr_to)
+        return lambda w: w[:, ::2]
+
+    fake_torchaudio.load = lambda path: (torch.ones((2, 320), dtype=torch.float32), 32000)
+    fake_torchaudio.transforms = types.SimpleNamespace(Resample=fake_resample)
+    monkeypatch.setitem(sys.modules, 'torchaudio', fake_torchaudio)
+
+    src_file = tmp_path / 'in.wav'
+    src_file.write_bytes(b'RIFF')
+
+    audio = diarize.decode_audio(str(src_file))
+    assert audio['sample_rate'] == 16000
+    assert tuple(audio['waveform'].shape) == (1, 160)
+    assert resampled['rates'] == (32000, 16000)
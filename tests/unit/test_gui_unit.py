@@ -88,3 +88,264 @@ def test_start_transcription_validations(monkeypatch):
         app.process_audio()
     finally:
         root.destroy()
+
+
+def test_progress_events_drive_determinate_bar(tmp_path):
+    from src.progress import DIARIZATION_WEIGHTS, PipelineProgress, ProgressEvent
+
+    root, app = make_app(tmp_path)
+    try:
+        app.audio_file = 'a.wav'
+        app.pipeline_progress = PipelineProgress(DIARIZATION_WEIGHTS)
+        app.root.after = lambda delay, func, *args: func(*args)
+
+        app.on_progress(ProgressEvent('decode', 1.0, 60.0, 60.0, 1.0, 0.0, source='a.wav'))
+        app.on_progress(ProgressEvent('diarize', 0.5, 30.0, 60.0, 15.0, 15.0, source='a.wav'))
+        # events from other files are ignored
+        app.on_progress(ProgressEvent('diarize', 1.0, 60.0, 60.0, 30.0, 0.0, source='b.wav'))
+
+        assert app.progress_bar['mode'] == 'determinate'
+        assert float(app.progress_bar['value']) == pytest.approx(27.5)
+        status = app.progress_label.cget('text')
+        assert 'Diarización 50%' in status and 'RTF 0.50' in status and 'ETA' in status
+    finally:
+        root.destroy()
+
+
+def test_cancel_stops_worker_and_untransferable_jobs_run_in_thread(monkeypatch, tmp_path):
+    root, app = make_app(tmp_path)
+    try:
+        calls = []
+        monkeypatch.setattr(app.worker, 'cancel', lambda: calls.append('cancel'))
+        monkeypatch.setattr(app.worker, 'run', lambda func, *args: calls.append('worker'))
+        monkeypatch.setattr(app, 'warm_up', lambda: calls.append('warm_up'))
+        monkeypatch.setattr(app, 'prefetch', lambda audio_file: calls.append(('prefetch', audio_file)))
+        monkeypatch.setattr('tkinter.messagebox.askyesno', lambda *a, **k: True)
+        app.worker.keep_warm = False
+        app.audio_file = 'a.wav'
+        app.model_status.config(text='✓ Modelo base listo')
+        generation = app.warm_generation
+
+        assert app.run_job(lambda a: a * 2, 21) == 42
+        app.cancel_transcription()
+
+        # the terminated process took the warm model and the decoded audio with it
+        assert calls == ['cancel', 'warm_up', ('prefetch', 'a.wav')]
+        assert app.model_status.cget('text') == ''
+        # a warm-up still running in the old process cannot report it as ready
+        assert app.warm_generation > generation
+        assert app.processing is False
+
+        calls.clear()
+        app.worker.keep_warm = True
+        app.cancel_transcription()
+        assert calls == ['cancel']
+    finally:
+        root.destroy()
+
+
+def test_segments_render_incrementally_in_batches(tmp_path):
+    from src.progress import SIMPLE_WEIGHTS, PipelineProgress, ProgressEvent
+
+    root, app = make_app(tmp_path)
+    try:
+        scheduled = []
+        app.root.after = lambda delay, func, *args: scheduled.append(func)
+        app.audio_file = 'a.wav'
+        app.pipeline_progress = PipelineProgress(SIMPLE_WEIGHTS)
+
+        for i in range(50):
+            segment = {'start': float(i), 'end': i + 1.0, 'text': f' s{i}'}
+            app.on_progress(ProgressEvent('transcribe', (i + 1) / 50, i + 1.0, 50.0, 1.0, 1.0, segment, 'a.wav'))
+
+        # fifty events schedule a single Tk update
+        assert scheduled == [app.flush_render]
+        scheduled.pop()()
+        assert app.result_text.get(1.0, 'end').strip().endswith('s49')
+        assert float(app.progress_bar['value']) == pytest.approx(100.0)
+
+        app.show_result('final')
+        assert app.result_text.get(1.0, 'end').strip() == 'final'
+    finally:
+        root.destroy()
+
+
+def test_large_results_use_virtualized_viewer(monkeypatch, tmp_path):
+    from src import gui as gui_mod
+
+    monkeypatch.setattr(gui_mod, 'VIRTUAL_VIEW_THRESHOLD', 10)
+    root, app = make_app(tmp_path)
+    try:
+        segments = [{'start': i * 60.0, 'end': i * 60.0 + 30, 'text': f' t{i}', 'speaker': f'S{i % 3}'}
+                    for i in range(500)]
+        app.show_segments(segments, 'ignored')
+
+        assert app.virtual_view_active
+        # only the visible window is rendered in the Text widget
+        rendered = app.transcript_view.text.get(1.0, 'end').strip().splitlines()
+        assert len(rendered) == app.transcript_view.rows
+        assert app.result_text.get(1.0, 'end').strip() == ''
+
+        app.jump_time_var.set('02:00:30')
+        app.jump_to_time()
+        assert app.transcript_view.first == 120
+
+        app.speaker_var.set('S2')
+        app.jump_to_speaker()
+        assert app.transcript_view.first == 122
+
+        app.show_result('small')
+        assert not app.virtual_view_active
+        assert app.result_text.get(1.0, 'end').strip() == 'small'
+    finally:
+        root.destroy()
+
+
+def test_speaker_jumps_keep_advancing_near_the_end(monkeypatch, tmp_path):
+    from src import gui as gui_mod
+
+    monkeypatch.setattr(gui_mod, 'VIRTUAL_VIEW_THRESHOLD', 10)
+    root, app = make_app(tmp_path)
+    try:
+        # two-segment turns alternating A/B; the last turns fit in the final page
+        segments = [{'start': float(i), 'end': i + 1.0, 'text': f' t{i}', 'speaker': 'AB'[i // 2 % 2]}
+                    for i in range(100)]
+        app.show_segments(segments, 'ignored')
+        view = app.transcript_view
+        view.rows = 20
+        view.scroll(len(segments))
+        assert view.first == 80
+
+        # A's turns start at 0, 4, 8, ...; the view cannot scroll past row 80
+        assert [view.jump_to_speaker('A') for _ in range(4)] == [84, 88, 92, 96]
+        assert view.first == 80
+        assert view.jump_to_speaker('A') is None
+        assert view.jump_to_speaker('A', forward=False) == 92
+        assert view.jump_to_speaker('B', forward=False) == 90
+    finally:
+        root.destroy()
+
+
+def test_partial_segments_switch_to_virtualized_viewer_during_the_job(monkeypatch, tmp_path):
+    from src import gui as gui_mod
+    from src.progress import SIMPLE_WEIGHTS, PipelineProgress, ProgressEvent
+
+    monkeypatch.setattr(gui_mod, 'VIRTUAL_VIEW_THRESHOLD', 10)
+    root, app = make_app(tmp_path)
+    try:
+        scheduled = []
+        app.root.after = lambda delay, func, *args: scheduled.append(func)
+        app.audio_file = 'a.wav'
+        app.pipeline_progress = PipelineProgress(SIMPLE_WEIGHTS)
+
+        def publish(first, count):
+            for i in range(first, first + count):
+                segment = {'start': float(i), 'end': i + 1.0, 'text': f' s{i}'}
+                app.on_progress(ProgressEvent('transcribe', 0.5, i + 1.0, 100.0, 1.0, 1.0, segment, 'a.wav'))
+            while scheduled:
+                scheduled.pop()()
+
+        publish(0, 8)
+        assert not app.virtual_view_active
+        assert app.result_text.get(1.0, 'end').strip().endswith('s7')
+
+        publish(8, 5)
+        assert app.virtual_view_active
+        assert app.result_text.get(1.0, 'end').strip() == ''
+        assert len(app.transcript_view.index) == 13
+
+        publish(13, 7)
+        assert len(app.transcript_view.index) == 20
+        assert not app.render_buffer.pending
+    finally:
+        root.destroy()
+
+
+def test_queue_panel_adds_files_and_mirrors_queue(monkeypatch, tmp_path):
+    from src import job_queue
+
+    class IdleQueue(job_queue.JobQueue):
+        def _ensure_slots(self):
+            pass  # keep items pending: no worker processes in GUI tests
+
+    monkeypatch.setattr(job_queue, 'JobQueue', IdleQueue)
+    root, app = make_app(tmp_path)
+    try:
+        app.open_queue()
+        panel = app.queue_panel
+        monkeypatch.setattr('tkinter.filedialog.askopenfilenames',
+                            lambda **kw: (str(tmp_path / 'a.wav'), str(tmp_path / 'b.wav')))
+        panel.add_files()
+        panel.refresh()
+        rows = [panel.tree.item(iid, 'values') for iid in panel.tree.get_children()]
+        assert [r[0] for r in rows] == ['a.wav', 'b.wav']
+        assert rows[0][1] == job_queue.PENDING
+        assert app.job_queue.items[0].options['model_size'] == app.model_var.get()
+
+        panel.tree.selection_set(panel.tree.get_children()[1])
+        panel.move_selected(-1)
+        assert [panel.tree.item(i, 'values')[0] for i in panel.tree.get_children()] == ['b.wav', 'a.wav']
+        panel.cancel_selected()
+        panel.remove_finished()
+        assert len(panel.tree.get_children()) == 1
+    finally:
+        app.shutdown()
+        root.destroy()
+
+
+def test_model_change_warms_up_in_background(monkeypatch, tmp_path):
+    import src.gui as gui_mod
+
+    root, app = make_app(tmp_path)
+    try:
+        calls = []
+        monkeypatch.setattr(root, 'after', lambda delay, func, *args: func(*args))
+        monkeypatch.setattr(app, 'run_job', lambda func, *args: calls.append((func, args)) or
+                            {'model_size': args[0], 'pipeline': bool(args[1]), 'seconds': 0.1})
+        monkeypatch.setattr(gui_mod.threading, 'Thread',
+                            lambda target, args, daemon: type('T', (), {'start': lambda self: target(*args)})())
+        monkeypatch.setenv('HF_TOKEN', 'hf_x')
+        app.warmup_enabled = True
+
+        app.model_var.set('small')
+        app.warm_up()
+        assert calls == [(gui_mod.warm_up_models, ('small', None))]
+        assert 'small listo' in app.model_status.cget('text')
+
+        app.transcription_type.set('diarization')
+        app.warm_up()
+        assert calls[-1][1] == ('small', 'hf_x')
+        assert 'diarización' in app.model_status.cget('text')
+
+        # a stale warm-up does not overwrite the newest status
+        app.show_model_status(app.warm_generation - 1, 'viejo', 'red')
+        assert 'viejo' not in app.model_status.cget('text')
+    finally:
+        app.shutdown()
+        root.destroy()
+
+
+def test_selected_file_is_prefetched_in_background(monkeypatch, tmp_path):
+    import src.gui as gui_mod
+
+    root, app = make_app(tmp_path)
+    try:
+        calls = []
+        audio = tmp_path / 'a.wav'
+        audio.write_bytes(b'RIFF')
+        app.prefetch_enabled = True
+        monkeypatch.setattr(root, 'after', lambda delay, func, *args: func(*args))
+        monkeypatch.setattr(app.worker, 'cancel', lambda terminate=None, func=None: calls.append('cancel'))
+        monkeypatch.setattr(app, 'run_job', lambda func, *args: calls.append((func, args)) or
+                            {'path': args[0], 'duration': 90.0})
+        monkeypatch.setattr(gui_mod.threading, 'Thread',
+                            lambda target, args, daemon: type('T', (), {'start': lambda self: target(*args)})())
+        monkeypatch.setattr('tkinter.filedialog.askopenfilename', lambda **kw: str(audio))
+
+        app.select_file()
+
+        assert calls == ['cancel', (gui_mod.prefetch_audio, (str(audio),))]
+        assert 'audio decodificado' in app.status_bar.cget('text')
+    finally:
+        app.shutdown()
+        root.destroy()
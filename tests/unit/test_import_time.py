@@ -0,0 +1,62 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# Frameworks that must only be imported on first use
+HEAVY_MODULES = ('torch', 'whisper', 'pyannote', 'torchaudio', 'numpy')
+
+# Cumulative import budgets in microseconds (generous for slow CI machines;
+# with the heavy frameworks loaded eagerly these modules took several seconds)
+BUDGETS_US = {
+    'src.transcribe': 300_000,
+    'src.diarize': 300_000,
+    'src.batch': 300_000,
+    'src.gui': 600_000,
+}
+
+
+def run_importtime(*args):
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', *args],
+        cwd=ROOT, capture_output=True, text=True, timeout=60
+    )
+    imports = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        imports[name.strip()] = int(cumulative)
+    return proc, imports
+
+
+def heavy_imports(imports):
+    return sorted(name for name in imports if name.split('.')[0] in HEAVY_MODULES)
+
+
+@pytest.mark.parametrize('module', sorted(BUDGETS_US))
+def test_module_import_is_lightweight(module):
+    if module == 'src.gui':
+        pytest.importorskip('tkinter')
+
+    proc, imports = run_importtime('-c', f'import {module}')
+
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    assert heavy_imports(imports) == []
+    assert imports[module] < BUDGETS_US[module], f"{module}: {imports[module] / 1000:.0f} ms"
+
+
+@pytest.mark.parametrize('args', [
+    ('-m', 'src.batch', '--help'),
+    ('-m', 'src.transcribe'),
+    ('-m', 'src.diarize'),
+    ('-m', 'src.result_cache', '--bad-flag'),
+])
+def test_cli_help_and_usage_errors_skip_heavy_imports(args):
+    proc, imports = run_importtime(*args)
+
+    assert proc.returncode in (0, 1, 2)
+    assert heavy_imports(imports) == []
@@ -0,0 +1,128 @@
+import threading
+import time
+
+from src import transcribe
+from src.model_registry import ModelRegistry, estimate_model_bytes, get_registry
+
+
+class FakeParam:
+    def __init__(self, n):
+        self._n = n
+
+    def numel(self):
+        return self._n
+
+    def element_size(self):
+        return 4
+
+
+class FakeModel:
+    def __init__(self, name, n_params=0):
+        self.name = name
+        self._params = [FakeParam(n_params)] if n_params else []
+
+    def parameters(self):
+        return iter(self._params)
+
+    def transcribe(self, audio_path, **opts):
+        return {"text": self.name, "segments": []}
+
+
+def counting_loader(calls, n_params=0):
+    def load(size, **kwargs):
+        calls.append((size, kwargs))
+        return FakeModel(size, n_params)
+    return load
+
+
+def test_registry_hits_after_first_load():
+    calls = []
+    reg = ModelRegistry()
+    m1 = reg.get('tiny', loader=counting_loader(calls))
+    m2 = reg.get('tiny', loader=counting_loader(calls))
+    assert m1 is m2
+    assert len(calls) == 1
+    stats = reg.stats()
+    assert stats['hits'] == 1 and stats['misses'] == 1
+    assert stats['load_time'] >= 0.0
+
+
+def test_registry_keys_on_device_and_precision():
+    calls = []
+    reg = ModelRegistry()
+    reg.get('tiny', loader=counting_loader(calls))
+    reg.get('tiny', device='cpu', loader=counting_loader(calls))
+    reg.get('tiny', device='cpu', precision='fp16', loader=counting_loader(calls))
+    assert len(calls) == 3
+    # device is forwarded to the loader only when explicitly requested
+    assert calls[0][1] == {}
+    assert calls[1][1] == {'device': 'cpu'}
+
+
+def test_registry_evicts_lru_over_memory_budget():
+    calls = []
+    # each fake model weighs 100 * 4 bytes; budget fits two of them
+    reg = ModelRegistry(max_bytes=800)
+    reg.get('tiny', loader=counting_loader(calls, 100))
+    reg.get('base', loader=counting_loader(calls, 100))
+    reg.get('tiny', loader=counting_loader(calls, 100))  # tiny becomes most recent
+    reg.get('small', loader=counting_loader(calls, 100))
+
+    models = [k[0] for k in reg.stats()['models']]
+    assert models == ['tiny', 'small']
+    assert reg.stats()['evictions'] == 1
+
+
+def test_registry_keeps_model_larger_than_budget():
+    reg = ModelRegistry(max_bytes=10)
+    model = reg.get('large', loader=counting_loader([], 1000))
+    assert reg.get('large', loader=counting_loader([], 1000)) is model
+
+
+def test_registry_max_models_and_release():
+    reg = ModelRegistry(max_models=1)
+    reg.get('tiny', loader=counting_loader([]))
+    reg.get('base', loader=counting_loader([]))
+    assert [k[0] for k in reg.stats()['models']] == ['base']
+    assert reg.release('base') is True
+    assert reg.release('base') is False
+
+
+def test_registry_concurrent_requests_load_once():
+    calls = []
+
+    def slow_loader(size, **kwargs):
+        calls.append(size)
+        time.sleep(0.05)
+        return FakeModel(size)
+
+    reg = ModelRegistry()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(reg.get('base', loader=slow_loader)))
+               for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    assert reg.stats()['hits'] == 4
+
+
+def test_estimate_model_bytes_without_parameters():
+    assert estimate_model_bytes(object()) == 0
+    assert estimate_model_bytes(FakeModel('x', 10)) == 40
+
+
+def test_transcribe_audio_reuses_loaded_model(monkeypatch, tmp_path):
+    audio = tmp_path / 'a.wav'
+    audio.write_bytes(b'RIFF')
+    calls = []
+    monkeypatch.setattr(transcribe.whisper, 'load_model', counting_loader(calls))
+
+    transcribe.transcribe_audio(str(audio), model_size='tiny', cache=False)
+    transcribe.transcribe_audio(str(audio), model_size='tiny', cache=False)
+
+    assert len(calls) == 1
+    assert get_registry().stats()['hits'] == 1
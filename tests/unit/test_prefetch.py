@@ -0,0 +1,111 @@
+import os
+
+import numpy as np
+import pytest
+
+from src import diarize, prefetch, progress, transcribe
+from src.worker import JobCancelled
+
+
+@pytest.fixture
+def decoder(monkeypatch):
+    """Fake ffmpeg/ffprobe: every file decodes to 2.5 s of a constant signal."""
+    calls = []
+
+    def fake_windows(path, seconds):
+        calls.append(path)
+        yield np.full(16000 * 2, 0.5, dtype=np.float32)
+        yield np.full(8000, 0.5, dtype=np.float32)
+
+    monkeypatch.setattr(prefetch, 'iter_audio_windows', fake_windows)
+    monkeypatch.setattr(prefetch, 'probe_duration', lambda path: 2.5)
+    return calls
+
+
+def make_audio(tmp_path, name='a.wav', content=b'RIFF'):
+    path = tmp_path / name
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_prefetch_keeps_one_file_and_checks_its_signature(decoder, tmp_path):
+    a, b = make_audio(tmp_path), make_audio(tmp_path, 'b.wav', b'OTHER')
+
+    assert prefetch.prefetch_audio(a) == {'path': a, 'duration': 2.5, 'cached': False}
+    assert prefetch.prefetch_audio(a)['cached'] is True
+    assert decoder == [a]
+    entry = prefetch.get_prefetched(a)
+    assert entry.samples.shape == (40000,)
+    assert prefetch.prefetched_hash(a) == entry.audio_hash
+
+    # selecting another file discards the previous buffer
+    prefetch.prefetch_audio(b)
+    assert prefetch.get_prefetched(a) is None and prefetch.get_prefetched(b) is not None
+
+    # a modified file is decoded again
+    with open(b, 'ab') as f:
+        f.write(b'more')
+    os.utime(b, ns=(0, 0))
+    assert prefetch.get_prefetched(b) is None
+    assert prefetch.discard_prefetched() is True
+    assert prefetch.discard_prefetched() is False
+
+
+def test_prefetch_can_be_interrupted_at_a_progress_event(decoder, tmp_path):
+    def stop(event):
+        if event.processed_seconds:
+            raise JobCancelled()
+
+    callback = progress.subscribe(stop)
+    try:
+        with pytest.raises(JobCancelled):
+            prefetch.prefetch_audio(make_audio(tmp_path))
+    finally:
+        progress.unsubscribe(callback)
+    assert prefetch.get_prefetched(make_audio(tmp_path)) is None
+
+
+def test_prefetch_can_be_interrupted_while_hashing(decoder, monkeypatch, tmp_path):
+    from src import result_cache
+
+    chunks = []
+    hash_file = result_cache.hash_file
+    monkeypatch.setattr(result_cache, 'hash_file',
+                        lambda path, on_chunk=None: hash_file(path, 4, lambda: chunks.append(1) or on_chunk()))
+    monkeypatch.setattr(prefetch, 'HASH_EVENT_INTERVAL', 0.0)
+    audio = make_audio(tmp_path, content=b'RIFF' * 100)
+
+    def stop_after_decoding(event):
+        if chunks:
+            raise JobCancelled()
+
+    callback = progress.subscribe(stop_after_decoding)
+    try:
+        with pytest.raises(JobCancelled):
+            prefetch.prefetch_audio(audio)
+    finally:
+        progress.unsubscribe(callback)
+    # the cancel is honoured at the first chunk, not after reading the whole file
+    assert len(chunks) == 1
+    assert prefetch.get_prefetched(audio) is None
+
+
+def test_transcription_and_diarization_start_from_prefetched_audio(decoder, monkeypatch, tmp_path):
+    audio = make_audio(tmp_path)
+    prefetch.prefetch_audio(audio)
+
+    received = []
+
+    class Model:
+        def transcribe(self, audio_input, **options):
+            received.append(audio_input)
+            return {'text': 'hola', 'segments': [{'start': 0.0, 'end': 2.5, 'text': 'hola'}]}
+
+    monkeypatch.setattr(transcribe.whisper, 'load_model', lambda size: Model())
+    result = transcribe.transcribe_audio(audio, 'tiny', cache=False)
+    assert result['text'] == 'hola'
+    assert isinstance(received[0], np.ndarray) and len(received[0]) == 40000
+
+    decoded = diarize.decode_audio(audio)
+    assert decoded['sample_rate'] == 16000
+    assert tuple(decoded['waveform'].shape) == (1, 40000)
@@ -0,0 +1,89 @@
+import pytest
+
+from src import progress
+
+
+def test_tracker_fraction_eta_and_rtf(monkeypatch):
+    clock = iter([100.0, 110.0, 130.0])
+    monkeypatch.setattr(progress.time, 'perf_counter', lambda: next(clock))
+    received = []
+    tracker = progress.ProgressTracker('transcribe', 100.0, 'a.wav', on_progress=received.append)
+
+    event = tracker.update(25.0, {'start': 0.0, 'end': 25.0, 'text': ' hola'})
+    assert event.fraction == pytest.approx(0.25)
+    assert event.elapsed == pytest.approx(10.0)
+    assert event.eta == pytest.approx(30.0)
+    assert event.rtf == pytest.approx(0.4)
+    assert event.segment['text'] == ' hola' and event.source == 'a.wav'
+
+    final = tracker.finish()
+    assert final.fraction == 1.0 and final.eta == 0.0 and final.segment is None
+    assert received == [event, final]
+
+
+def test_tracker_without_duration_reports_unknown_fraction():
+    tracker = progress.ProgressTracker('transcribe')
+
+    event = tracker.update(12.0)
+    assert event.fraction is None and event.eta is None
+
+    final = tracker.finish()
+    assert final.fraction == 1.0 and final.total_seconds == 12.0
+
+
+def test_subscribers_receive_events_until_unsubscribed():
+    received = []
+    callback = progress.subscribe(received.append)
+    try:
+        assert progress.has_listeners()
+        progress.ProgressTracker('diarize', 10.0).update(5.0)
+    finally:
+        progress.unsubscribe(callback)
+    progress.unsubscribe(callback)
+
+    progress.ProgressTracker('diarize', 10.0).update(10.0)
+    assert [e.fraction for e in received] == [0.5]
+    assert not progress.has_listeners()
+    assert progress.has_listeners(on_progress=print)
+
+
+def test_callback_exception_interrupts_work():
+    def cancel(event):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        progress.ProgressTracker('transcribe', 10.0, on_progress=cancel).update(1.0)
+
+
+@pytest.mark.parametrize('seconds, expected', [
+    (None, '?'), (12.4, '12s'), (185, '3m 05s'), (3720, '1h 02m'),
+])
+def test_format_eta(seconds, expected):
+    assert progress.format_eta(seconds) == expected
+
+
+def test_pipeline_progress_weights_stages():
+    pipeline = progress.PipelineProgress(progress.DIARIZATION_WEIGHTS)
+    event = progress.ProgressEvent('decode', 1.0, 60.0, 60.0, 1.0, 0.0)
+    assert pipeline.update(event) == pytest.approx(0.05)
+
+    pipeline.update(event._replace(stage='diarize', fraction=0.5))
+    # stage fractions never go backwards, unknown fractions are ignored
+    pipeline.update(event._replace(stage='diarize', fraction=0.2))
+    pipeline.update(event._replace(stage='transcribe', fraction=None))
+    assert pipeline.fraction == pytest.approx(0.05 + 0.45 * 0.5)
+    assert pipeline.eta is not None
+
+
+def test_format_event_and_printer(capsys):
+    event = progress.ProgressEvent('diarize', 0.45, 270.0, 600.0, 94.5, 115.5)
+    assert progress.format_event(event) == 'Diarización 45% · 270s/600s de audio · RTF 0.35 · ETA 1m 56s'
+
+    printer = progress.ProgressPrinter(step=0.1)
+    for fraction in (0.0, 0.05, 0.1, 0.15, 1.0):
+        printer(event._replace(fraction=fraction))
+    printer(event._replace(stage='merge', fraction=1.0))
+
+    lines = capsys.readouterr().out.splitlines()
+    assert [line.split(' · ')[0] for line in lines] == [
+        'Diarización 0%', 'Diarización 10%', 'Diarización 100%', 'Combinando 100%']
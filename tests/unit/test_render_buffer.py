@@ -0,0 +1,68 @@
+import threading
+
+from src.render_buffer import RenderBuffer
+
+
+def test_only_first_update_requests_a_flush_until_drained():
+    buffer = RenderBuffer()
+
+    assert buffer.append(' hola') is True
+    assert buffer.append(' mundo') is False
+    assert buffer.set_progress(10, 'a') is False
+    assert buffer.set_progress(20, 'b') is False
+
+    # one flush delivers all text and only the latest progress
+    assert buffer.drain() == (' hola mundo', (20, 'b'))
+    assert buffer.drain() == ('', None)
+    assert buffer.set_progress(30, 'c') is True
+
+
+def test_drain_is_bounded_and_keeps_remainder_scheduled():
+    buffer = RenderBuffer()
+    buffer.append('a' * 6)
+    buffer.append('b' * 6)
+
+    text, _ = buffer.drain(max_chars=8)
+    assert text == 'a' * 6 + 'bb'
+    assert buffer.pending
+    # the flusher reschedules itself, so producers do not schedule again
+    assert buffer.append('c') is False
+    assert buffer.drain(max_chars=8)[0] == 'bbbbc'
+    assert not buffer.pending
+
+
+def test_clear_text_and_concurrent_producers():
+    buffer = RenderBuffer()
+    requests = []
+
+    def produce():
+        for _ in range(1000):
+            requests.append(buffer.append('x'))
+
+    threads = [threading.Thread(target=produce) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert requests.count(True) == 1
+    assert len(buffer.drain(max_chars=10 ** 6)[0]) == 4000
+
+    buffer.append('partial')
+    buffer.clear_text()
+    assert buffer.drain() == ('', None)
+
+
+def test_segments_are_handed_over_once_and_cleared_with_text():
+    buffer = RenderBuffer()
+    assert buffer.append(' a', {'start': 0.0, 'text': ' a'}) is True
+    assert buffer.append('', {'start': 1.0, 'text': ' b'}) is False
+
+    assert [s['text'] for s in buffer.take_segments()] == [' a', ' b']
+    assert buffer.take_segments() == []
+    # segments do not delay the text flush
+    assert buffer.drain() == (' a', None)
+
+    buffer.append(' c', {'start': 2.0, 'text': ' c'})
+    buffer.clear_text()
+    assert buffer.take_segments() == []
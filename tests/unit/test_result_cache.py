@@ -0,0 +1,107 @@
+import os
+
+import numpy as np
+import pytest
+
+from src import result_cache, transcribe
+
+
+class CountingModel:
+    def __init__(self):
+        self.calls = 0
+
+    def transcribe(self, audio, **opts):
+        self.calls += 1
+        return {'text': f'texto {self.calls}', 'language': opts.get('language', 'es'),
+                'segments': [{'start': np.float32(0.5), 'end': 1.0, 'text': 'hola', 'tokens': np.array([1, 2])}]}
+
+
+@pytest.fixture
+def model(monkeypatch):
+    model = CountingModel()
+    monkeypatch.setattr(transcribe.whisper, 'load_model', lambda size: model)
+    return model
+
+
+def write_audio(tmp_path, name, content=b'RIFF-audio'):
+    path = tmp_path / name
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_key_depends_on_content_params_and_versions(monkeypatch):
+    base = result_cache.make_key('abc', model_size='base', language='es')
+    assert base == result_cache.make_key('abc', language='es', model_size='base')
+    assert base != result_cache.make_key('abd', model_size='base', language='es')
+    assert base != result_cache.make_key('abc', model_size='small', language='es')
+
+    result_cache.library_versions.cache_clear()
+    monkeypatch.setattr(result_cache, 'VERSIONED_PACKAGES', ('pytest',))
+    try:
+        assert base != result_cache.make_key('abc', model_size='base', language='es')
+    finally:
+        result_cache.library_versions.cache_clear()
+
+
+def test_transcribe_audio_hits_cache_for_same_content(model, tmp_path, capsys):
+    first = transcribe.transcribe_audio(write_audio(tmp_path, 'a.wav'), 'tiny', 'es')
+    # same bytes under another name: content-addressed hit, model not called again
+    again = transcribe.transcribe_audio(write_audio(tmp_path, 'copy.wav'), 'tiny', 'es')
+
+    assert model.calls == 1
+    assert again['text'] == first['text'] == 'texto 1'
+    assert again['segments'][0]['tokens'] == [1, 2]
+    assert 'recuperada de la caché' in capsys.readouterr().out
+
+    transcribe.transcribe_audio(write_audio(tmp_path, 'a.wav'), 'tiny', 'en')
+    transcribe.transcribe_audio(write_audio(tmp_path, 'b.wav', b'other'), 'tiny', 'es')
+    transcribe.transcribe_audio(write_audio(tmp_path, 'a.wav'), 'tiny', 'es', cache=False)
+    assert model.calls == 4
+
+
+def test_cache_disabled_by_env(model, tmp_path, monkeypatch):
+    monkeypatch.setenv('WHISPER_CACHE', '0')
+    audio = write_audio(tmp_path, 'a.wav')
+    transcribe.transcribe_audio(audio)
+    transcribe.transcribe_audio(audio)
+    assert model.calls == 2
+    assert result_cache.ResultCache().stats()['entries'] == 0
+
+
+def test_prune_evicts_least_recently_used(tmp_path):
+    cache = result_cache.ResultCache(str(tmp_path / 'c'), max_bytes=10 ** 6)
+    for i, key in enumerate(['aa11', 'bb22', 'cc33']):
+        cache.put(key, {'text': 'x' * 100})
+        path = cache._path(key)
+        os.utime(path, (1000 + i, 1000 + i))
+    # reading refreshes recency: 'aa11' becomes the most recently used
+    assert cache.get('aa11') == {'text': 'x' * 100}
+
+    assert cache.prune(max_bytes=cache.stats()['bytes'] - 1) == 1
+    assert cache.get('bb22') is None
+    assert cache.get('aa11') is not None and cache.get('cc33') is not None
+
+    assert cache.clear() == 2
+    assert cache.stats()['entries'] == 0
+
+
+def test_put_applies_size_cap(tmp_path):
+    cache = result_cache.ResultCache(str(tmp_path / 'c'), max_bytes=250)
+    cache.put('aa11', {'text': 'x' * 100})
+    os.utime(cache._path('aa11'), (1000, 1000))
+    cache.put('bb22', {'text': 'y' * 100})
+    assert [e['key'] for e in cache.entries()] == ['bb22']
+
+
+def test_cli_list_prune_and_clear(model, tmp_path, capsys):
+    transcribe.transcribe_audio(write_audio(tmp_path, 'a.wav'), 'tiny', 'es')
+    capsys.readouterr()
+
+    assert result_cache.main(['list']) == 0
+    out = capsys.readouterr().out
+    assert 'a.wav [tiny, es]' in out and '1 entradas' in out
+
+    assert result_cache.main(['prune', '--max-mb', '0']) == 0
+    assert 'Entradas eliminadas: 1' in capsys.readouterr().out
+    assert result_cache.main(['clear']) == 0
+    assert '0 entradas' in capsys.readouterr().out
@@ -0,0 +1,113 @@
+import random
+import types
+
+from src.diarize import get_speaker_for_segment
+from src.speaker_assignment import SpeakerTurns, assign_speakers
+
+
+class FakeDiarization:
+    def __init__(self, tracks):
+        # tracks: list of (start, end, speaker)
+        self._tracks = tracks
+
+    def itertracks(self, yield_label=True):
+        for s, e, spk in self._tracks:
+            yield (types.SimpleNamespace(start=s, end=e), None, spk)
+
+
+def random_case(rng, n_turns, n_segments, duration=600.0):
+    tracks = []
+    for _ in range(n_turns):
+        s = rng.uniform(0, duration)
+        tracks.append((s, s + rng.uniform(0.0, 30.0), rng.choice(['S0', 'S1', 'S2', 'S3'])))
+    segments = []
+    for _ in range(n_segments):
+        s = rng.uniform(-5, duration + 5)
+        segments.append({'start': s, 'end': s + rng.uniform(0.0, 15.0)})
+    return FakeDiarization(tracks), segments
+
+
+def test_assign_speakers_matches_scalar_function():
+    rng = random.Random(1234)
+    for _ in range(30):
+        diar, segments = random_case(rng, rng.randint(0, 80), rng.randint(0, 60))
+        expected = [get_speaker_for_segment(diar, s['start'], s['end']) for s in segments]
+        assert assign_speakers(diar, segments) == expected
+
+
+def test_assign_speakers_tie_break_and_touching_turns():
+    # equal overlap: the speaker seen first in itertracks wins, as in the scalar loop
+    diar = FakeDiarization([(1.0, 2.0, 'B'), (0.0, 1.0, 'A'), (2.0, 3.0, 'C')])
+    segments = [{'start': 0.5, 'end': 1.5}, {'start': 3.0, 'end': 4.0}, {'start': 1.0, 'end': 1.0}]
+    expected = [get_speaker_for_segment(diar, s['start'], s['end']) for s in segments]
+    assert assign_speakers(diar, segments) == expected == ['B', 'UNKNOWN', 'UNKNOWN']
+
+
+def test_assign_speakers_accepts_materialized_turns_and_empty_inputs():
+    turns = SpeakerTurns([0.0, 2.0], [2.0, 4.0], ['A', 'B'])
+    assert len(turns) == 2
+    assert assign_speakers(turns, [{'start': 2.5, 'end': 3.0}]) == ['B']
+    assert assign_speakers(turns, []) == []
+    assert assign_speakers(FakeDiarization([]), [{'start': 0, 'end': 1}]) == ['UNKNOWN']
+
+
+def test_vectorized_attribution_matches_scalar_function():
+    from src.speaker_assignment import attribute_speakers
+    rng = random.Random(99)
+    for _ in range(30):
+        diar, segments = random_case(rng, rng.randint(0, 80), rng.randint(0, 60))
+        expected = [get_speaker_for_segment(diar, s['start'], s['end']) for s in segments]
+        result = attribute_speakers(diar, segments)
+        assert result.speakers == expected
+
+
+def test_vectorized_attribution_scores_and_ratios():
+    import numpy as np
+    from src.speaker_assignment import attribute_speakers_vectorized
+
+    result = attribute_speakers_vectorized(
+        np.array([0.0, 1.0, 5.0, 2.0]),
+        np.array([2.0, 3.0, 6.0, 2.0]),
+        np.array([0.0, 1.5, 2.5]),
+        np.array([1.5, 2.5, 4.0]),
+        ['A', 'B', 'A'],
+        chunk_size=2,
+    )
+    assert result.labels == ['A', 'B']
+    # tie on the second segment -> first label seen in the diarization; a
+    # zero-length segment inside a turn keeps that turn's speaker, as in the scalar loop
+    assert result.speakers == ['A', 'A', 'UNKNOWN', 'B']
+    np.testing.assert_allclose(result.scores[0], [1.5, 0.5])
+    np.testing.assert_allclose(result.scores[1], [1.0, 1.0])
+    np.testing.assert_allclose(result.ratios, [0.75, 0.5, 0.0, 0.0])
+
+
+def test_speaker_turns_dict_round_trip_keeps_order():
+    rng = random.Random(3)
+    diarization, segments = random_case(rng, 50, 80)
+    turns = SpeakerTurns.from_diarization(diarization)
+
+    data = turns.to_dict()
+    restored = SpeakerTurns.from_dict(data)
+
+    assert len(data['labels']) <= 4
+    assert restored.labels == turns.labels and restored.starts == turns.starts
+    assert assign_speakers(restored, segments) == assign_speakers(diarization, segments)
+
+
+def test_vectorized_attribution_is_independent_of_block_size():
+    import numpy as np
+    from src.speaker_assignment import attribute_speakers_vectorized
+
+    rng = random.Random(7)
+    diar, segments = random_case(rng, 120, 90)
+    # a turn spanning the whole recording makes every segment a candidate for every turn
+    turns = SpeakerTurns.from_diarization(diar)
+    turns = SpeakerTurns(turns.starts + [-10.0], turns.ends + [700.0], turns.labels + ['S9'])
+    args = ([s['start'] for s in segments], [s['end'] for s in segments], turns.starts, turns.ends, turns.labels)
+
+    whole = attribute_speakers_vectorized(*args)
+    for chunk_size in (1, 7, 500):
+        blocked = attribute_speakers_vectorized(*args, chunk_size=chunk_size)
+        assert blocked.speakers == whole.speakers == assign_speakers(turns, segments)
+        np.testing.assert_allclose(blocked.scores, whole.scores)
@@ -0,0 +1,102 @@
+import types
+
+import pytest
+
+from src import batch, thread_policy
+from src.thread_policy import ThreadPolicy
+
+
+@pytest.fixture
+def fake_torch(monkeypatch):
+    calls = {'threads': [], 'interop': []}
+    fake = types.SimpleNamespace(set_num_threads=calls['threads'].append,
+                                 set_num_interop_threads=calls['interop'].append)
+    monkeypatch.setitem(__import__('sys').modules, 'torch', fake)
+    monkeypatch.setattr(thread_policy, '_interop_applied', None)
+    return calls
+
+
+def test_parse_cpu_list():
+    assert thread_policy.parse_cpu_list('0-3, 8,10-11') == {0, 1, 2, 3, 8, 10, 11}
+    for bad in ('', '3-1', 'a'):
+        with pytest.raises(ValueError):
+            thread_policy.parse_cpu_list(bad)
+
+
+def test_policy_from_env(monkeypatch):
+    monkeypatch.setenv('WHISPER_THREADS', '4')
+    monkeypatch.setenv('WHISPER_INTEROP_THREADS', '2')
+    monkeypatch.setenv('WHISPER_CPU_AFFINITY', '0-3')
+    assert ThreadPolicy.from_env() == ThreadPolicy(4, 2, frozenset({0, 1, 2, 3}))
+
+    for name in ('WHISPER_THREADS', 'WHISPER_INTEROP_THREADS', 'WHISPER_CPU_AFFINITY'):
+        monkeypatch.delenv(name)
+    assert ThreadPolicy.from_env() == ThreadPolicy()
+
+
+def test_policy_round_trips_through_env(monkeypatch):
+    policy = ThreadPolicy(4, 2, frozenset({2, 0, 1}))
+    assert policy.to_env() == {'WHISPER_THREADS': '4', 'WHISPER_INTEROP_THREADS': '2',
+                               'WHISPER_CPU_AFFINITY': '0,1,2'}
+    for name, value in policy.to_env().items():
+        monkeypatch.setenv(name, value)
+    assert ThreadPolicy.from_env() == policy
+    assert ThreadPolicy().to_env() == {}
+
+def test_partition_splits_cores_and_pins_disjoint_blocks(monkeypatch):
+    monkeypatch.setattr(thread_policy, 'available_cpus', lambda: list(range(8)))
+
+    shared = ThreadPolicy().partition(3)
+    assert [p.threads for p in shared] == [2, 2, 2]
+    assert all(p.affinity is None for p in shared)
+
+    pinned = ThreadPolicy(affinity=frozenset(range(2, 8))).partition(2, pin=True)
+    assert [sorted(p.affinity) for p in pinned] == [[2, 3, 4], [5, 6, 7]]
+    assert [p.threads for p in pinned] == [3, 3]
+    assert ThreadPolicy(threads=1).partition(2)[0].threads == 1
+
+
+def test_apply_sets_threads_affinity_and_interop_once(monkeypatch, fake_torch):
+    affinity = []
+    monkeypatch.setattr(thread_policy.os, 'sched_setaffinity', lambda pid, cpus: affinity.append(cpus),
+                        raising=False)
+
+    applied = thread_policy.apply_thread_policy(ThreadPolicy(affinity=frozenset({0, 1, 2})))
+    thread_policy.apply_thread_policy(ThreadPolicy(threads=5, interop_threads=4))
+
+    assert applied == ThreadPolicy(3, 1, frozenset({0, 1, 2}))
+    assert affinity == [frozenset({0, 1, 2})]
+    assert fake_torch['threads'] == [3, 5]
+    # torch only accepts the inter-op setting once per process
+    assert fake_torch['interop'] == [1]
+
+
+def test_apply_uses_env_when_no_policy_given(monkeypatch, fake_torch):
+    monkeypatch.setenv('WHISPER_THREADS', '7')
+    assert thread_policy.apply_thread_policy().threads == 7
+    assert fake_torch['threads'] == [7]
+
+
+def test_batch_cli_threads_options(monkeypatch):
+    captured = {}
+    monkeypatch.setattr(batch, 'collect_inputs', lambda sources: ['a.mp3'])
+    monkeypatch.setattr(batch, 'run_batch', lambda inputs, **kw: captured.update(kw) or batch.summarize([], 1.0))
+    monkeypatch.setattr(batch, 'print_summary', lambda summary: None)
+
+    assert batch.main(['a.mp3', '--workers', '2', '--threads', '3', '--cpu-affinity', '0-5', '--pin']) == 0
+    assert captured['thread_policy'] == ThreadPolicy(3, None, frozenset(range(6)))
+    assert captured['pin'] is True
+
+
+def test_batch_worker_takes_its_own_slot(monkeypatch):
+    import queue
+    applied = []
+    monkeypatch.setattr(batch, 'apply_thread_policy', applied.append)
+    monkeypatch.setattr('src.model_registry.get_model', lambda *a, **k: None)
+    slots = queue.Queue()
+    slots.put(ThreadPolicy(2, None, frozenset({4, 5})))
+
+    batch._init_worker('tiny', False, None, ThreadPolicy(2), slots)
+    batch._init_worker('tiny', False, None, ThreadPolicy(2), slots)
+
+    assert applied == [ThreadPolicy(2, None, frozenset({4, 5})), ThreadPolicy(2)]
@@ -0,0 +1,267 @@
+import stat
+import sys
+
+import numpy as np
+import pytest
+
+from src import audio_stream, transcribe
+
+
+def make_fake_ffmpeg(tmp_path, n_samples, exit_code=0):
+    """Executable that mimics ffmpeg writing s16le PCM to stdout."""
+    script = tmp_path / 'fake_ffmpeg'
+    script.write_text(
+        f"#!{sys.executable}\n"
+        "import sys\n"
+        f"sys.stdout.buffer.write((1000).to_bytes(2, 'little', signed=True) * {n_samples})\n"
+        f"sys.exit({exit_code})\n"
+    )
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    return str(script)
+
+
+def test_iter_audio_windows_reads_fixed_windows(monkeypatch, tmp_path):
+    monkeypatch.setattr(audio_stream, 'FFMPEG_BINARY', make_fake_ffmpeg(tmp_path, 16000 * 2 + 8000))
+
+    windows = list(audio_stream.iter_audio_windows('in.mp3', window_seconds=1.0))
+
+    assert [len(w) for w in windows] == [16000, 16000, 8000]
+    assert windows[0].dtype == np.float32
+    assert windows[0][0] == pytest.approx(1000 / 32768.0)
+
+
+def test_iter_audio_windows_errors(monkeypatch, tmp_path):
+    monkeypatch.setattr(audio_stream, 'FFMPEG_BINARY', str(tmp_path / 'missing_ffmpeg'))
+    with pytest.raises(RuntimeError, match='ffmpeg'):
+        list(audio_stream.iter_audio_windows('in.mp3', 1.0))
+
+    monkeypatch.setattr(audio_stream, 'FFMPEG_BINARY', make_fake_ffmpeg(tmp_path, 0, exit_code=1))
+    with pytest.raises(RuntimeError, match='no pudo decodificar'):
+        list(audio_stream.iter_audio_windows('in.mp3', 1.0))
+
+
+class WindowModel:
+    """Returns one segment per 10 seconds of the received buffer."""
+
+    def __init__(self):
+        self.calls = []
+
+    def transcribe(self, audio, **opts):
+        self.calls.append((len(audio), opts))
+        seconds = len(audio) / 16000
+        segments = []
+        start = 0.0
+        while start < seconds:
+            end = min(start + 10.0, seconds)
+            segments.append({'start': start, 'end': end, 'text': f' s{len(self.calls)}'})
+            start = end
+        return {'text': '', 'segments': segments, 'language': 'es'}
+
+
+def test_transcribe_stream_offsets_carry_and_context(monkeypatch, tmp_path):
+    audio = tmp_path / 'long.mp3'
+    audio.write_bytes(b'RIFF')
+    model = WindowModel()
+    monkeypatch.setattr(transcribe.whisper, 'load_model', lambda size: model)
+
+    windows = [np.zeros(16000 * 25, dtype=np.float32)] * 3
+    monkeypatch.setattr(transcribe, 'iter_audio_windows', lambda path, secs: iter(windows))
+
+    segments = list(transcribe.transcribe_stream(str(audio), window_seconds=25))
+
+    # last (possibly cut) segment of each non-final window is re-fed with the next window
+    assert [len_ for len_, _ in model.calls] == [16000 * 25, 16000 * 30, 16000 * 35]
+    starts = [s['start'] for s in segments]
+    assert starts == [0.0, 10.0, 20.0, 30.0, 40.0, 50.0, 60.0, 70.0]
+    assert segments[-1]['end'] == pytest.approx(75.0)
+    # detected language and previous text are carried to the following windows
+    assert 'language' not in model.calls[0][1]
+    assert model.calls[1][1]['language'] == 'es'
+    assert model.calls[1][1]['initial_prompt'] == ' s1 s1'
+
+
+def test_transcribe_stream_is_lazy_generator(monkeypatch, tmp_path):
+    audio = tmp_path / 'long.mp3'
+    audio.write_bytes(b'RIFF')
+    model = WindowModel()
+    monkeypatch.setattr(transcribe.whisper, 'load_model', lambda size: model)
+    produced = []
+
+    def windows(path, secs):
+        for _ in range(100):
+            produced.append(1)
+            yield np.zeros(16000 * 5, dtype=np.float32)
+
+    monkeypatch.setattr(transcribe, 'iter_audio_windows', windows)
+
+    gen = transcribe.transcribe_stream(str(audio), window_seconds=5)
+    first = next(gen)
+    assert first['start'] == 0.0
+    # only the current window plus one lookahead window have been decoded
+    assert len(produced) == 2
+    gen.close()
+
+
+def test_transcribe_stream_missing_file():
+    with pytest.raises(FileNotFoundError):
+        next(transcribe.transcribe_stream('no_such_file.mp3'))
+
+
+def test_transcribe_main_stream_flag(monkeypatch, tmp_path, capsys, fake_whisper):
+    import runpy
+    audio = tmp_path / 'in.mp3'
+    audio.write_bytes(b'RIFF')
+    # runpy re-imports `whisper`, which resolves to the conftest fake module
+    monkeypatch.setattr(fake_whisper, 'load_model', lambda size: WindowModel())
+    monkeypatch.setattr('src.audio_stream.iter_audio_windows',
+                        lambda path, secs: iter([np.zeros(16000 * 12, dtype=np.float32)]))
+    monkeypatch.setattr(sys, 'argv', ['transcribe.py', str(audio), 'tiny', '--stream'])
+    monkeypatch.chdir(tmp_path)
+
+    runpy.run_module('src.transcribe', run_name='__main__')
+
+    assert '[10.00s - 12.00s]' in capsys.readouterr().out
+    assert (tmp_path / 'in_transcripcion.txt').read_text(encoding='utf-8') == ' s1 s1'
+
+
+def test_iter_transcription_yields_segments_with_progress(monkeypatch, tmp_path):
+    audio = tmp_path / 'long.mp3'
+    audio.write_bytes(b'RIFF-progress')
+    model = WindowModel()
+    monkeypatch.setattr(transcribe.whisper, 'load_model', lambda size: model)
+    monkeypatch.setattr(transcribe, 'probe_duration', lambda path: 60.0)
+    monkeypatch.setattr(transcribe, 'iter_audio_windows',
+                        lambda path, secs: iter([np.zeros(16000 * 30, dtype=np.float32)] * 2))
+    seen = []
+
+    events = list(transcribe.iter_transcription(str(audio), on_progress=seen.append))
+
+    assert [e.segment['start'] for e in events[:-1]] == [0.0, 10.0, 20.0, 30.0, 40.0, 50.0]
+    assert [e.fraction for e in events[:2]] == [pytest.approx(1 / 6), pytest.approx(2 / 6)]
+    assert all(e.stage == 'transcribe' and e.eta is not None for e in events)
+    assert events[-1].segment is None and events[-1].fraction == 1.0
+    assert seen == events
+
+
+class WhisperLikeModel:
+    """Drives whisper.transcribe's progress bar the way its 30s-window loop does (60s of audio)."""
+
+    def __init__(self, events):
+        self.calls = []
+        self.events = events
+        self.seen_during_call = []
+
+    def transcribe(self, audio, **opts):
+        self.calls.append((audio, opts))
+        all_segments = []
+        with sys.modules['whisper.transcribe'].tqdm.tqdm(total=6000, unit='frames', disable=True) as pbar:
+            for start in (0.0, 30.0):
+                all_segments.extend({'id': len(all_segments) + i, 'start': start + 15.0 * i,
+                                     'end': start + 15.0 * (i + 1), 'text': ' w', 'tokens': [1]}
+                                    for i in range(2))
+                pbar.update(3000)
+                self.seen_during_call.append(len(self.events))
+        return {'text': ' w w w w', 'segments': all_segments, 'language': 'es'}
+
+
+@pytest.fixture
+def whisper_progress_bar(monkeypatch):
+    import types
+    module = types.ModuleType('whisper.transcribe')
+    module.tqdm = types.SimpleNamespace(tqdm=lambda *a, **k: pytest.fail('hook not installed'))
+    module.FRAMES_PER_SECOND = 100
+    monkeypatch.setitem(sys.modules, 'whisper.transcribe', module)
+    return module
+
+
+def test_transcribe_audio_publishes_whisper_windows_without_changing_the_call(
+        monkeypatch, tmp_path, whisper_progress_bar):
+    from src import progress
+
+    audio = tmp_path / 'a.mp3'
+    audio.write_bytes(b'RIFF-subscribed')
+    events = []
+    model = WhisperLikeModel(events)
+    monkeypatch.setattr(transcribe.whisper, 'load_model', lambda size: model)
+    received = progress.subscribe(events.append)
+    try:
+        result = transcribe.transcribe_audio(str(audio), language='es')
+        # the cached result is replayed to listeners as well
+        cached = transcribe.transcribe_audio(str(audio), language='es')
+    finally:
+        progress.unsubscribe(received)
+
+    # a single native call, exactly as without listeners
+    assert model.calls == [(str(audio), {'language': 'es'})]
+    assert cached == result and result['text'] == ' w w w w'
+    # each window's segments and progress arrive while Whisper is still running
+    assert model.seen_during_call == [3, 6]
+    live = events[:7]
+    assert [e.segment['end'] for e in live if e.segment is not None] == [15.0, 30.0, 45.0, 60.0]
+    assert live[0].total_seconds == 60.0 and live[2].fraction == 0.5
+    assert live[-1].segment is None and live[-1].fraction == 1.0
+    assert set(live[0].segment) == {'start', 'end', 'text'}
+    assert [e.segment['end'] for e in events[7:] if e.segment is not None] == [15.0, 30.0, 45.0, 60.0]
+
+
+def test_whisper_progress_bar_is_untouched_without_listeners(whisper_progress_bar):
+    import types
+    whisper_progress_bar.tqdm = types.SimpleNamespace(tqdm=lambda *a, **k: 'real bar', trange=range)
+    model = types.SimpleNamespace(transcribe=lambda audio, **opts: {'segments': []})
+    transcribe.transcribe_with_progress(model, 'a.wav', transcribe.ProgressTracker('transcribe'))
+
+    assert whisper_progress_bar.tqdm.tqdm(total=10) == 'real bar'
+    assert whisper_progress_bar.tqdm.trange is range
+
+
+def test_progress_hook_is_only_installed_during_the_call(whisper_progress_bar):
+    original = whisper_progress_bar.tqdm
+    events = []
+    model = WhisperLikeModel(events)
+    seen = []
+    transcribe_call = model.transcribe
+    model.transcribe = lambda audio, **opts: seen.append(whisper_progress_bar.tqdm) or transcribe_call(audio, **opts)
+
+    tracker = transcribe.ProgressTracker('transcribe', on_progress=events.append)
+    transcribe.transcribe_with_progress(model, 'a.wav', tracker)
+
+    assert isinstance(seen[0], transcribe._TqdmHook)
+    assert whisper_progress_bar.tqdm is original
+    assert model.seen_during_call == [3, 6]
+
+
+class NoSegmentsLocalModel:
+    """A Whisper release that renamed its segment list: only the progress bar is recognisable."""
+
+    def transcribe(self, audio, **opts):
+        collected = []
+        with sys.modules['whisper.transcribe'].tqdm.tqdm(total=6000, unit='frames') as pbar:
+            for start in (0.0, 30.0):
+                collected.append({'start': start, 'end': start + 30.0, 'text': ' w'})
+                pbar.update(3000)
+        return {'text': ' w w', 'segments': collected}
+
+
+def test_missing_whisper_internals_fall_back_to_coarse_events(monkeypatch, whisper_progress_bar):
+    import types
+
+    events = []
+    result = transcribe.transcribe_with_progress(
+        NoSegmentsLocalModel(), 'a.wav', transcribe.ProgressTracker('transcribe', on_progress=events.append))
+
+    # per-window progress without segments, then every segment once Whisper returns
+    assert [e.segment for e in events[:2]] == [None, None] and events[1].fraction == 1.0
+    assert [e.segment['end'] for e in events if e.segment is not None] == [30.0, 60.0]
+    assert result['text'] == ' w w'
+
+    # no progress bar to hook at all: the module is left alone and segments arrive at the end
+    plain = types.ModuleType('whisper.transcribe')
+    monkeypatch.setitem(sys.modules, 'whisper.transcribe', plain)
+    events.clear()
+    model = types.SimpleNamespace(transcribe=lambda audio, **opts: {
+        'segments': [{'start': 0.0, 'end': 2.0, 'text': ' a'}]})
+    transcribe.transcribe_with_progress(model, 'a.wav', transcribe.ProgressTracker('transcribe', on_progress=events.append))
+
+    assert not hasattr(plain, 'tqdm')
+    assert [e.segment['end'] for e in events if e.segment is not None] == [2.0]
+    assert events[-1].fraction == 1.0
@@ -0,0 +1,69 @@
+import pytest
+
+from src.transcript_view import SegmentIndex, format_segment, format_timestamp, parse_timestamp
+
+
+def make_segments(n):
+    speakers = ['A', 'B', 'A', 'C']
+    return [{'start': i * 2.0, 'end': i * 2.0 + 2, 'text': f' t{i}', 'speaker': speakers[i % 4]}
+            for i in range(n)]
+
+
+def test_index_at_finds_segment_playing_at_time():
+    index = SegmentIndex(make_segments(1000))
+
+    assert index.index_at(0.0) == 0
+    assert index.index_at(3.9) == 1
+    assert index.index_at(1000.0) == 500
+    assert index.index_at(-5.0) == 0
+    assert index.index_at(10 ** 6) == 999
+
+
+def test_speaker_navigation():
+    index = SegmentIndex(make_segments(12))
+
+    assert index.speakers == ['A', 'B', 'C']
+    assert index.next_of_speaker('A', 0) == 2
+    assert index.next_of_speaker('C', 3) == 7
+    assert index.previous_of_speaker('B', 5) == 1
+    assert index.previous_of_speaker('B', 1) is None
+    assert index.next_of_speaker('C', 11) is None
+    assert index.next_of_speaker('Z', 0) is None
+
+
+def test_extend_keeps_indices_and_lines_render_only_requested_window():
+    index = SegmentIndex(make_segments(4))
+    index.extend(make_segments(8)[4:])
+
+    assert len(index) == 8
+    assert index.next_of_speaker('C', 3) == 7
+    assert index.lines(6, 5) == ['[00:00:12] A: t6', '[00:00:14] C: t7']
+
+
+def test_formatting_helpers():
+    assert format_timestamp(3723.9) == '01:02:03'
+    assert format_segment({'start': 5.0, 'text': ' hola '}) == '[00:00:05] hola'
+    assert parse_timestamp('01:02:03') == 3723
+    assert parse_timestamp('2:30') == 150
+    assert parse_timestamp('754.5') == pytest.approx(754.5)
+    with pytest.raises(ValueError):
+        parse_timestamp('abc')
+
+
+def test_turn_navigation_skips_consecutive_segments_of_the_same_speaker():
+    speakers = ['A', 'A', 'B', 'B', 'A', 'A', 'A', 'B']
+    index = SegmentIndex([{'start': float(i), 'end': i + 1.0, 'text': f' t{i}', 'speaker': s}
+                          for i, s in enumerate(speakers)])
+
+    assert index.next_of_speaker('A', 0) == 1
+    assert index.next_turn_of_speaker('A', 0) == 4
+    assert index.next_turn_of_speaker('A', 4) is None
+    assert index.next_turn_of_speaker('B', 2) == 7
+    assert index.previous_turn_of_speaker('A', 4) == 0
+    assert index.previous_turn_of_speaker('B', 5) == 2
+
+    # a turn continued by segments that arrive later is not split
+    index.extend([{'start': 8.0, 'end': 9.0, 'text': ' t8', 'speaker': 'B'},
+                  {'start': 9.0, 'end': 10.0, 'text': ' t9', 'speaker': 'A'}])
+    assert index.next_turn_of_speaker('B', 7) is None
+    assert index.next_turn_of_speaker('A', 4) == 9
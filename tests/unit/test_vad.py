@@ -0,0 +1,144 @@
+import numpy as np
+import pytest
+
+from src import transcribe, vad
+
+SR = 16000
+
+
+def tone(seconds, amplitude=0.3):
+    t = np.arange(int(seconds * SR)) / SR
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def silence(seconds):
+    rng = np.random.default_rng(0)
+    return (rng.standard_normal(int(seconds * SR)) * 1e-4).astype(np.float32)
+
+
+def test_detect_speech_finds_regions_with_padding():
+    audio = np.concatenate([silence(2), tone(1), silence(3), tone(2), silence(1)])
+
+    regions = vad.detect_speech(audio, SR, padding=0.2)
+
+    assert len(regions) == 2
+    assert regions[0][0] == pytest.approx(1.8, abs=0.05)
+    assert regions[0][1] == pytest.approx(3.2, abs=0.05)
+    assert regions[1][0] == pytest.approx(5.8, abs=0.05)
+    assert regions[1][1] == pytest.approx(8.2, abs=0.05)
+
+
+def test_detect_speech_merges_short_gaps_and_drops_clicks():
+    audio = np.concatenate([silence(1), tone(1), silence(0.2), tone(1), silence(1), tone(0.05), silence(1)])
+
+    regions = vad.detect_speech(audio, SR, padding=0.0)
+
+    assert len(regions) == 1
+    assert regions[0][1] - regions[0][0] == pytest.approx(2.2, abs=0.05)
+    assert vad.detect_speech(silence(3), SR) == []
+    assert vad.detect_speech(np.zeros(10, dtype=np.float32), SR) == []
+
+
+def test_detect_speech_on_audio_without_silence():
+    t = np.arange(6 * SR) / SR
+    rng = np.random.default_rng(1)
+    noise = (rng.standard_normal(len(t)) * 0.1).astype(np.float32)
+    # speech-like: syllable-rate amplitude modulation, never dropping to silence
+    modulated = (tone(6) * (0.55 + 0.45 * np.sin(2 * np.pi * 4 * t))).astype(np.float32)
+
+    for audio in (tone(6), noise, modulated):
+        regions = vad.detect_speech(audio, SR)
+        assert sum(end - start for start, end in regions) == pytest.approx(6.0, abs=0.1)
+
+
+def test_time_map_round_trip_and_boundaries():
+    time_map = vad.TimeMap([(2.0, 4.0), (10.0, 11.0)])
+
+    assert time_map.compact_duration == 3.0
+    assert time_map.to_original(0.5) == 2.5
+    assert time_map.to_original(2.5) == 10.5
+    # a segment ending exactly at the junction ends in the first region
+    assert time_map.to_original(2.0, is_end=True) == 4.0
+    assert time_map.to_original(2.0) == 10.0
+    assert time_map.to_original(5.0, is_end=True) == 11.0
+
+
+class RecordingModel:
+    def __init__(self):
+        self.received = None
+
+    def transcribe(self, audio, **opts):
+        self.received = audio
+        seconds = len(audio) / SR
+        return {'text': ' a b', 'language': 'es', 'segments': [
+            {'start': 0.0, 'end': 1.0, 'text': ' a', 'words': [{'word': ' a', 'start': 0.1, 'end': 0.9}]},
+            {'start': 2.0, 'end': seconds, 'text': ' b'},
+        ]}
+
+
+def test_transcribe_speech_only_sends_speech_and_remaps_timestamps():
+    audio = np.concatenate([silence(5), tone(1), silence(10), tone(2), silence(5)])
+    model = RecordingModel()
+
+    result = vad.transcribe_speech_only(model, audio, SR, language='es')
+
+    # only ~3.8s of the 23s recording reach Whisper
+    assert len(model.received) / SR == pytest.approx(3.8, abs=0.1)
+    first, second = result['segments']
+    assert first['start'] == pytest.approx(4.8, abs=0.05)
+    assert first['words'][0]['start'] == pytest.approx(4.9, abs=0.05)
+    assert second['start'] == pytest.approx(16.4, abs=0.05)
+    assert second['end'] == pytest.approx(18.2, abs=0.05)
+
+
+def test_transcribe_speech_only_all_silence_skips_model():
+    model = RecordingModel()
+    result = vad.transcribe_speech_only(model, silence(2), SR, language='en')
+    assert model.received is None
+    assert result == {'text': '', 'segments': [], 'language': 'en'}
+
+
+def test_transcribe_speech_only_falls_back_to_whole_file(monkeypatch):
+    audio = np.concatenate([tone(4), silence(1)])
+    model = RecordingModel()
+    # the detector only keeps a fraction of a file that has signal almost everywhere
+    monkeypatch.setattr(vad, 'detect_speech', lambda audio, sample_rate: [(0.0, 0.5)])
+
+    result = vad.transcribe_speech_only(model, audio, SR)
+
+    assert len(model.received) == len(audio)
+    assert result['segments'][1]['end'] == pytest.approx(5.0)
+
+    monkeypatch.setattr(vad, 'detect_speech', lambda audio, sample_rate: [])
+    model = RecordingModel()
+    vad.transcribe_speech_only(model, tone(2), SR)
+    assert len(model.received) == 2 * SR
+
+
+def test_transcribe_audio_with_vad_env(monkeypatch, tmp_path, fake_whisper):
+    audio_file = tmp_path / 'a.wav'
+    audio_file.write_bytes(b'RIFF')
+    model = RecordingModel()
+    monkeypatch.setattr(transcribe.whisper, 'load_model', lambda size: model)
+    monkeypatch.setattr(transcribe.whisper, 'load_audio',
+                        lambda path: np.concatenate([silence(3), tone(1)]), raising=False)
+    monkeypatch.setenv('WHISPER_VAD', '1')
+
+    segments = transcribe.transcribe_with_timestamps(str(audio_file), 'tiny')
+
+    assert segments[0]['start'] == pytest.approx(2.8, abs=0.05)
+    assert 'words' not in segments[0]
+
+
+def test_diarize_transcription_stage_with_vad(monkeypatch):
+    import torch
+    from src import diarize
+
+    model = RecordingModel()
+    monkeypatch.setattr(diarize, 'get_model', lambda size, loader=None: model)
+    waveform = torch.from_numpy(np.concatenate([silence(4), tone(1)])).unsqueeze(0)
+
+    result = diarize._run_transcription({'waveform': waveform, 'sample_rate': SR}, 'tiny', None, vad=True)
+
+    assert len(model.received) / SR == pytest.approx(1.2, abs=0.05)
+    assert result['segments'][0]['start'] == pytest.approx(3.8, abs=0.05)